@@ -1,23 +1,97 @@
+from collections import OrderedDict
 import json
+import logging
+import os
+import threading
 
-import boto3
+from jury_common import bedrock, dedup, models, sections
 
-bedrock = boto3.client("bedrock-runtime")
+logger = logging.getLogger()
 
+DAMAGE_CATEGORIES = ("compensatory", "punitive", "statutory", "equitable", "other")
 
-def process_defense_window(claim_context: str, previous_context: str, window_text: str) -> dict:
-    """Extract defenses from one window of text."""
+# Claims covered by one batched window call; larger lists are split into several batches
+BATCH_SIZE = int(os.environ.get("ENRICH_BATCH_SIZE", "10"))
+
+# Answers whose deduplicated defense pool a warm container keeps
+DEFENSE_POOL_ITEMS = 8
+_defense_pools: OrderedDict[str, list[dict]] = OrderedDict()
+_defense_pools_lock = threading.Lock()
+
+# Windows sent per wave of a scan; small waves let section_complete stop the scan before most windows are sent
+SCAN_WAVE = int(os.environ.get("ENRICH_SCAN_WAVE", "2"))
+
+# Per container: windows built, closing-matter characters and windows left out, windows (and Bedrock calls)
+# not sent after section_complete
+_scan_counts = {"windows": 0, "closing_chars": 0, "skipped_closing": 0, "skipped_complete": 0, "calls_saved": 0}
+_scan_counts_lock = threading.Lock()
+
+
+def scan_stats() -> dict:
+    """Window scan counts for this container: built, closing matter left out, not sent after section_complete.
+
+    calls_saved counts the Bedrock calls the skipped windows would have made.
+    """
+    with _scan_counts_lock:
+        return dict(_scan_counts)
+
+
+def _scan_windows(  # noqa: PLR0913
+    process, chunks: list[str], window_size: int, chunk_ranges, label: str, *, calls_per_window: int = 1
+) -> list:
+    """Run `process` over the windows in order, stopping once a window reports section_complete.
+
+    Trailing closing matter (sections.content_chunks) is never windowed. The
+    remaining windows are sent in waves of SCAN_WAVE; after a wave in which
+    some window's result has section_complete, the later windows are not
+    sent. Most pleadings have only a handful of windows, so a wave as wide
+    as bedrock.MAX_CONCURRENCY would rarely leave any out.
+
+    Args:
+        calls_per_window: Bedrock calls `process` makes per window, for the calls_saved count
+
+    Returns:
+        Results of the windows that were sent, in window order
+    """
+    all_windows = sections.windows(chunks, window_size, chunk_ranges)
+    trimmed = sections.content_chunks(chunks)
+    closing_chars = sum(len(chunk) for chunk in chunks) - sum(len(chunk) for chunk in trimmed)
+    windows = sections.windows(trimmed, window_size, chunk_ranges)
+    wave = max(SCAN_WAVE, 1)
+
+    results = []
+    for start in range(0, len(windows), wave):
+        wave_results = bedrock.run_concurrently(process, windows[start : start + wave])
+        results.extend(wave_results)
+        if any(result.get("section_complete") for result in wave_results):
+            break
+
+    skipped_closing = len(all_windows) - len(windows)
+    skipped_complete = len(windows) - len(results)
+    if closing_chars or skipped_complete:
+        logger.info(
+            f"{label}: sent {len(results)} of {len(all_windows)} windows "
+            f"({closing_chars} characters / {skipped_closing} windows of closing matter left out, "
+            f"{skipped_complete} windows / {skipped_complete * calls_per_window} calls after section_complete)"
+        )
+    with _scan_counts_lock:
+        _scan_counts["windows"] += len(all_windows)
+        _scan_counts["closing_chars"] += closing_chars
+        _scan_counts["skipped_closing"] += skipped_closing
+        _scan_counts["skipped_complete"] += skipped_complete
+        _scan_counts["calls_saved"] += skipped_complete * calls_per_window
+    return results
+
+
+def process_defense_pool_window(window_text: str) -> dict:
+    """Extract every affirmative defense in one window of the answer, whichever claims it answers."""
     tools = [
         {
-            "name": "extract_defenses_and_context",
-            "description": "Extract affirmative defenses and update analysis context",
+            "name": "extract_defenses",
+            "description": "Extract affirmative defenses",
             "input_schema": {
                 "type": "object",
                 "properties": {
-                    "updated_context": {
-                        "type": "string",
-                        "description": "Brief summary of what's been analyzed so far",
-                    },
                     "defenses": {
                         "type": "array",
                         "items": {
@@ -31,35 +105,40 @@ def process_defense_window(claim_context: str, previous_context: str, window_tex
                                     "type": "string",
                                     "description": "Normalized defense name (e.g., 'Statute of Limitations')",
                                 },
+                                "scope": {
+                                    "type": "string",
+                                    "description": "Counts or claims the defense is limited to as pleaded (e.g., 'Count II'); empty if not limited",  # noqa: E501
+                                },
                             },
-                            "required": ["raw_text", "name"],
+                            "required": ["raw_text", "name", "scope"],
                         },
                     },
+                    "section_complete": {
+                        "type": "boolean",
+                        "description": "True if the affirmative defenses have ended in this window and no more are expected after it",  # noqa: E501
+                    },
                 },
-                "required": ["updated_context", "defenses"],
+                "required": ["defenses", "section_complete"],
             },
         }
     ]
 
+    model = models.for_task("extraction_window")
     body = json.dumps(
         {
             "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": 1000,
+            "max_tokens": model.max_tokens,
             "tools": tools,
-            "tool_choice": {"type": "tool", "name": "extract_defenses_and_context"},
+            "tool_choice": {"type": "tool", "name": "extract_defenses"},
             "messages": [
                 {
                     "role": "user",
                     "content": f"""You are analyzing a defendant's answer document to extract affirmative defenses.
 
-Claim being defended: {claim_context}
-
-Previous context: {previous_context}
-
 Current window:
 {window_text}
 
-Extract any affirmative defenses from this window that relate to the claim. Look for:
+Extract every affirmative defense in this window, whichever claims it answers. Look for:
 - Numbered affirmative defenses (e.g., "FIRST AFFIRMATIVE DEFENSE", "1. Statute of Limitations")
 - Sections labeled "AFFIRMATIVE DEFENSES"
 - Defense arguments like: failure to state a claim, statute of limitations, laches, waiver, estoppel, contributory negligence, assumption of risk, etc.
@@ -68,46 +147,45 @@ Extract any affirmative defenses from this window that relate to the claim. Look
 For each defense found, provide:
 - raw_text: exact heading/text as written
 - name: normalized defense name
+- scope: the counts or claims it is limited to if the answer says so (e.g., "as to Count II"), otherwise empty
 
-Also update the context paragraph to summarize what defenses you've seen so far.""",  # noqa: E501
+Set section_complete to true only if the defenses have clearly ended by the end of this window (e.g., it reaches the prayer, signature block or certificate of service) and nothing later in the answer can add one.""",  # noqa: E501
                 }
             ],
         }
     )
 
-    response = bedrock.invoke_model(
+    response_body = bedrock.invoke_model(
         body=body,
-        modelId="us.anthropic.claude-3-5-sonnet-20241022-v2:0",
-        accept="application/json",
-        contentType="application/json",
+        model_id=model.model_id,
+        fallback_model_id=model.fallback_model_id,
+        call_site="process_defense_pool_window",
     )
 
-    response_body = json.loads(response.get("body").read())
-
     # Extract tool use result
     for item in response_body.get("content", []):
         if item.get("type") == "tool_use":
             return item["input"]
 
     # Fallback if no tool use found
-    return {"updated_context": previous_context, "defenses": []}
+    return {"defenses": []}
 
 
-def process_damages_window(claim_context: str, previous_context: str, window_text: str, claim_type: str) -> dict:
-    """Extract damages from one window of text."""
+def process_damages_window(claim_context: str, window_text: str, claim_type: str) -> dict:
+    """Extract damages from one window of text.
+
+    Windows are sent concurrently, so no window sees what an earlier one found;
+    the claim context is all each prompt carries besides its own text.
+    """
     party = "plaintiff" if claim_type == "claims" else "counterclaimant/defendant"
 
     tools = [
         {
-            "name": "extract_damages_and_context",
-            "description": "Extract requested damages and update analysis context",
+            "name": "extract_damages",
+            "description": "Extract requested damages",
             "input_schema": {
                 "type": "object",
                 "properties": {
-                    "updated_context": {
-                        "type": "string",
-                        "description": "Brief summary of what's been analyzed so far",
-                    },
                     "damages": {
                         "type": "object",
                         "properties": {
@@ -139,18 +217,23 @@ def process_damages_window(claim_context: str, previous_context: str, window_tex
                         },
                         "required": ["compensatory", "punitive", "statutory", "equitable", "other"],
                     },
+                    "section_complete": {
+                        "type": "boolean",
+                        "description": "True if the pleading's requests for relief have ended in this window and none are expected after it",  # noqa: E501
+                    },
                 },
-                "required": ["updated_context", "damages"],
+                "required": ["damages", "section_complete"],
             },
         }
     ]
 
+    model = models.for_task("extraction_window")
     body = json.dumps(
         {
             "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": 1500,
+            "max_tokens": model.max_tokens,
             "tools": tools,
-            "tool_choice": {"type": "tool", "name": "extract_damages_and_context"},
+            "tool_choice": {"type": "tool", "name": "extract_damages"},
             "messages": [
                 {
                     "role": "user",
@@ -158,8 +241,6 @@ def process_damages_window(claim_context: str, previous_context: str, window_tex
 
 Claim being analyzed: {claim_context}
 
-Previous context: {previous_context}
-
 Current window:
 {window_text}
 
@@ -178,35 +259,30 @@ Categorize damages as:
 
 For each damage item, provide a clear description (e.g., "$50,000 in compensatory damages", "injunctive relief", "attorney's fees").
 
-Also update the context paragraph to summarize what damages you've seen so far.""",  # noqa: E501
+Set section_complete to true only if the requests for relief have clearly ended by the end of this window (e.g., it reaches the signature block, certificate of service or exhibit list) and nothing later in the pleading can add any.""",  # noqa: E501
                 }
             ],
         }
     )
 
-    response = bedrock.invoke_model(
+    response_body = bedrock.invoke_model(
         body=body,
-        modelId="us.anthropic.claude-3-5-sonnet-20241022-v2:0",
-        accept="application/json",
-        contentType="application/json",
+        model_id=model.model_id,
+        fallback_model_id=model.fallback_model_id,
+        call_site="process_damages_window",
     )
 
-    response_body = json.loads(response.get("body").read())
-
     # Extract tool use result
     for item in response_body.get("content", []):
         if item.get("type") == "tool_use":
             return item["input"]
 
     # Fallback if no tool use found
-    return {
-        "updated_context": previous_context,
-        "damages": {"compensatory": [], "punitive": [], "statutory": [], "equitable": [], "other": []},
-    }
+    return {"damages": {"compensatory": [], "punitive": [], "statutory": [], "equitable": [], "other": []}}
 
 
 def deduplicate_defenses(defenses: list[dict]) -> list[dict]:
-    """Deduplicate defenses using LLM to identify same defenses with different text.
+    """Deduplicate defenses, grouping obvious duplicates locally and asking the LLM only about close calls.
 
     Args:
         defenses: List of {'raw_text': str, 'name': str} dicts
@@ -221,6 +297,32 @@ def deduplicate_defenses(defenses: list[dict]) -> list[dict]:
     if len(defenses) == 1:
         return defenses
 
+    groups, ambiguous = dedup.group(defenses, key=lambda d: d.get("name", ""))
+    # Keep the most complete raw text of each group as its representative
+    representatives = [
+        {
+            "name": dedup.most_common([d.get("name", "") for d in g]),
+            "raw_text": max((d.get("raw_text", "") for d in g), key=len),
+        }
+        for g in groups
+    ]
+    if not ambiguous:
+        return representatives
+
+    pending = {i for cluster in ambiguous for i in cluster}
+    settled = [d for i, d in enumerate(representatives) if i not in pending]
+    return settled + _llm_group_defenses([representatives[i] for i in sorted(pending)])
+
+
+def _llm_group_defenses(defenses: list[dict]) -> list[dict]:
+    """Ask the LLM which defenses are the same affirmative defense.
+
+    Args:
+        defenses: List of {'raw_text': str, 'name': str} dicts
+
+    Returns:
+        List of {'raw_text': str, 'name': str} dicts (deduplicated)
+    """
     tools = [
         {
             "name": "group_duplicate_defenses",
@@ -251,10 +353,11 @@ def deduplicate_defenses(defenses: list[dict]) -> list[dict]:
     # Format defenses for the prompt
     defenses_text = "\n".join([f"{i+1}. Name: {d['name']}, Raw: {d['raw_text']}" for i, d in enumerate(defenses)])
 
+    model = models.for_task("dedup")
     body = json.dumps(
         {
             "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": 2000,
+            "max_tokens": model.max_tokens,
             "tools": tools,
             "tool_choice": {"type": "tool", "name": "group_duplicate_defenses"},
             "messages": [
@@ -281,15 +384,13 @@ Return grouped defenses with:
         }
     )
 
-    response = bedrock.invoke_model(
+    response_body = bedrock.invoke_model(
         body=body,
-        modelId="us.anthropic.claude-3-5-sonnet-20241022-v2:0",
-        accept="application/json",
-        contentType="application/json",
+        model_id=model.model_id,
+        fallback_model_id=model.fallback_model_id,
+        call_site="deduplicate_defenses",
     )
 
-    response_body = json.loads(response.get("body").read())
-
     # Extract tool use result
     for item in response_body.get("content", []):
         if item.get("type") == "tool_use":
@@ -299,46 +400,161 @@ Return grouped defenses with:
     return defenses
 
 
-def extract_raw_defenses_for_claim(claim_context: str, answer_chunks: list[str], window_size: int = 3) -> list[dict]:
-    """Extract defenses for a specific claim using sliding window.
+def extract_defense_pool(
+    answer_chunks: list[str],
+    window_size: int = 3,
+    chunk_ranges: list[tuple[int, int]] | None = None,
+    pool_key: str | None = None,
+) -> list[dict]:
+    """Extract and deduplicate the answer's affirmative defenses once, for every claim.
+
+    Affirmative defenses are usually pleaded once for the whole complaint, so
+    the answer windows are read once per answer rather than once per claim.
+    Pools are kept per container under `pool_key` (the answer chunks'
+    identity, see chunk_store.identity); the window prompts do not depend on
+    the claim, so the Bedrock response cache also shares them across containers.
 
     Args:
-        claim_context: Description of the claim being defended against
         answer_chunks: List of text chunks from answer document
         window_size: Number of chunks to process at once
+        chunk_ranges: Inclusive chunk ranges to read (from the section index); None reads every chunk
+        pool_key: Cache key for the pool; None disables the per-container cache
+
+    Returns:
+        List of {'raw_text': str, 'name': str, 'scope': str} dicts (deduplicated)
+    """
+    cache_key = f"{pool_key}|{chunk_ranges}" if pool_key else None
+    with _defense_pools_lock:
+        if cache_key in _defense_pools:
+            _defense_pools.move_to_end(cache_key)
+            return _defense_pools[cache_key]
+
+    results = _scan_windows(process_defense_pool_window, answer_chunks, window_size, chunk_ranges, "Defense pool")
+
+    all_defenses = [d for result in results for d in result.get("defenses", [])]
+    scopes: dict[str, str] = {}
+    for d in all_defenses:
+        if d.get("scope"):
+            scopes.setdefault(d.get("raw_text", ""), d["scope"])
+    pool = [
+        {"raw_text": d.get("raw_text", ""), "name": d.get("name", ""), "scope": scopes.get(d.get("raw_text", ""), "")}
+        for d in deduplicate_defenses(
+            [{"raw_text": d.get("raw_text", ""), "name": d.get("name", "")} for d in all_defenses]
+        )
+    ]
+
+    if cache_key:
+        with _defense_pools_lock:
+            _defense_pools[cache_key] = pool
+            while len(_defense_pools) > DEFENSE_POOL_ITEMS:
+                _defense_pools.popitem(last=False)
+    return pool
+
+
+def attribute_defenses(claim_context: str, pool: list[dict]) -> list[dict]:
+    """Pick the pooled defenses asserted against one claim with a single classification call.
+
+    Args:
+        claim_context: Description of the claim being defended against
+        pool: Output of extract_defense_pool
 
     Returns:
         List of {'raw_text': str, 'name': str} dicts
     """
-    all_defenses = []
-    current_context = f"Beginning analysis of answer for defenses to: {claim_context}"
+    if not pool:
+        return []
 
-    # Slide through chunks with overlap
-    for i in range(0, len(answer_chunks), window_size - 1):
-        window_chunks = answer_chunks[i : i + window_size]
-        window_text = "\n".join(window_chunks)
+    tools = [
+        {
+            "name": "select_defenses",
+            "description": "Select the defenses asserted against the claim",
+            "input_schema": {
+                "type": "object",
+                "properties": {
+                    "defense_numbers": {
+                        "type": "array",
+                        "items": {"type": "integer", "minimum": 1, "maximum": len(pool)},
+                        "description": "Numbers of the defenses that answer this claim",
+                    }
+                },
+                "required": ["defense_numbers"],
+            },
+        }
+    ]
 
-        # Process this window
-        result = process_defense_window(
-            claim_context=claim_context, previous_context=current_context, window_text=window_text
-        )
+    defenses_text = "\n".join(
+        f"{i + 1}. {d['name']}: {d['raw_text']}" + (f" (pleaded as to: {d['scope']})" if d.get("scope") else "")
+        for i, d in enumerate(pool)
+    )
 
-        # Update context for next iteration
-        current_context = result["updated_context"]
+    model = models.for_task("attribution")
+    body = json.dumps(
+        {
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": model.max_tokens,
+            "tools": tools,
+            "tool_choice": {"type": "tool", "name": "select_defenses"},
+            "messages": [
+                {
+                    "role": "user",
+                    "content": f"""A defendant's answer pleads these affirmative defenses:
+{defenses_text}
+
+Claim: {claim_context}
+
+Select every defense the defendant asserts against this claim. Defenses pleaded without a limitation answer every claim they can apply to; a defense pleaded only as to other counts or claims does not answer this one.""",  # noqa: E501
+                }
+            ],
+        }
+    )
 
-        # Collect defenses found in this window
-        all_defenses.extend(result["defenses"])
+    response_body = bedrock.invoke_model(
+        body=body,
+        model_id=model.model_id,
+        fallback_model_id=model.fallback_model_id,
+        call_site="attribute_defenses",
+    )
+
+    for item in response_body.get("content", []):
+        if item.get("type") == "tool_use":
+            numbers = {
+                n for n in item["input"].get("defense_numbers", []) if isinstance(n, int) and 1 <= n <= len(pool)
+            }
+            return [{"raw_text": pool[n - 1]["raw_text"], "name": pool[n - 1]["name"]} for n in sorted(numbers)]
+
+    # Fallback: every defense applies
+    return [{"raw_text": d["raw_text"], "name": d["name"]} for d in pool]
 
-    # Deduplicate defenses for this claim
-    if all_defenses:
-        deduplicated = deduplicate_defenses(all_defenses)
-        return deduplicated
 
-    return []
+def extract_raw_defenses_for_claim(
+    claim_context: str,
+    answer_chunks: list[str],
+    window_size: int = 3,
+    chunk_ranges: list[tuple[int, int]] | None = None,
+    pool_key: str | None = None,
+) -> list[dict]:
+    """Defenses asserted against a specific claim: the answer's defense pool, attributed to the claim.
+
+    Args:
+        claim_context: Description of the claim being defended against
+        answer_chunks: List of text chunks from answer document
+        window_size: Number of chunks to process at once
+        chunk_ranges: Inclusive chunk ranges to read (from the section index); None reads every chunk
+        pool_key: Cache key for the answer's defense pool (see extract_defense_pool)
+
+    Returns:
+        List of {'raw_text': str, 'name': str} dicts
+    """
+    pool = extract_defense_pool(answer_chunks, window_size, chunk_ranges, pool_key=pool_key)
+    return attribute_defenses(claim_context, pool)
 
 
 def extract_damages_for_claim(
-    claim_context: str, complaint_chunks: list[str], window_size: int = 3, claim_type: str = "claims"
+    claim_context: str,
+    complaint_chunks: list[str],
+    window_size: int = 3,
+    claim_type: str = "claims",
+    chunk_ranges: list[tuple[int, int]] | None = None,
 ) -> dict:
     """Extract damages for a specific claim using sliding window.
 
@@ -347,32 +563,27 @@ def extract_damages_for_claim(
         complaint_chunks: List of text chunks from complaint document
         window_size: Number of chunks to process at once
         claim_type: Either "claims" or "counterclaims"
+        chunk_ranges: Inclusive chunk ranges to read (from the section index); None reads every chunk
 
     Returns:
         Dict with categorized damages
     """
     all_damages = {"compensatory": [], "punitive": [], "statutory": [], "equitable": [], "other": []}
 
-    party = "plaintiff" if claim_type == "claims" else "counterclaimant/defendant"
-    current_context = f"Beginnin analysis of {claim_type} for damages requested by {party} for: {claim_context}"
-
-    # Slide through chunks with overlap
-    for i in range(0, len(complaint_chunks), window_size - 1):
-        window_chunks = complaint_chunks[i : i + window_size]
-        window_text = "\n".join(window_chunks)
-
-        # Process this window
-        result = process_damages_window(
-            claim_context=claim_context,
-            previous_context=current_context,
-            window_text=window_text,
-            claim_type=claim_type,
-        )
-
-        # Update context for next iteration
-        current_context = result["updated_context"]
+    # Windows are processed concurrently (bounded by the shared Bedrock limiter),
+    # each with only the claim context; damages found are merged below
+    results = _scan_windows(
+        lambda window_text: process_damages_window(
+            claim_context=claim_context, window_text=window_text, claim_type=claim_type
+        ),
+        complaint_chunks,
+        window_size,
+        chunk_ranges,
+        "Damages",
+    )
 
-        # Collect damages found in this window
+    # Collect damages found in each window
+    for result in results:
         for category, all_damages_category in all_damages.items():
             all_damages_category.extend(result["damages"].get(category, []))
 
@@ -382,3 +593,188 @@ def extract_damages_for_claim(
             all_damages[category] = list(set(all_damages_category))  # Simple dedup
 
     return all_damages
+
+
+def _claims_listing(claim_contexts: list[str]) -> str:
+    return "\n".join(f"C{i + 1}. {context}" for i, context in enumerate(claim_contexts))
+
+
+def _labels(claim_contexts: list[str]) -> list[str]:
+    return [f"C{i + 1}" for i in range(len(claim_contexts))]
+
+
+def process_batch_damages_window(claim_contexts: list[str], window_text: str, claim_type: str) -> dict:
+    """Extract damages for several claims from one window of text, attributed by claim label (C1, C2, ...)."""
+    party = "plaintiff" if claim_type == "claims" else "counterclaimant/defendant"
+    category_schema = {category: {"type": "array", "items": {"type": "string"}} for category in DAMAGE_CATEGORIES}
+
+    tools = [
+        {
+            "name": "extract_damages_by_claim",
+            "description": "Extract requested damages for each listed claim",
+            "input_schema": {
+                "type": "object",
+                "properties": {
+                    "claims": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "claim": {"type": "string", "enum": _labels(claim_contexts)},
+                                **category_schema,
+                            },
+                            "required": ["claim", *DAMAGE_CATEGORIES],
+                        },
+                    },
+                    "section_complete": {
+                        "type": "boolean",
+                        "description": "True if the pleading's requests for relief have ended in this window and none are expected after it",  # noqa: E501
+                    },
+                },
+                "required": ["claims", "section_complete"],
+            },
+        }
+    ]
+
+    model = models.for_task("extraction_window")
+    body = json.dumps(
+        {
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": model.max_tokens,
+            "tools": tools,
+            "tool_choice": {"type": "tool", "name": "extract_damages_by_claim"},
+            "messages": [
+                {
+                    "role": "user",
+                    "content": f"""You are analyzing a legal complaint to extract damages requested by the {party}.
+
+Claims being analyzed:
+{_claims_listing(claim_contexts)}
+
+Current window:
+{window_text}
+
+For each listed claim, extract the damages and relief requested in this window that relate to that claim. Look for:
+- "WHEREFORE" clauses or prayer for relief sections
+- Specific dollar amounts (e.g., "$50,000", "in excess of $15,000")
+- Types of damages mentioned in the complaint counts
+- Relief requested at the end of each count
+
+Relief requested at the end of a count belongs to that count's claim; a general prayer for relief applies to every claim it covers.
+
+Categorize damages as:
+1. **compensatory**: Actual/compensatory damages, economic losses, lost profits, specific dollar amounts for actual harm
+2. **punitive**: Punitive damages, exemplary damages
+3. **statutory**: Treble damages, statutory damages under specific statutes
+4. **equitable**: Injunctive relief, specific performance, declaratory judgment, rescission
+5. **other**: Attorney's fees, costs, interest, "such other relief as the court deems just"
+
+For each damage item, provide a clear description (e.g., "$50,000 in compensatory damages", "injunctive relief", "attorney's fees"). Only list claims with damages in this window.
+
+Set section_complete to true only if the requests for relief have clearly ended by the end of this window (e.g., it reaches the signature block, certificate of service or exhibit list) and nothing later in the pleading can add any.""",  # noqa: E501
+                }
+            ],
+        }
+    )
+
+    response_body = bedrock.invoke_model(
+        body=body,
+        model_id=model.model_id,
+        fallback_model_id=model.fallback_model_id,
+        call_site="process_batch_damages_window",
+    )
+
+    for item in response_body.get("content", []):
+        if item.get("type") == "tool_use":
+            return item["input"]
+
+    return {"claims": []}
+
+
+def _batches(claim_contexts: list[str]) -> list[tuple[int, list[str]]]:
+    """(offset, contexts) slices of at most BATCH_SIZE claims."""
+    size = max(BATCH_SIZE, 1)
+    return [(start, claim_contexts[start : start + size]) for start in range(0, len(claim_contexts), size)]
+
+
+def extract_damages_for_claims(
+    claim_contexts: list[str],
+    complaint_chunks: list[str],
+    window_size: int = 3,
+    claim_type: str = "claims",
+    chunk_ranges: list[tuple[int, int]] | None = None,
+) -> list[dict]:
+    """Extract damages for several claims in one pass over the windows.
+
+    Each window is sent once per batch of BATCH_SIZE claims, so the number of
+    calls grows with the document length rather than claims x length.
+
+    Args:
+        claim_contexts: Description of each claim
+        complaint_chunks: List of text chunks from complaint document
+        window_size: Number of chunks to process at once
+        claim_type: Either "claims" or "counterclaims"
+        chunk_ranges: Inclusive chunk ranges to read (from the section index); None reads every chunk
+
+    Returns:
+        Categorized damages dict per claim, in claim_contexts order
+    """
+    all_damages = [{category: [] for category in DAMAGE_CATEGORIES} for _ in claim_contexts]
+    batches = _batches(claim_contexts)
+
+    def process_window(window_text: str) -> dict:
+        batch_results = bedrock.run_concurrently(
+            lambda batch: process_batch_damages_window(
+                claim_contexts=batch[1], window_text=window_text, claim_type=claim_type
+            ),
+            batches,
+        )
+        return {
+            "batches": batch_results,
+            "section_complete": any(result.get("section_complete") for result in batch_results),
+        }
+
+    results = _scan_windows(
+        process_window, complaint_chunks, window_size, chunk_ranges, "Batch damages", calls_per_window=len(batches)
+    )
+
+    for window_result in results:
+        for (offset, batch), result in zip(batches, window_result["batches"], strict=True):
+            labels = _labels(batch)
+            for entry in result.get("claims", []):
+                if entry.get("claim") not in labels:
+                    continue
+                damages = all_damages[offset + labels.index(entry["claim"])]
+                for category in DAMAGE_CATEGORIES:
+                    damages[category].extend(entry.get(category) or [])
+
+    # Deduplicate damages in each category
+    for damages in all_damages:
+        for category, values in damages.items():
+            if values:
+                damages[category] = list(set(values))  # Simple dedup
+
+    return all_damages
+
+
+def extract_raw_defenses_for_claims(
+    claim_contexts: list[str],
+    answer_chunks: list[str],
+    window_size: int = 3,
+    chunk_ranges: list[tuple[int, int]] | None = None,
+    pool_key: str | None = None,
+) -> list[list[dict]]:
+    """Defenses for several claims: one pass over the answer windows, then one attribution call per claim.
+
+    Args:
+        claim_contexts: Description of each claim being defended against
+        answer_chunks: List of text chunks from answer document
+        window_size: Number of chunks to process at once
+        chunk_ranges: Inclusive chunk ranges to read (from the section index); None reads every chunk
+        pool_key: Cache key for the answer's defense pool (see extract_defense_pool)
+
+    Returns:
+        [{'raw_text': str, 'name': str}, ...] per claim, in claim_contexts order
+    """
+    pool = extract_defense_pool(answer_chunks, window_size, chunk_ranges, pool_key=pool_key)
+    return bedrock.run_concurrently(lambda claim_context: attribute_defenses(claim_context, pool), claim_contexts)
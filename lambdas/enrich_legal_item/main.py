@@ -1,99 +1,247 @@
-import gzip
-import json
 import logging
-
-import boto3
+import time
 
 # Import logic from the local 'enrichment_processing.py' file
 import enrichment_processing
+from jury_common import bedrock, chunk_store, models, sections
+from jury_common.usage_ledger import ledger
 
 # Set up logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-s3 = boto3.client("s3")
 
+def _claim_context(item: dict) -> str:
+    """Context string for an item, used in prompts."""
+    if item.get("claim_id"):
+        return f"Claim ID {item['claim_id']}: {', '.join(item['raw_texts'])}"
+    return f"Unmatched claim: {', '.join(item['raw_texts'])}"
+
+
+def _run_timed(pipelines: dict) -> tuple[dict, dict]:
+    """Run independent pipelines concurrently and time each one.
+
+    Every pipeline fans its windows out through bedrock.run_concurrently, so
+    together they stay bounded by the container's shared Bedrock limiter.
+
+    Args:
+        pipelines: Name -> zero-argument callable
+
+    Returns:
+        (results, timings): results by name; timings in whole milliseconds by
+        name plus 'total' (wall clock for all of them)
+    """
+    started = time.perf_counter()
+
+    def timed(name):
+        start = time.perf_counter()
+        result = pipelines[name]()
+        return result, round((time.perf_counter() - start) * 1000)
+
+    outcomes = dict(zip(pipelines, bedrock.run_concurrently(timed, list(pipelines)), strict=True))
+    timings = {name: elapsed_ms for name, (_, elapsed_ms) in outcomes.items()}
+    timings["total"] = round((time.perf_counter() - started) * 1000)
+    return {name: result for name, (result, _) in outcomes.items()}, timings
 
-def _load_chunks(maybe_chunks):
-    if isinstance(maybe_chunks, list):
-        return maybe_chunks
-    if isinstance(maybe_chunks, dict):
-        compression = maybe_chunks.get("Compression")
-        s3obj = maybe_chunks.get("S3Object") or maybe_chunks
-        if isinstance(s3obj, dict) and "Bucket" in s3obj and "Key" in s3obj:
-            obj = s3.get_object(Bucket=s3obj["Bucket"], Key=s3obj["Key"])
-            body = obj["Body"].read()
-            if compression == "gzip" or s3obj["Key"].endswith(".gz"):
-                body = gzip.decompress(body)
-            chunks = json.loads(body.decode("utf-8"))
-            if not isinstance(chunks, list):
-                raise ValueError("Loaded chunks is not a list")
-            return chunks
-    raise ValueError("Invalid chunks input; expected list or S3 pointer dict")
 
+def _enrich_batch(  # noqa: PLR0913
+    items: list[dict],
+    item_type: str,
+    complaint_chunks: list[str],
+    answer_chunks: list[str],
+    *,
+    complaint_damages_ranges: list[tuple[int, int]] | None,
+    answer_damages_ranges: list[tuple[int, int]] | None,
+    defense_ranges: list[tuple[int, int]] | None,
+    defense_pool_key: str | None,
+) -> tuple[list[dict], list[list[dict]], dict]:
+    """Damages and defenses for every item, walking each document's windows once.
 
-def lambda_handler(event, context):
+    Returns:
+        (damages per item, defenses per item, timings), in item order
+    """
+    claim_contexts = [_claim_context(item) for item in items]
+    if item_type == "claim":
+        logger.info(
+            f"Extracting damages for {len(items)} claims from complaint: "
+            f"{sections.coverage(complaint_damages_ranges, len(complaint_chunks))}"
+        )
+        logger.info(
+            f"Extracting defenses for {len(items)} claims from answer: "
+            f"{sections.coverage(defense_ranges, len(answer_chunks))}"
+        )
+        # The two pipelines read different documents, so they run side by side
+        results, timings = _run_timed(
+            {
+                "damages": lambda: enrichment_processing.extract_damages_for_claims(
+                    claim_contexts,
+                    complaint_chunks,
+                    window_size=3,
+                    claim_type="claims",
+                    chunk_ranges=complaint_damages_ranges,
+                ),
+                "defenses": lambda: enrichment_processing.extract_raw_defenses_for_claims(
+                    claim_contexts,
+                    answer_chunks,
+                    window_size=3,
+                    chunk_ranges=defense_ranges,
+                    pool_key=defense_pool_key,
+                ),
+            }
+        )
+        return results["damages"], results["defenses"], timings
+
+    logger.info(
+        f"Extracting damages for {len(items)} counterclaims from answer: "
+        f"{sections.coverage(answer_damages_ranges, len(answer_chunks))}"
+    )
+    results, timings = _run_timed(
+        {
+            "damages": lambda: enrichment_processing.extract_damages_for_claims(
+                claim_contexts,
+                answer_chunks,
+                window_size=3,
+                claim_type="counterclaims",
+                chunk_ranges=answer_damages_ranges,
+            )
+        }
+    )
+    # Counterclaims don't have defenses (in this workflow)
+    return results["damages"], [[] for _ in items], timings
+
+
+def lambda_handler(event, context):  # noqa: PLR0915
     """
     Enriches a single legal item (claim or counterclaim) with
     its associated damages and defenses.
 
-    Designed to be used in a Step Function Map state.
+    With "items" instead of "item" it enriches a whole list in one pass: each
+    window is sent once for all items (in batches of ENRICH_BATCH_SIZE) and
+    the enriched list is returned in input order. The state machine uses this
+    form; the single-item form is kept for Map-style callers.
+
+    When the chunk pointers
+    carry a section index, damages are read from the COUNT / COUNTERCLAIM and
+    WHEREFORE sections and defenses from the affirmative defenses only
+    (config.use_section_index: false reads every chunk).
+
+    The answer's affirmative defenses are extracted and deduplicated once per
+    answer (kept per container, keyed by the answer chunks' identity) and each
+    claim gets one attribution call choosing from that pool.
+
+    Damages (complaint) and defenses (answer) are extracted concurrently; each
+    enriched item carries 'enrichment_timings_ms' with the time each took.
     """
 
     # 1. Get input from the event
     try:
-        # The 'item' is the single claim/counterclaim from the Map iterator
-        item = event["item"]
+        # Either all claims/counterclaims ('items') or a single one from a Map iterator ('item')
+        batch = "items" in event
+        items = event["items"] if batch else [event["item"]]
         # 'type' tells us how to process it
         item_type = event["type"]  # "claim" or "counterclaim"
 
-        # We also get all chunks
-        complaint_chunks = _load_chunks(event.get("complaint_chunks", []))
-        answer_chunks = _load_chunks(event.get("answer_chunks", []))
+        # Only the documents this item type reads: counterclaims never need the complaint
+        complaint_chunks = chunk_store.load_chunks(event.get("complaint_chunks", [])) if item_type == "claim" else []
+        answer_chunks = chunk_store.load_chunks(event.get("answer_chunks", []))
 
-        if not item or not item_type:
-            raise ValueError("Input event must contain 'item' and 'type'")
+        if not isinstance(items, list) or not item_type or not (batch or items[0]):
+            raise ValueError("Input event must contain 'item' (or an 'items' list) and 'type'")
 
     except (TypeError, KeyError, ValueError) as e:
         logger.error(f"Invalid input event: {e!s}")
         raise ValueError(f"Invalid input: {e!s}") from e
 
-    logger.info(f"Enriching {item_type}: {item.get('claim_id', 'Unmatched')}")
+    # Section index from textract_get_results: chunk ranges each extraction needs
+    complaint_damages_ranges = answer_damages_ranges = defense_ranges = None
+    if (event.get("config") or {}).get("use_section_index", True) is not False:
+        complaint_damages_ranges = sections.chunk_ranges(event.get("complaint_chunks"), sections.CLAIM_DAMAGES_SECTIONS)
+        answer_damages_ranges = sections.chunk_ranges(
+            event.get("answer_chunks"), sections.COUNTERCLAIM_DAMAGES_SECTIONS
+        )
+        defense_ranges = sections.chunk_ranges(event.get("answer_chunks"), sections.DEFENSE_SECTIONS)
+    # The answer's defenses are pooled once per answer and reused by every claim
+    defense_pool_key = chunk_store.identity(event.get("answer_chunks"))
+
+    logger.info(
+        f"Enriching {len(items)} {item_type} items in one pass"
+        if batch
+        else f"Enriching {item_type}: {items[0].get('claim_id', 'Unmatched')}"
+    )
+    if not items:
+        return []
+    ledger.start(stage=f"enrich_legal_item:{item_type}", job_id=event.get("jury_instruction_id"))
+    models.configure(event.get("config"))
 
     # 2. Build the context string (used in prompts)
-    if item.get("claim_id"):
-        claim_context = f"Claim ID {item['claim_id']}: {', '.join(item['raw_texts'])}"
-    else:
-        claim_context = f"Unmatched claim: {', '.join(item['raw_texts'])}"
+    item = items[0]
+    claim_context = _claim_context(item)
 
     # 3. Call processing functions based on type
     try:
-        if item_type == "claim":
+        if batch:
+            all_damages, all_defenses, timings = _enrich_batch(
+                items,
+                item_type,
+                complaint_chunks,
+                answer_chunks,
+                complaint_damages_ranges=complaint_damages_ranges,
+                answer_damages_ranges=answer_damages_ranges,
+                defense_ranges=defense_ranges,
+                defense_pool_key=defense_pool_key,
+            )
+
+        elif item_type == "claim":
             # --- For a PLAINTIFF'S CLAIM ---
 
             # 1. Damages are in the COMPLAINT
-            logger.info("Extracting damages from complaint chunks...")
-            damages = enrichment_processing.extract_damages_for_claim(
-                claim_context=claim_context, complaint_chunks=complaint_chunks, window_size=3, claim_type="claims"
+            logger.info(
+                "Extracting damages from complaint: "
+                f"{sections.coverage(complaint_damages_ranges, len(complaint_chunks))}"
             )
-
             # 2. Defenses are in the ANSWER
-            logger.info("Extracting defenses from answer chunks...")
-            defenses = enrichment_processing.extract_raw_defenses_for_claim(
-                claim_context=claim_context, answer_chunks=answer_chunks, window_size=3
+            logger.info(f"Extracting defenses from answer: {sections.coverage(defense_ranges, len(answer_chunks))}")
+
+            # Both are independent, so they run concurrently
+            results, timings = _run_timed(
+                {
+                    "damages": lambda: enrichment_processing.extract_damages_for_claim(
+                        claim_context=claim_context,
+                        complaint_chunks=complaint_chunks,
+                        window_size=3,
+                        claim_type="claims",
+                        chunk_ranges=complaint_damages_ranges,
+                    ),
+                    "defenses": lambda: enrichment_processing.extract_raw_defenses_for_claim(
+                        claim_context=claim_context,
+                        answer_chunks=answer_chunks,
+                        window_size=3,
+                        chunk_ranges=defense_ranges,
+                        pool_key=defense_pool_key,
+                    ),
+                }
             )
+            damages, defenses = results["damages"], results["defenses"]
 
         else:  # item_type == "counterclaim"
             # --- For a DEFENDANT'S COUNTERCLAIM ---
 
             # 1. Damages are in the ANSWER (with the counterclaim)
-            logger.info("Extracting damages from answer chunks...")
-            damages = enrichment_processing.extract_damages_for_claim(
-                claim_context=claim_context,
-                complaint_chunks=answer_chunks,  # Pass answer chunks
-                window_size=3,
-                claim_type="counterclaims",
+            logger.info(
+                f"Extracting damages from answer: {sections.coverage(answer_damages_ranges, len(answer_chunks))}"
             )
+            results, timings = _run_timed(
+                {
+                    "damages": lambda: enrichment_processing.extract_damages_for_claim(
+                        claim_context=claim_context,
+                        complaint_chunks=answer_chunks,  # Pass answer chunks
+                        window_size=3,
+                        claim_type="counterclaims",
+                        chunk_ranges=answer_damages_ranges,
+                    )
+                }
+            )
+            damages = results["damages"]
 
             # 2. Counterclaims don't have defenses (in this workflow)
             defenses = []
@@ -101,11 +249,24 @@ def lambda_handler(event, context):
     except Exception as e:
         logger.error(f"Failed during enrichment: {e!s}")
         raise RuntimeError(f"Enrichment pipeline failed: {e!s}") from e
+    finally:
+        # Record token/latency/cost usage for this invocation on the job item
+        ledger.flush()
+
+    logger.info(f"Enrichment successful. Timings (ms): {timings}")
+    logger.info(f"Bedrock cache stats: {bedrock.cache_stats()}")
+    logger.info(f"Bedrock executor stats: {bedrock.executor_stats()}")
+    logger.info(f"Chunk store stats: {chunk_store.store.stats()}")
+    logger.info(f"Window scan stats: {enrichment_processing.scan_stats()}")
 
-    # 4. Return the fully enriched item
+    # 4. Return the fully enriched item(s), starting from the originals
+    if batch:
+        return [
+            {**original, "damages": damages, "defenses": defenses, "enrichment_timings_ms": timings}
+            for original, damages, defenses in zip(items, all_damages, all_defenses, strict=True)
+        ]
     enriched_item = item.copy()  # Start with the original item
     enriched_item["damages"] = damages
     enriched_item["defenses"] = defenses
-
-    logger.info("Enrichment successful.")
+    enriched_item["enrichment_timings_ms"] = timings
     return enriched_item
@@ -1,8 +1,76 @@
+from collections import Counter
 import json
+import math
+import re
 
-import boto3
+from jury_common import bedrock, models
 
-bedrock = boto3.client("bedrock-runtime")
+# Summary modes: "serial" refines one summary window by window (each call re-sends
+# the growing summary); "map_reduce" summarizes every window concurrently and merges
+# the partial summaries in a bounded number of rounds.
+SUMMARY_MODES = ("serial", "map_reduce")
+
+# Partial summaries combined by one merge call (raised when needed to stay within MAX_MERGE_ROUNDS)
+MERGE_FAN_IN = 4
+MAX_MERGE_ROUNDS = 3
+
+# --- Window salience ---
+# Captions, signature blocks, service lists and verification pages hold no case
+# facts. Page footers and case numbers (PAGE_NOISE_PATTERN) often land in the
+# middle of a sentence, so only their own text is cut. Each chunk is then split
+# into segments (sentences / lines); segments that match BOILERPLATE_PATTERN
+# and repeat across the documents (running headers, e-filing stamps) are cut,
+# as are segments without a FACT_PATTERN hit that match it or repeat. The rest
+# is windowed, so only that text is sent to Bedrock.
+PAGE_NOISE_PATTERN = re.compile(
+    r"\bPage\s+\d+\s+of\s+\d+\b|\bCASE\s+(?:NO|NUMBER)\b[.:#]?\s*(?:\d[\w-]*(?:\s+CA\s+\d+)?)?",
+    re.IGNORECASE,
+)
+BOILERPLATE_PATTERN = re.compile(
+    "|".join(
+        [
+            r"\bIN\s+THE\s+(?:CIRCUIT|COUNTY|DISTRICT|SUPERIOR)\s+COURT\b",
+            r"\bE-?FILED\b|\bFiling\s+#",
+            r"\bCERTIFICATE\s+OF\s+SERVICE\b|\bI\s+HEREBY\s+CERTIFY\b|\bSERVICE\s+LIST\b",
+            r"\b(?:served|furnished)\s+(?:via|by)\b",
+            r"\bRespectfully\s+submitted\b|^\s*/s/|\bBar\s+(?:No|Number)\b",
+            r"\b(?:Attorneys?|Counsel)\s+for\s+(?:the\s+)?(?:Plaintiff|Defendant)s?\b",
+            r"\b(?:Telephone|Tel|Fax|Facsimile|E-?mail)\s*[:.]",
+            r"[\w.+-]+@[\w-]+\.[\w.]+",
+            r"\bVERIFICATION\b|\bunder\s+penalt(?:y|ies)\s+of\s+perjury\b|\bNotary\s+Public\b",
+            r"\bsworn\s+to\s+(?:and|or)\s+subscribed\b",
+        ]
+    ),
+    re.IGNORECASE | re.MULTILINE,
+)
+FACT_PATTERN = re.compile(
+    "|".join(
+        [
+            r"\$\s?\d",
+            r"\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\.?\s+\d",
+            r"\b\d{1,2}/\d{1,2}/\d{2,4}\b",
+            r"\bon\s+or\s+about\b",
+            r"\b(?:agreement|contract|lease|loan|note|invoice|payment|paid|owed?|debt|property|premises|vehicle)\b",
+            r"\b(?:breach\w*|fail\w*|refus\w*|damag\w*|injur\w*|deny|deni\w*|admit\w*|alleg\w*|entered\s+into)\b",
+            r"\bwithout\s+knowledge\b",
+        ]
+    ),
+    re.IGNORECASE,
+)
+_SEGMENT_SPLIT = re.compile(r"(?<=[.!?;])\s+|\n+")
+# A segment found in this many chunks across the documents is a running header/footer
+REPEATED_SEGMENT_COUNT = 3
+# Rough token estimate for the skipped-token statistic
+TOKENS_PER_WORD = 1.3
+
+FACTS_INSTRUCTION = """Write 2-3 paragraphs covering:
+- Who the parties are and their relationship
+- What contract/agreement exists (if any)
+- What happened (key events, timeline)
+- What the plaintiff alleges
+- What the defendant's position is
+
+Write in past tense, neutral tone."""
 
 
 def update_case_facts(current_facts, new_content, source):
@@ -35,14 +103,7 @@ def update_case_facts(current_facts, new_content, source):
     ]
 
     if not current_facts:
-        instruction = """Start building a case facts summary. Write 2-3 paragraphs covering:
-- Who the parties are and their relationship
-- What contract/agreement exists (if any)
-- What happened (key events, timeline)
-- What the plaintiff alleges
-- What the defendant's position is
-
-Write in past tense, neutral tone."""
+        instruction = f"Start building a case facts summary. {FACTS_INSTRUCTION}"
     else:
         instruction = """Update the existing case facts by:
 - ADDING new relevant information you see
@@ -66,25 +127,24 @@ NEW CONTENT from {source}:
 
 {instruction}"""
 
+    model = models.for_task("extraction_window")
     body = json.dumps(
         {
             "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": 1500,
+            "max_tokens": model.max_tokens,
             "tools": tools,
             "tool_choice": {"type": "tool", "name": "update_facts"},
             "messages": [{"role": "user", "content": prompt}],
         }
     )
 
-    response = bedrock.invoke_model(
+    response_body = bedrock.invoke_model(
         body=body,
-        modelId="us.anthropic.claude-3-5-sonnet-20241022-v2:0",
-        accept="application/json",
-        contentType="application/json",
+        model_id=model.model_id,
+        fallback_model_id=model.fallback_model_id,
+        call_site="update_case_facts",
     )
 
-    response_body = json.loads(response.get("body").read())
-
     # Extract tool use result
     for item in response_body.get("content", []):
         if item.get("type") == "tool_use":
@@ -94,7 +154,282 @@ NEW CONTENT from {source}:
     return current_facts
 
 
-def extract_case_facts(complaint_chunks, answer_chunks, witness_chunks=None):
+def summarize_window(content, source):
+    """
+    Map step: summarize the case facts in one window, independently of the others
+
+    Args:
+        content: Window of document text
+        source: Source document name for context
+
+    Returns:
+        str: Factual notes for this window (empty if it holds no case facts)
+    """
+    tools = [
+        {
+            "name": "summarize_facts",
+            "description": "Summarize the case facts found in this document excerpt",
+            "input_schema": {
+                "type": "object",
+                "properties": {
+                    "facts": {
+                        "type": "string",
+                        "description": "Concise factual notes from this excerpt; empty if it has none",
+                    }
+                },
+                "required": ["facts"],
+            },
+        }
+    ]
+
+    prompt = f"""You are collecting case facts for jury instructions from one excerpt of the {source}.
+
+EXCERPT from {source}:
+{content}
+
+---
+
+Write concise notes of the case facts in this excerpt: the parties and their relationship, any contract/agreement, key events with dates and amounts, what the plaintiff alleges and the defendant's position. Attribute allegations and denials to the party making them. Leave out procedural boilerplate (captions, signature blocks, certificates of service). Return an empty string if the excerpt holds no case facts."""  # noqa: E501
+
+    model = models.for_task("extraction_window")
+    body = json.dumps(
+        {
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": model.max_tokens,
+            "tools": tools,
+            "tool_choice": {"type": "tool", "name": "summarize_facts"},
+            "messages": [{"role": "user", "content": prompt}],
+        }
+    )
+
+    response_body = bedrock.invoke_model(
+        body=body,
+        model_id=model.model_id,
+        fallback_model_id=model.fallback_model_id,
+        call_site="summarize_window",
+    )
+
+    for item in response_body.get("content", []):
+        if item.get("type") == "tool_use":
+            return item["input"]["facts"]
+
+    return ""
+
+
+def merge_summaries(summaries, final):
+    """
+    Reduce step: merge partial case facts summaries, given in document order
+
+    Args:
+        summaries: List of (source, summary) tuples
+        final: True for the last round, which writes the 2-3 paragraph summary
+
+    Returns:
+        str: Merged summary
+    """
+    tools = [
+        {
+            "name": "merge_facts",
+            "description": "Merge partial case facts summaries into one",
+            "input_schema": {
+                "type": "object",
+                "properties": {
+                    "merged_facts": {
+                        "type": "string",
+                        "description": "The merged case facts summary",
+                    }
+                },
+                "required": ["merged_facts"],
+            },
+        }
+    ]
+
+    parts = "\n\n".join(f"PART {i + 1} (from {source}):\n{summary}" for i, (source, summary) in enumerate(summaries))
+    if final:
+        instruction = f"Merge these partial summaries into the final case facts summary. {FACTS_INSTRUCTION}"
+    else:
+        instruction = """Merge these partial summaries into one set of concise factual notes:
+- Keep every distinct fact, date and amount
+- Combine repeated facts
+- Where parts conflict, keep both positions and attribute each to its party"""
+
+    prompt = f"""You are building a case facts summary for jury instructions from partial summaries of consecutive parts of the case documents.
+
+{parts}
+
+---
+
+{instruction}"""  # noqa: E501
+
+    model = models.for_task("extraction_window")
+    body = json.dumps(
+        {
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": model.max_tokens,
+            "tools": tools,
+            "tool_choice": {"type": "tool", "name": "merge_facts"},
+            "messages": [{"role": "user", "content": prompt}],
+        }
+    )
+
+    response_body = bedrock.invoke_model(
+        body=body,
+        model_id=model.model_id,
+        fallback_model_id=model.fallback_model_id,
+        call_site="merge_summaries",
+    )
+
+    for item in response_body.get("content", []):
+        if item.get("type") == "tool_use":
+            return item["input"]["merged_facts"]
+
+    # Fallback if no tool use found: keep the parts as they are
+    return "\n\n".join(summary for _, summary in summaries)
+
+
+def _windows(chunks):
+    """Windows of 3 chunks, overlapping by one."""
+    return ["\n".join(chunks[i : i + 3]) for i in range(0, len(chunks), 2)]
+
+
+def _documents(complaint_chunks, answer_chunks, witness_chunks):
+    """(source, chunks) pairs in document order: complaint, answer, witness list."""
+    return [("complaint", complaint_chunks), ("answer", answer_chunks), ("witness list", witness_chunks or [])]
+
+
+def _source_windows(documents):
+    """(source, window) pairs in document order."""
+    return [(source, window) for source, chunks in documents for window in _windows(chunks)]
+
+
+def _pieces(text):
+    """(segment, separator) pairs that together make up text."""
+    pieces, start = [], 0
+    for m in _SEGMENT_SPLIT.finditer(text):
+        pieces.append((text[start : m.start()], m.group()))
+        start = m.end()
+    pieces.append((text[start:], ""))
+    return pieces
+
+
+def _segments(text):
+    return [segment.strip() for segment, _ in _pieces(text) if segment.strip()]
+
+
+def _is_boilerplate(segment, repeated):
+    is_repeated = segment.lower() in repeated
+    if BOILERPLATE_PATTERN.search(segment):
+        # A repeated stamp/header is cut even with a date in it
+        return is_repeated or not FACT_PATTERN.search(segment)
+    # Repeats include short answers ("Admitted.", "Denied.") that carry the defendant's position
+    return is_repeated and not FACT_PATTERN.search(segment)
+
+
+def strip_boilerplate(documents):
+    """
+    Cut boilerplate segments out of every chunk, keeping the rest of its text
+
+    Page footers and case numbers are cut out of the text around them first.
+    Repeats are counted once per chunk, so the overlap between windows does
+    not count a segment twice. A document left with no text at all keeps its
+    original chunks, so a short filing that is all caption and signature block
+    still reaches the model.
+
+    Args:
+        documents: (source, chunks) pairs
+
+    Returns:
+        tuple: (stripped (source, chunks) pairs without empty chunks, statistics dict)
+    """
+    words = Counter()
+    stripped_words = Counter()
+    cleaned = []
+    for source, chunks in documents:
+        for chunk in chunks:
+            words[source] += len(chunk.split())
+            stripped_words[source] += sum(len(m.group().split()) for m in PAGE_NOISE_PATTERN.finditer(chunk))
+        cleaned.append([PAGE_NOISE_PATTERN.sub("", chunk) for chunk in chunks])
+    counts = Counter(segment.lower() for chunks in cleaned for chunk in chunks for segment in set(_segments(chunk)))
+    repeated = frozenset(segment for segment, n in counts.items() if n >= REPEATED_SEGMENT_COUNT)
+
+    stripped_documents = []
+    for (source, chunks), cleaned_chunks in zip(documents, cleaned, strict=True):
+        stripped_chunks = []
+        for chunk in cleaned_chunks:
+            kept = []
+            for segment, separator in _pieces(chunk):
+                count = len(segment.split())
+                if count and _is_boilerplate(segment.strip(), repeated):
+                    stripped_words[source] += count
+                    # Keep line breaks so the remaining text keeps its layout
+                    kept.append("\n" if "\n" in separator else "")
+                else:
+                    kept.append(segment + separator)
+            text = re.sub(r"\n{3,}", "\n\n", "".join(kept)).strip()
+            if text:
+                stripped_chunks.append(text)
+        if chunks and not stripped_chunks:
+            stripped_chunks, stripped_words[source] = chunks, 0
+        stripped_documents.append((source, stripped_chunks))
+
+    windows_before = len(_source_windows(documents))
+    windows_after = len(_source_windows(stripped_documents))
+    total_stripped = sum(stripped_words.values())
+    stats = {
+        "words": sum(words.values()),
+        "words_stripped": total_stripped,
+        "tokens_stripped_estimate": round(total_stripped * TOKENS_PER_WORD),
+        "stripped_by_source": {source: n for source, n in stripped_words.items() if n},
+        "windows": windows_before,
+        "windows_skipped": windows_before - windows_after,
+    }
+    return stripped_documents, stats
+
+
+def map_reduce_case_facts(source_windows):
+    """
+    Map-reduce case facts: summarize every window concurrently, then merge the
+    partial summaries in rounds of MERGE_FAN_IN (at most MAX_MERGE_ROUNDS)
+
+    Latency grows with the number of merge rounds rather than the document
+    length, and no call re-sends a growing summary.
+
+    Args:
+        source_windows: (source, window) pairs in document order
+
+    Returns:
+        str: 2-3 paragraph case facts summary
+    """
+    if not source_windows:
+        return ""
+    print(f"Summarizing {len(source_windows)} windows...")
+    notes = bedrock.run_concurrently(lambda pair: summarize_window(pair[1], pair[0]), source_windows)
+    partials = [(source, note) for (source, _), note in zip(source_windows, notes, strict=True) if note.strip()]
+    if not partials:
+        return ""
+
+    # Wide enough that the merge always finishes within MAX_MERGE_ROUNDS
+    fan_in = max(MERGE_FAN_IN, math.ceil(len(partials) ** (1 / MAX_MERGE_ROUNDS)))
+    round_number = 0
+    while True:
+        round_number += 1
+        final = len(partials) <= fan_in
+        groups = [partials[i : i + fan_in] for i in range(0, len(partials), fan_in)]
+        print(f"Merge round {round_number}: {len(partials)} summaries in {len(groups)} groups...")
+        merged = bedrock.run_concurrently(lambda group, final=final: merge_summaries(group, final), groups)
+        if final:
+            print("Case facts extraction complete!")
+            return merged[0]
+        # Keep each merged group's sources for the next round's part labels
+        partials = [
+            (" + ".join(dict.fromkeys(source for source, _ in group)), summary)
+            for group, summary in zip(groups, merged, strict=True)
+        ]
+
+
+def extract_case_facts(  # noqa: PLR0913
+    complaint_chunks, answer_chunks, witness_chunks=None, mode="serial", *, skip_boilerplate=True, stats=None
+):
     """
     Extract case facts by sliding over document chunks and iteratively
     building/refining a 2-3 paragraph summary
@@ -103,30 +438,36 @@ def extract_case_facts(complaint_chunks, answer_chunks, witness_chunks=None):
         complaint_chunks: List of text chunks from complaint
         answer_chunks: List of text chunks from answer/counterclaim
         witness_chunks: Optional list of text chunks from witness list
+        mode: "serial" (refine one summary window by window) or "map_reduce"
+            (concurrent window summaries merged in rounds)
+        skip_boilerplate: Cut caption/signature/service text out of the chunks first (strip_boilerplate)
+        stats: Optional dict, filled with the boilerplate stripping statistics
 
     Returns:
         str: 2-3 paragraph case facts summary
     """
-    case_facts = ""
+    documents = _documents(complaint_chunks, answer_chunks, witness_chunks)
+    if skip_boilerplate:
+        documents, boilerplate_stats = strip_boilerplate(documents)
+        print(
+            f"Stripped {boilerplate_stats['words_stripped']} of {boilerplate_stats['words']} words as boilerplate "
+            f"(~{boilerplate_stats['tokens_stripped_estimate']} tokens, "
+            f"{boilerplate_stats['windows_skipped']} of {boilerplate_stats['windows']} windows saved)"
+        )
+        if stats is not None:
+            stats.update(boilerplate_stats)
+    source_windows = _source_windows(documents)
 
-    # Process complaint chunks
-    print("Processing complaint...")
-    for i in range(0, len(complaint_chunks), 2):  # sliding window with overlap
-        window = "\n".join(complaint_chunks[i : i + 3])
-        case_facts = update_case_facts(case_facts, window, "complaint")
-
-    # Process answer chunks
-    print("Processing answer...")
-    for i in range(0, len(answer_chunks), 2):
-        window = "\n".join(answer_chunks[i : i + 3])
-        case_facts = update_case_facts(case_facts, window, "answer")
-
-    # Process witness list if provided
-    if witness_chunks:
-        print("Processing witness list...")
-        for i in range(0, len(witness_chunks), 2):
-            window = "\n".join(witness_chunks[i : i + 3])
-            case_facts = update_case_facts(case_facts, window, "witness list")
+    if mode == "map_reduce":
+        return map_reduce_case_facts(source_windows)
+
+    case_facts = ""
+    current_source = None
+    for source, window in source_windows:  # sliding windows with overlap, document by document
+        if source != current_source:
+            print(f"Processing {source}...")
+            current_source = source
+        case_facts = update_case_facts(case_facts, window, source)
 
     print("Case facts extraction complete!")
     return case_facts
@@ -1,43 +1,23 @@
-import gzip
-import json
 import logging
 
-import boto3
-
 # Import logic from the local 'case_facts_processing.py' file
 import case_facts_processing
+from jury_common import bedrock, chunk_store, models
+from jury_common.usage_ledger import ledger
 
 # Set up logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-s3 = boto3.client("s3")
-
-
-def _load_chunks(maybe_chunks):
-    if isinstance(maybe_chunks, list):
-        return maybe_chunks
-    if isinstance(maybe_chunks, dict):
-        compression = maybe_chunks.get("Compression")
-        s3obj = maybe_chunks.get("S3Object") or maybe_chunks
-        if isinstance(s3obj, dict) and "Bucket" in s3obj and "Key" in s3obj:
-            obj = s3.get_object(Bucket=s3obj["Bucket"], Key=s3obj["Key"])
-            body = obj["Body"].read()
-            if compression == "gzip" or s3obj["Key"].endswith(".gz"):
-                body = gzip.decompress(body)
-            chunks = json.loads(body.decode("utf-8"))
-            if not isinstance(chunks, list):
-                raise ValueError("Loaded chunks is not a list")
-            return chunks
-    raise ValueError("Invalid chunks input; expected list or S3 pointer dict")
-
 
 def lambda_handler(event, context):
     """
     Extracts case facts by processing chunks from all documents.
 
     1. Receives { "complaint_chunks": [...], "answer_chunks": [...],
-                   "witness_chunks": [...] } from the step.
+                   "witness_chunks": [...], "config": {...} } from the step
+       (config.case_facts_mode selects "serial" or "map_reduce";
+       config.case_facts_skip_boilerplate: false sends the text unstripped).
     2. Calls the 'extract_case_facts' function.
     3. Returns the final case facts string.
     """
@@ -45,35 +25,57 @@ def lambda_handler(event, context):
     # 1. Get input from the event
     try:
         # The input for this step is an object containing all chunks
-        complaint_chunks = _load_chunks(event.get("complaint_chunks", [])) if event.get("complaint_chunks") is not None else []  # noqa: E501
-        answer_chunks = _load_chunks(event.get("answer_chunks", [])) if event.get("answer_chunks") is not None else []
-        witness_chunks_val = event.get("witness_chunks")
-        witness_chunks = _load_chunks(witness_chunks_val) if witness_chunks_val is not None else []  # Optional
+        complaint_chunks = chunk_store.load_chunks(event.get("complaint_chunks") or [])
+        answer_chunks = chunk_store.load_chunks(event.get("answer_chunks") or [])
+        witness_chunks = chunk_store.load_chunks(event.get("witness_chunks") or [])  # Optional
 
         if not complaint_chunks or not answer_chunks:
             logger.warning("Complaint or Answer chunks are missing. Facts may be incomplete.")
 
-    except (TypeError, KeyError) as e:
+        # Optional job config switch between the serial refine chain and map-reduce
+        config = event.get("config") or {}
+        mode = config.get("case_facts_mode") or "serial"
+        if mode not in case_facts_processing.SUMMARY_MODES:
+            raise ValueError(f"case_facts_mode must be one of {case_facts_processing.SUMMARY_MODES}")
+        skip_boilerplate = config.get("case_facts_skip_boilerplate", True) is not False
+
+    except (TypeError, KeyError, ValueError) as e:
         logger.error(f"Invalid input event: {e!s}")
         raise ValueError(f"Invalid input: {e!s}") from e
 
-    logger.info("Starting case facts extraction...")
+    logger.info(f"Starting case facts extraction ({mode})...")
+    ledger.start(stage="extract_case_facts", job_id=event.get("jury_instruction_id"))
+    models.configure(event.get("config"))
 
     # 2. Call the extraction function
+    boilerplate_stats = {}
     try:
         case_facts_summary = case_facts_processing.extract_case_facts(
-            complaint_chunks=complaint_chunks, answer_chunks=answer_chunks, witness_chunks=witness_chunks
+            complaint_chunks=complaint_chunks,
+            answer_chunks=answer_chunks,
+            witness_chunks=witness_chunks,
+            mode=mode,
+            skip_boilerplate=skip_boilerplate,
+            stats=boilerplate_stats,
         )
 
         if not case_facts_summary:
             logger.warning("Case facts extraction returned an empty string.")
         else:
             logger.info("Successfully extracted case facts.")
+        if boilerplate_stats:
+            logger.info(f"Boilerplate stripping stats: {boilerplate_stats}")
+        logger.info(f"Bedrock cache stats: {bedrock.cache_stats()}")
+        logger.info(f"Bedrock executor stats: {bedrock.executor_stats()}")
+        logger.info(f"Chunk store stats: {chunk_store.store.stats()}")
 
     except Exception as e:
         # This will catch any errors from the Bedrock calls
         logger.error(f"Failed during case facts extraction: {e!s}")
         raise RuntimeError(f"Case facts extraction failed: {e!s}") from e
+    finally:
+        # Record token/latency/cost usage for this invocation on the job item
+        ledger.flush()
 
     # 3. Return the result (a single string)
     return case_facts_summary
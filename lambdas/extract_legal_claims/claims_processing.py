@@ -1,9 +1,13 @@
 import json
+import logging
 import os
+import re
 
 import boto3
+from jury_common import bedrock, dedup, models, reference_data, retrieval, sections
+from jury_common.claim_aliases import aliases
 
-bedrock = boto3.client("bedrock-runtime")
+logger = logging.getLogger()
 
 # Load claims from DynamoDB instead of Supabase
 _CLAIMS_TABLE = os.environ.get("DYNAMODB_CLAIMS_TABLE_NAME", "Claims")
@@ -11,21 +15,29 @@ _ddb = boto3.resource("dynamodb")
 _claims_table = _ddb.Table(_CLAIMS_TABLE)
 
 
-def _scan_all(table):
-    kwargs = {}
-    items = []
-    while True:
-        resp = table.scan(**kwargs)
-        items.extend(resp.get("Items", []))
-        lek = resp.get("LastEvaluatedKey")
-        if not lek:
-            break
-        kwargs["ExclusiveStartKey"] = lek
-    return items
+# Cache database claims at import/cold start: the compiled artifact in the shared
+# layer when it matches the table's version, otherwise a table scan. Warm
+# containers keep them until the table's version item changes.
+claims_cache = reference_data.ReferenceCache("claims", _claims_table)
+
+# Shortlist size per claim for the lexical index; match prompts list only its top candidates
+MATCH_CANDIDATES = int(os.environ.get("CLAIM_MATCH_CANDIDATES", "8"))
+
+
+def _index_database_claims() -> None:
+    global database_claims, database_claim_ids, claims_index  # noqa: PLW0603
+    database_claims = claims_cache.value.all()
+    database_claim_ids = {str(c.get("id")) for c in database_claims}
+    claims_index = retrieval.LexicalIndex(database_claims, {"title": 3.0, "description": 1.0, "elements": 1.0})
+
 
+_index_database_claims()
 
-# Cache database claims at import/cold start
-database_claims = _scan_all(_claims_table)
+
+def refresh_reference_data() -> None:
+    """Reload the reference claims and their index if the Claims table's version changed."""
+    if claims_cache.refresh_if_changed():
+        _index_database_claims()
 
 
 def _normalize_grouped_claims(claims: list) -> list[dict]:
@@ -79,17 +91,70 @@ def match_claims_to_database(claims: list[dict]) -> list[dict]:
         List of {'claim_id': int|None, 'raw_texts': list[str]} dicts
         claim_id is None if the claim is invalid/not matched
     """
+    if not claims:
+        # Nothing was extracted, so there is nothing to match
+        return []
+
+    claims = _normalize_grouped_claims(claims)
+    local_ids = [_alias_match(c) or _clear_match(c) for c in claims]
+    pending = [c for c, claim_id in zip(claims, local_ids, strict=True) if claim_id is None]
+    logger.info(
+        f"Matched {len(claims) - len(pending)} of {len(claims)} claims by alias/title; {len(pending)} need the LLM"
+    )
+    llm_matches = iter(_llm_match_claims(pending) if pending else [])
+    return [
+        {"claim_id": claim_id, "raw_texts": c.get("raw_texts", [])} if claim_id is not None else next(llm_matches)
+        for c, claim_id in zip(claims, local_ids, strict=True)
+    ]
+
+
+def _alias_match(claim: dict) -> str | None:
+    """Claim ID learned for this claim's name in an earlier job, if it is still in the Claims table."""
+    claim_id = aliases.lookup(claim["name"])
+    return claim_id if claim_id in database_claim_ids else None
+
+
+def _clear_match(claim: dict) -> str | None:
+    """Database claim ID when the claim's name and raw texts unambiguously name one database claim."""
+    winners = {
+        w.get("id") for text in [claim["name"], *claim.get("raw_texts", [])] if (w := claims_index.clear_winner(text))
+    }
+    return winners.pop() if len(winners) == 1 else None
+
+
+def _candidate_claims(claims: list[dict]) -> list[dict]:
+    """Union of the top shortlist candidates for each claim's name and raw texts, best first."""
+    scores: dict[str, float] = {}
+    by_id: dict[str, dict] = {}
+    for claim in claims:
+        for text in [claim["name"], *claim.get("raw_texts", [])]:
+            for candidate, score in claims_index.search(text, k=MATCH_CANDIDATES):
+                key = str(candidate.get("id"))
+                by_id[key] = candidate
+                scores[key] = max(score, scores.get(key, 0.0))
+    return [by_id[key] for key in sorted(scores, key=scores.get, reverse=True)]
+
+
+def _llm_match_claims(claims: list[dict]) -> list[dict]:
+    """Match claims to a shortlist of database claims using LLM.
+
+    Args:
+        claims: List of {'name': str, 'raw_texts': list[str]} dicts
+
+    Returns:
+        List of {'claim_id': str|None, 'raw_texts': list[str]} dicts, one per claim in order
+    """
+    candidates = _candidate_claims(claims)
     # Format database claims for the prompt
     database_claims_text = "\n".join(
         [
             f"ID {claim.get('id')}: {claim.get('title')}"
             + (f" - {claim.get('description','')[:100]}..." if claim.get("description") else "")
-            for claim in database_claims
+            for claim in candidates
         ]
     )
     print("TWO")
-    # Normalize and format extracted claims
-    claims = _normalize_grouped_claims(claims)
+    # Format extracted claims
     print("THREE")
     extracted_claims_text = "\n".join(
         [f"Claim {i+1}: {c['name']}\n  Raw texts: {', '.join(c.get('raw_texts', []))}" for i, c in enumerate(claims)]
@@ -119,6 +184,11 @@ def match_claims_to_database(claims: list[dict]) -> list[dict]:
                                     "type": "string",
                                     "description": "Brief explanation of the match or why it's invalid",
                                 },
+                                "confidence": {
+                                    "type": "string",
+                                    "enum": ["high", "medium", "low"],
+                                    "description": "high only if the claim is unambiguously this database claim",
+                                },
                             },
                             "required": ["claim_index", "claim_id"],
                         },
@@ -129,21 +199,23 @@ def match_claims_to_database(claims: list[dict]) -> list[dict]:
         }
     ]
     print("FIVE")
+    # Only the shortlisted candidates are listed, so the prompt stays small as the table grows
+    reference_prompt = f"""You are matching claims extracted from a legal complaint to a database of valid Florida legal claims.
+
+CANDIDATE DATABASE CLAIMS ({len(candidates)} shortlisted from {len(database_claims)} total):
+{database_claims_text}"""  # noqa: E501
+    model = models.for_task("match")
     body = json.dumps(
         {
             "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": 4000,
+            "max_tokens": model.max_tokens,
             "tools": tools,
             "tool_choice": {"type": "tool", "name": "match_claims"},
+            "system": reference_prompt,
             "messages": [
                 {
                     "role": "user",
                     "content": f"""
-You are matching claims extracted from a legal complaint to a database of valid Florida legal claims.
-
-DATABASE CLAIMS ({len(database_claims)} total):
-{database_claims_text}
-
 EXTRACTED CLAIMS TO MATCH:
 {extracted_claims_text}
 
@@ -165,14 +237,13 @@ Return matches for ALL {len(claims)} extracted claims.""",
         }
     )
     print("SIX")
-    response = bedrock.invoke_model(
+    response_body = bedrock.invoke_model(
         body=body,
-        modelId="us.anthropic.claude-3-5-sonnet-20241022-v2:0",
-        accept="application/json",
-        contentType="application/json",
+        model_id=model.model_id,
+        fallback_model_id=model.fallback_model_id,
+        call_site="match_claims_to_database",
     )
     print("SEVEN")
-    response_body = json.loads(response.get("body").read())
     print("EIGHT")
     # Extract tool use result
     matches = None
@@ -192,16 +263,21 @@ Return matches for ALL {len(claims)} extracted claims.""",
     # Build result maintaining order
     result = []
     match_dict = {m["claim_index"]: m["claim_id"] for m in matches}
+    confident = {m["claim_index"] for m in matches if m.get("confidence") == "high"}
 
     for i, claim in enumerate(claims):
         claim_index = i + 1  # 1-based indexing
-        result.append({"claim_id": match_dict.get(claim_index), "raw_texts": claim.get("raw_texts", [])})
+        claim_id = match_dict.get(claim_index)
+        result.append({"claim_id": claim_id, "raw_texts": claim.get("raw_texts", [])})
+        # Remember confident matches so later jobs resolve this name without a model call
+        if claim_index in confident and str(claim_id) in database_claim_ids:
+            aliases.learn(claim["name"], str(claim_id))
     print("ELEVEN")
     return result
 
 
 def deduplicate_claims(claims: list[dict]) -> list[dict]:
-    """Deduplicate claims using LLM to identify same claims with different text.
+    """Deduplicate claims, grouping obvious duplicates locally and asking the LLM only about close calls.
 
     Args:
         claims: List of {'raw_text': str, 'name': str} dicts
@@ -209,9 +285,59 @@ def deduplicate_claims(claims: list[dict]) -> list[dict]:
     Returns:
         List of {'name': str, 'raw_texts': list[str]} dicts
     """
+    claims = _normalize_raw_claims(claims)
     if not claims:
         return []
 
+    groups, ambiguous = dedup.group(claims, key=lambda c: c["name"])
+    grouped = [
+        {"name": dedup.most_common([c["name"] for c in g]), "raw_texts": list(dict.fromkeys(c["raw_text"] for c in g))}
+        for g in groups
+    ]
+    if not ambiguous:
+        logger.info(f"Deduplicated {len(claims)} claims into {len(grouped)} locally; no LLM call needed")
+        return grouped
+
+    # Only groups that might be the same claim go to the model, one representative each
+    pending = sorted({i for cluster in ambiguous for i in cluster})
+    llm_groups = _llm_group_claims(
+        [{"name": grouped[i]["name"], "raw_text": grouped[i]["raw_texts"][0]} for i in pending]
+    )
+
+    # Groups can share a first raw text, so map the model's answer back to group indices:
+    # each returned copy of a raw text goes to the next group sent with it
+    groups_of_raw_text: dict[str, list[int]] = {}
+    for i in pending:
+        groups_of_raw_text.setdefault(grouped[i]["raw_texts"][0], []).append(i)
+    result = [g for i, g in enumerate(grouped) if i not in pending]
+    claimed: set[int] = set()
+    for g in llm_groups:
+        raw_texts = []
+        for raw_text in g["raw_texts"]:
+            i = next((i for i in groups_of_raw_text.get(raw_text, []) if i not in claimed), None)
+            if i is not None:
+                claimed.add(i)
+                raw_texts.extend(grouped[i]["raw_texts"])
+        if raw_texts:
+            result.append({"name": g["name"], "raw_texts": list(dict.fromkeys(raw_texts))})
+    # Anything the model dropped is kept as its own claim
+    result.extend(grouped[i] for i in pending if i not in claimed)
+    logger.info(
+        f"Deduplicated {len(claims)} claims into {len(result)}; "
+        f"{len(pending)} of {len(grouped)} local groups were sent to the LLM"
+    )
+    return result
+
+
+def _llm_group_claims(claims: list[dict]) -> list[dict]:
+    """Ask the LLM which claims are the same cause of action.
+
+    Args:
+        claims: List of {'raw_text': str, 'name': str} dicts
+
+    Returns:
+        List of {'name': str, 'raw_texts': list[str]} dicts
+    """
     tools = [
         {
             "name": "group_duplicate_claims",
@@ -240,14 +366,13 @@ def deduplicate_claims(claims: list[dict]) -> list[dict]:
         }
     ]
 
-    # Normalize input and format claims
-    claims = _normalize_raw_claims(claims)
     claims_text = "\n".join([f"{i+1}. Name: {c['name']}, Raw: {c['raw_text']}" for i, c in enumerate(claims)])
 
+    model = models.for_task("dedup")
     body = json.dumps(
         {
             "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": 2000,
+            "max_tokens": model.max_tokens,
             "tools": tools,
             "tool_choice": {"type": "tool", "name": "group_duplicate_claims"},
             "messages": [
@@ -275,15 +400,13 @@ Return grouped claims with:
         }
     )
 
-    response = bedrock.invoke_model(
+    response_body = bedrock.invoke_model(
         body=body,
-        modelId="us.anthropic.claude-3-5-sonnet-20241022-v2:0",
-        accept="application/json",
-        contentType="application/json",
+        model_id=model.model_id,
+        fallback_model_id=model.fallback_model_id,
+        call_site="deduplicate_claims",
     )
 
-    response_body = json.loads(response.get("body").read())
-
     # Extract tool use result and normalize shape defensively
     for item in response_body.get("content", []):
         if item.get("type") == "tool_use":
@@ -351,10 +474,11 @@ def process_claim_window(previous_context: str, window_text: str, search_instruc
         }
     ]
 
+    model = models.for_task("extraction_window")
     body = json.dumps(
         {
             "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": 1000,
+            "max_tokens": model.max_tokens,
             "tools": tools,
             "tool_choice": {"type": "tool", "name": "extract_claims_and_context"},
             "messages": [
@@ -379,15 +503,13 @@ Also update the context paragraph to summarize what you've seen so far.""",
         }
     )
 
-    response = bedrock.invoke_model(
+    response_body = bedrock.invoke_model(
         body=body,
-        modelId="us.anthropic.claude-3-5-sonnet-20241022-v2:0",
-        accept="application/json",
-        contentType="application/json",
+        model_id=model.model_id,
+        fallback_model_id=model.fallback_model_id,
+        call_site="process_claim_window",
     )
 
-    response_body = json.loads(response.get("body").read())
-
     # Extract tool use result
     for item in response_body.get("content", []):
         if item.get("type") == "tool_use":
@@ -397,13 +519,75 @@ Also update the context paragraph to summarize what you've seen so far.""",
     return {"updated_context": previous_context, "claims": []}
 
 
-def extract_raw_claims(chunks: list[str], window_size: int = 3, claim_type: str = "claims") -> list[dict]:
+# Window extraction modes: "serial" threads each window's updated_context into the next;
+# "parallel" sends every window at once with no carried context and relies on
+# deduplicate_claims to reconcile the overlapping results.
+EXTRACTION_MODES = ("serial", "parallel")
+
+PARALLEL_WINDOW_CONTEXT = (
+    "This window is analyzed independently of the rest of the document; "
+    "report every claim heading or cause of action that appears in it."
+)
+
+
+# Window pre-filter: headings and phrases that introduce a claim, including common
+# Textract misreads ("C0UNT", "C OUNT", "ACTlON"). Windows without any of them are
+# mostly factual allegations and are only sent to the model as a neighbour margin.
+_ORDINAL_WORDS = "first|second|third|fourth|fifth|sixth|seventh|eighth|ninth|tenth|eleventh|twelfth"
+CLAIM_HEADING_PATTERN = re.compile(
+    "|".join(
+        [
+            r"\bc\s?[o0q]\s?u\s?n\s?t(?:s|\s?[ivxl1]+\b|\s?\d+)?\b",
+            r"\bc\s?[o0q]\s?u\s?n\s?t\s?e\s?r[\s-]*c\s?l\s?a\s?[il1]\s?m",
+            r"\bcauses?\s+[o0]f\s+act[il1][o0]n\b",
+            r"\bclaims?\s+f[o0]r\s+rel[il1]ef\b",
+            rf"\b(?:{_ORDINAL_WORDS})\s+(?:claim|count|cause|counterclaim)\b",
+            r"\bthis\s+is\s+an?\s+act[il1][o0]n\s+f[o0]r\b",
+            r"\bwherefore\b",
+        ]
+    ),
+    re.IGNORECASE,
+)
+
+
+def window_has_claim_candidates(window_text: str) -> bool:
+    """True when a window contains a COUNT/COUNTERCLAIM/cause-of-action style heading or phrase."""
+    return bool(CLAIM_HEADING_PATTERN.search(window_text or ""))
+
+
+def select_candidate_windows(windows: list[str], margin: int = 1) -> list[int]:
+    """Indices of windows to send to the model: those with candidates plus `margin` neighbours each side.
+
+    The first window is always kept, since complaints often state their claims in
+    the opening paragraphs without a heading.
+    """
+    selected = {0} if windows else set()
+    for i, window_text in enumerate(windows):
+        if window_has_claim_candidates(window_text):
+            selected.update(range(max(0, i - margin), min(len(windows), i + margin + 1)))
+    return sorted(selected)
+
+
+def extract_raw_claims(  # noqa: PLR0913
+    chunks: list[str],
+    window_size: int = 3,
+    claim_type: str = "claims",
+    mode: str = "serial",
+    *,
+    prefilter: bool = True,
+    margin: int = 1,
+    chunk_ranges: list[tuple[int, int]] | None = None,
+) -> list[dict]:
     """Extract claims or counterclaims from a complaint using sliding window approach.
 
     Args:
         chunks: List of text chunks (paragraphs/sections) from the complaint
         window_size: Number of chunks to process at once (default 3)
         claim_type: Either "claims" or "counterclaims"
+        mode: "serial" (context carried window to window) or "parallel" (independent, concurrent windows)
+        prefilter: Only send windows with claim headings (plus `margin` neighbours) to the model
+        margin: Neighbouring windows kept on each side of a window with candidates
+        chunk_ranges: Inclusive chunk ranges to read (from the section index); None reads every chunk
 
     Returns:
         List of dicts with 'raw_text' and 'name' keys
@@ -426,10 +610,31 @@ def extract_raw_claims(chunks: list[str], window_size: int = 3, claim_type: str
 - Sections labeled "COUNTERCLAIM" or "DEFENDANT'S COUNTERCLAIM"
 - Claims asserted by the defendant against the plaintiff"""
 
+    windows = sections.windows(chunks, window_size, chunk_ranges)
+    if prefilter:
+        kept = select_candidate_windows(windows, margin=margin)
+        logger.info(
+            f"Window pre-filter kept {len(kept)} of {len(windows)} {claim_type} windows "
+            f"(skip rate {1 - len(kept) / len(windows) if windows else 0:.0%}, margin {margin})"
+        )
+        windows = [windows[i] for i in kept]
+
+    if mode == "parallel":
+        results = bedrock.run_concurrently(
+            lambda window_text: process_claim_window(
+                previous_context=PARALLEL_WINDOW_CONTEXT,
+                window_text=window_text,
+                search_instructions=search_instructions,
+            ),
+            windows,
+        )
+        for result in results:
+            if isinstance(result, dict):
+                all_claims.extend(_normalize_raw_claims(result.get("claims", [])))
+        return all_claims
+
     # Slide through chunks with overlap
-    for i in range(0, len(chunks), window_size - 1):
-        window_chunks = chunks[i : i + window_size]
-        window_text = "\n".join(window_chunks)
+    for window_text in windows:
 
         # Process this window
         result = process_claim_window(
@@ -448,14 +653,30 @@ def extract_raw_claims(chunks: list[str], window_size: int = 3, claim_type: str
     return all_claims
 
 
-def extract_claims(chunks: list[str], window_size: int = 3) -> list[dict]:
+def extract_claims(  # noqa: PLR0913
+    chunks: list[str],
+    window_size: int = 3,
+    mode: str = "serial",
+    *,
+    prefilter: bool = True,
+    margin: int = 1,
+    chunk_ranges: list[tuple[int, int]] | None = None,
+) -> list[dict]:
     """Full pipeline: extract plaintiff's claims, deduplicate, and match to database.
 
     Returns:
         List of {'claim_id': int|None, 'raw_texts': list[str]} dicts
     """
     # Extract plaintiff's claims with sliding window
-    raw_claims = extract_raw_claims(chunks, window_size, claim_type="claims")
+    raw_claims = extract_raw_claims(
+        chunks,
+        window_size,
+        claim_type="claims",
+        mode=mode,
+        prefilter=prefilter,
+        margin=margin,
+        chunk_ranges=chunk_ranges,
+    )
 
     # Deduplicate
     deduplicated = deduplicate_claims(raw_claims)
@@ -466,14 +687,30 @@ def extract_claims(chunks: list[str], window_size: int = 3) -> list[dict]:
     return matched
 
 
-def extract_counterclaims(chunks: list[str], window_size: int = 3) -> list[dict]:
+def extract_counterclaims(  # noqa: PLR0913
+    chunks: list[str],
+    window_size: int = 3,
+    mode: str = "serial",
+    *,
+    prefilter: bool = True,
+    margin: int = 1,
+    chunk_ranges: list[tuple[int, int]] | None = None,
+) -> list[dict]:
     """Full pipeline: extract defendant's counterclaims, deduplicate, and match to database.
 
     Returns:
         List of {'claim_id': int|None, 'raw_texts': list[str]} dicts
     """
     # Extract defendant's counterclaims with sliding window
-    raw_counterclaims = extract_raw_claims(chunks, window_size, claim_type="counterclaims")
+    raw_counterclaims = extract_raw_claims(
+        chunks,
+        window_size,
+        claim_type="counterclaims",
+        mode=mode,
+        prefilter=prefilter,
+        margin=margin,
+        chunk_ranges=chunk_ranges,
+    )
 
     # Deduplicate
     deduplicated = deduplicate_claims(raw_counterclaims)
@@ -1,83 +1,95 @@
-import gzip
-import json
 import logging
 
-import boto3
-
 # --- Import logic from the local file ---
 # This works because 'claims_processing.py' is in the same folder
 # and will be in the same root dir in the Lambda runtime.
 import claims_processing
+from jury_common import bedrock, chunk_store, models, sections
+from jury_common.usage_ledger import ledger
 
 # Set up logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-s3 = boto3.client("s3")
-
-
-def _load_chunks(chunks_or_pointer):
-    # If already a list, return as-is
-    if isinstance(chunks_or_pointer, list):
-        return chunks_or_pointer
-    # Pointer object cases
-    if isinstance(chunks_or_pointer, dict):
-        compression = chunks_or_pointer.get("Compression")
-        s3obj = None
-        if "S3Object" in chunks_or_pointer and isinstance(chunks_or_pointer["S3Object"], dict):
-            s3obj = chunks_or_pointer["S3Object"]
-        elif {"Bucket", "Key"}.issubset(set(chunks_or_pointer.keys())):
-            s3obj = {"Bucket": chunks_or_pointer["Bucket"], "Key": chunks_or_pointer["Key"]}
-        if s3obj:
-            obj = s3.get_object(Bucket=s3obj["Bucket"], Key=s3obj["Key"])
-            body = obj["Body"].read()
-            if compression == "gzip" or s3obj["Key"].endswith(".gz"):
-                body = gzip.decompress(body)
-            chunks = json.loads(body.decode("utf-8"))
-            if not isinstance(chunks, list):
-                raise ValueError("Loaded chunks is not a list")
-            return chunks
-    raise ValueError("Invalid chunks input; expected list or S3 pointer dict")
-
 
 def lambda_handler(event, context):
     """
     Extracts legal claims or counterclaims from a list of text chunks.
 
-    1. Receives { "chunks": [...], "claim_type": "claims" } from the step.
+    1. Receives { "chunks": [...], "claim_type": "claims", "config": {...} } from the step
+       (config.claim_extraction_mode selects "serial" or "parallel" windows;
+       config.claim_window_prefilter / claim_window_margin control the heading pre-filter;
+       with a section index on the chunks pointer only COUNT / COUNTERCLAIM sections are read
+       unless config.use_section_index is false).
     2. Calls the appropriate function from the 'claims_processing.py' file.
     3. Returns the list of extracted claims.
     """
 
     # 1. Get input from the event
     try:
-        chunks = _load_chunks(event["chunks"])
+        chunks = chunk_store.load_chunks(event["chunks"])
         claim_type = event["claim_type"]
 
         if claim_type not in ["claims", "counterclaims"]:
             raise ValueError("claim_type must be 'claims' or 'counterclaims'")
 
+        # Optional job config switch between serial (context-carrying) and parallel windows
+        config = event.get("config") or {}
+        mode = config.get("claim_extraction_mode") or "serial"
+        if mode not in claims_processing.EXTRACTION_MODES:
+            raise ValueError(f"claim_extraction_mode must be one of {claims_processing.EXTRACTION_MODES}")
+
+        # Heading pre-filter: skip windows with no claim headings beyond a neighbour margin
+        prefilter = config.get("claim_window_prefilter", True) is not False
+        margin = int(config.get("claim_window_margin", 1))
+        if margin < 0:
+            raise ValueError("claim_window_margin must be >= 0")
+
+        # Section index from textract_get_results: read only the claim sections
+        chunk_ranges = None
+        if config.get("use_section_index", True) is not False:
+            chunk_ranges = sections.chunk_ranges(
+                event["chunks"],
+                sections.CLAIM_SECTIONS if claim_type == "claims" else sections.COUNTERCLAIM_SECTIONS,
+                include_first=claim_type == "claims",
+            )
+
     except (TypeError, KeyError, ValueError) as e:
         logger.error(f"Invalid input event: {e!s}")
         raise ValueError(f"Invalid input: {e!s}") from e
 
-    logger.info(f"Starting extraction for '{claim_type}' with {len(chunks)} chunks.")
+    logger.info(f"Starting {mode} extraction for '{claim_type}' with {len(chunks)} chunks.")
+    logger.info(f"Reading {sections.coverage(chunk_ranges, len(chunks))}")
+    ledger.start(stage=f"extract_legal_claims:{claim_type}", job_id=event.get("jury_instruction_id"))
+    models.configure(event.get("config"))
+    claims_processing.refresh_reference_data()
 
     # 2. Call the correct pipeline from our local module
     try:
         if claim_type == "claims":
             # 'extract_claims' runs the full (raw -> dedupe -> match) pipeline
-            extracted_items = claims_processing.extract_claims(chunks)
+            extracted_items = claims_processing.extract_claims(
+                chunks, mode=mode, prefilter=prefilter, margin=margin, chunk_ranges=chunk_ranges
+            )
         else:
             # 'extract_counterclaims' runs the same pipeline for counterclaims
-            extracted_items = claims_processing.extract_counterclaims(chunks)
+            extracted_items = claims_processing.extract_counterclaims(
+                chunks, mode=mode, prefilter=prefilter, margin=margin, chunk_ranges=chunk_ranges
+            )
 
         logger.info(f"Successfully extracted {len(extracted_items)} {claim_type}.")
+        logger.info(f"Bedrock cache stats: {bedrock.cache_stats()}")
+        logger.info(f"Bedrock executor stats: {bedrock.executor_stats()}")
+        logger.info(f"Reference data stats: {claims_processing.claims_cache.stats()}")
+        logger.info(f"Chunk store stats: {chunk_store.store.stats()}")
 
     except Exception as e:
         # This will catch any errors from the Bedrock calls
         logger.error(f"Failed during {claim_type} extraction: {e!s}")
         raise RuntimeError(f"Claim extraction pipeline failed: {e!s}") from e
+    finally:
+        # Record token/latency/cost usage for this invocation on the job item
+        ledger.flush()
 
     # 3. Return the result
     return extracted_items
@@ -1,15 +1,173 @@
 import json
+import re
 
-import boto3
+from jury_common import bedrock, models
 
-bedrock = boto3.client("bedrock-runtime")
+# --- Local parser ---
+# Witness lists are mostly numbered entries ("1. Richard Gold 8537 SW ..."),
+# "Name, address" lines or one name per line. parse_witness_list() reads the
+# entries between the witness list heading and the closing matter, takes the
+# leading name of each entry and drops generic entries ("Any and all
+# individuals ...", "... reserves the right ..."). Entries whose name it
+# cannot read confidently are left for the model.
+_LIST_HEADING = re.compile(r"WITNESS(?:ES)?\s+LIST|LIST\s+OF\s+WITNESSES|\bWITNESSES\s*:", re.IGNORECASE)
+# Closing matter and sections after the witness entries
+_LIST_END = re.compile(
+    r"EXHIBITS?\s+LIST|LIST\s+OF\s+EXHIBITS|CERTIFICATE\s+OF\s+SERVICE|I\s+HEREBY\s+CERTIFY"
+    r"|Respectfully\s+submitted|SERVICE\s+LIST|/s/",
+    re.IGNORECASE,
+)
+_ENTRY_NUMBER = re.compile(r"(?<![\w.,])(\d{1,3})[.)]\s+")
+# Running headers and footers that land inside entries
+_PAGE_NOISE = re.compile(
+    r"Page\s+\d+\s+of\s+\d+(?:\s+CASE\s+NO\.?\s*:?\s*[\w-]+(?:\s+[A-Z]{2}\s+\d+)?)?", re.IGNORECASE
+)
+# Generic entries that name nobody
+_EXCLUDED_ENTRY = re.compile(
+    r"any\s+and\s+all|^all\s|reserves?\s+the\s+right|listed\s+by|identified\s+(?:in|through|during)"
+    r"|custodian|representatives?\s+of|to\s+be\s+(?:determined|identified|named)|impeachment|rebuttal|unknown",
+    re.IGNORECASE,
+)
+_TITLE = re.compile(r"^(?:Dr|Mr|Mrs|Ms|Miss|Hon|Judge|Officer|Detective|Sgt|Deputy)\.?\s+", re.IGNORECASE)
+# Where the name part of an entry ends: a comma, an address number, a parenthesis, a dash, ...
+_NAME_END = re.compile(r"[,;:(]|\s[-\u2013\u2014]\s|\s#?\d|\s(?:of|at|from|c/o)\s", re.IGNORECASE)
+_NAME_TOKEN = re.compile(r"^[A-Z][A-Za-z'\u2019]*(?:-[A-Z][A-Za-z'\u2019]*)*$")
+_INITIAL = re.compile(r"^[A-Z]\.?$")
+_PARTICLES = {"de", "del", "della", "da", "di", "dos", "van", "von", "la", "le", "du", "st."}
+_SUFFIXES = {"jr", "sr", "ii", "iii", "iv", "esq", "md", "m.d", "phd", "ph.d", "p.a", "cpa", "rn", "dds"}
+# Capitalized words that mark an entry as a role or an organization, not a person
+_NON_NAME_WORD = re.compile(
+    r"^(?:(?:counter-)?(?:plaintiff|defendant)s?|witness(?:es)?|experts?|custodian|records|representative|corporate"
+    r"|individuals|part(?:y|ies)|all|any|each|every|unknown|bank|llc|inc|corp(?:oration)?|company|department"
+    r"|county|city|state|court|clerk|agency|board|office|the)$",
+    re.IGNORECASE,
+)
+# Job titles and descriptions ("Treating Physician", "Chief Medical Examiner"): an entry
+# holding one is left for the model rather than read as a name
+_DESCRIPTOR_WORD = re.compile(
+    r"^(?:physician|doctor|nurse|surgeon|psychiatrist|psychologist|therapist|counselor|paramedic|emt|pharmacist"
+    r"|chief|medical|examiner|coroner|treating|attending|investigating|arresting|responding|officer|detective"
+    r"|sergeant|lieutenant|captain|deputy|trooper|sheriff|agent|inspector|adjuster|appraiser|accountant|engineer"
+    r"|technician|specialist|consultant|analyst|manager|director|president|vice|owner|employee|supervisor|foreman"
+    r"|administrator|secretary|assistant|executive|superintendent|principal|teacher|pastor|reverend|landlord"
+    r"|tenant|keeper|hospital|memorial|clinic|center|university|school|police|fire|insurance|associates)$",
+    re.IGNORECASE,
+)
+# Fewest numbered entries that make a document read as a numbered list
+MIN_NUMBERED_ENTRIES = 2
+MIN_NAME_TOKENS = 2
+MAX_NAME_TOKENS = 5
+# Full (non-initial, non-particle) words in a confident name; longer runs go to the model
+MAX_NAME_WORDS = 3
 
 
-def extract_witnesses(witness_list_chunks: list[str]) -> list[dict]:
+def _numbered_entries(text: str) -> list[str]:
+    """Entries of a numbered list (1., 2., 3., ...), following the numbering in sequence."""
+    entries, starts, expected = [], [], 1
+    for match in _ENTRY_NUMBER.finditer(text):
+        if int(match.group(1)) == expected:
+            starts.append((match.start(), match.end()))
+            expected += 1
+    for i, (_, content_start) in enumerate(starts):
+        end = starts[i + 1][0] if i + 1 < len(starts) else len(text)
+        entries.append(text[content_start:end].strip())
+    return entries if len(entries) >= MIN_NUMBERED_ENTRIES else []
+
+
+def _clean_token(token: str) -> str:
+    return token.title() if token.isupper() and len(token) > 1 else token
+
+
+def parse_name(entry: str) -> dict | None:
+    """{'first_name', 'last_name'} from the start of a witness entry, or None if it does not start with a name."""
+    candidate = _TITLE.sub("", _PAGE_NOISE.sub(" ", entry).strip())
+    end = _NAME_END.search(candidate)
+    tokens = (candidate[: end.start()] if end else candidate).split()
+    while tokens and tokens[-1].lower().strip(".,") in _SUFFIXES:
+        tokens.pop()
+    if tokens and not _INITIAL.match(tokens[-1]):
+        tokens[-1] = tokens[-1].rstrip(".")
+    if not MIN_NAME_TOKENS <= len(tokens) <= MAX_NAME_TOKENS:
+        return None
+    if any(_NON_NAME_WORD.match(token.strip(".,")) or _DESCRIPTOR_WORD.match(token.strip(".,")) for token in tokens):
+        return None
+    if sum(not _INITIAL.match(t) and t.lower() not in _PARTICLES for t in tokens) > MAX_NAME_WORDS:
+        return None
+    first, last = tokens[0], tokens[-1]
+    if not (_NAME_TOKEN.match(first) and _NAME_TOKEN.match(last)):
+        return None
+    if not all(_NAME_TOKEN.match(t) or _INITIAL.match(t) or t.lower() in _PARTICLES for t in tokens[1:-1]):
+        return None
+    # Particles stay with the last name ("Maria de la Cruz")
+    particles = []
+    for token in reversed(tokens[1:-1]):
+        if token.lower() not in _PARTICLES:
+            break
+        particles.insert(0, token.lower())
+    return {"first_name": _clean_token(first), "last_name": " ".join([*particles, _clean_token(last)])}
+
+
+def parse_witness_list(text: str) -> tuple[list[dict], list[str], int] | None:
+    """Parse a witness list locally.
+
+    Args:
+        text: Full witness list document text
+
+    Returns:
+        (witnesses, unresolved entries, excluded entry count), or None when the
+        document does not read as a numbered or one-entry-per-line list
+    """
+    heading = _LIST_HEADING.search(text)
+    section = text[heading.end() :] if heading else text
+    # The entries end at the closing matter or the exhibit list, whose numbering would otherwise run on
+    first_entry = next((m for m in _ENTRY_NUMBER.finditer(section) if m.group(1) == "1"), None)
+    end = _LIST_END.search(section, first_entry.end() if first_entry else 0)
+    section = section[: end.start()] if end else section
+
+    entries = _numbered_entries(section)
+    if not entries:
+        entries = [line for line in (line.strip(" \t-\u2022*") for line in section.splitlines()) if line]
+        # One entry per line only holds if most lines read as names
+        if not entries or sum(parse_name(line) is not None for line in entries) * 2 < len(entries):
+            return None
+
+    witnesses, unresolved, excluded = [], [], 0
+    for entry in entries:
+        name = parse_name(entry)
+        if name:
+            witnesses.append(name)
+        elif _EXCLUDED_ENTRY.search(entry) or not entry:
+            excluded += 1
+        else:
+            unresolved.append(entry)
+    return witnesses, unresolved, excluded
+
+
+def _unique(witnesses: list[dict]) -> list[dict]:
+    """Witnesses with duplicates (same first and last name) removed, in order."""
+    seen = set()
+    unique_witnesses = []
+    for witness in witnesses:
+        key = (witness["first_name"].lower(), witness["last_name"].lower())
+        if key not in seen:
+            seen.add(key)
+            unique_witnesses.append(witness)
+    return unique_witnesses
+
+
+def extract_witnesses(
+    witness_list_chunks: list[str], *, local_parser: bool = True, stats: dict | None = None
+) -> list[dict]:
     """Extract witness names from a witness list document.
 
+    The local parser reads regular lists without a model call; only the
+    entries it cannot resolve are sent to the model. Documents it cannot
+    read as a list go to the model whole.
+
     Args:
         witness_list_chunks: List of text chunks from the witness list document
+        local_parser: Try parse_witness_list before the model
+        stats: Optional dict, filled with parsed/excluded/unresolved entry counts
 
     Returns:
         List of dicts with structure:
@@ -21,6 +179,27 @@ def extract_witnesses(witness_list_chunks: list[str]) -> list[dict]:
     # Combine all chunks for witness extraction
     full_text = "\n".join(witness_list_chunks)
 
+    parsed = parse_witness_list(full_text) if local_parser else None
+    if stats is not None:
+        stats.update(
+            {
+                "parser": "local" if parsed else "model",
+                "parsed": len(parsed[0]) if parsed else 0,
+                "excluded": parsed[2] if parsed else 0,
+                "unresolved": len(parsed[1]) if parsed else 0,
+            }
+        )
+    if parsed is None:
+        return _unique(_model_extract_witnesses(full_text))
+
+    witnesses, unresolved, _ = parsed
+    if unresolved:
+        witnesses = witnesses + _model_extract_witnesses("\n".join(unresolved), entries_only=True)
+    return _unique(witnesses)
+
+
+def _model_extract_witnesses(full_text: str, *, entries_only: bool = False) -> list[dict]:
+    """Witness names read by the model from the whole document, or from entries the parser left unresolved."""
     tools = [
         {
             "name": "extract_witness_names",
@@ -45,10 +224,11 @@ def extract_witnesses(witness_list_chunks: list[str]) -> list[dict]:
         }
     ]
 
+    model = models.for_task("witness_extraction")
     body = json.dumps(
         {
             "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": 2000,
+            "max_tokens": model.max_tokens,
             "tools": tools,
             "tool_choice": {"type": "tool", "name": "extract_witness_names"},
             "messages": [
@@ -56,7 +236,7 @@ def extract_witnesses(witness_list_chunks: list[str]) -> list[dict]:
                     "role": "user",
                     "content": f"""You are extracting witness names from a witness list document.
 
-Document text:
+{"Witness list entries that could not be parsed automatically" if entries_only else "Document text"}:
 {full_text}
 
 Extract all individual witness names. Look for:
@@ -81,22 +261,14 @@ Return all individual witnesses found.""",
         }
     )
 
-    response = bedrock.invoke_model(
-        body=body,
-        modelId="us.anthropic.claude-3-5-sonnet-20241022-v2:0",
-        accept="application/json",
-        contentType="application/json",
-    )
-
-    # Handle different body types (StreamingBody, bytes, str)
-    body_obj = response.get("body")
-    raw = body_obj.read() if hasattr(body_obj, "read") else body_obj
-    if isinstance(raw, bytes):
-        raw = raw.decode("utf-8", errors="replace")
-
     try:
-        response_body = json.loads(raw)
-    except Exception:
+        response_body = bedrock.invoke_model(
+            body=body,
+            model_id=model.model_id,
+            fallback_model_id=model.fallback_model_id,
+            call_site="resolve_witness_entries" if entries_only else "extract_witnesses",
+        )
+    except ValueError:
         # If the model returned non-JSON or empty, fallback gracefully
         return []
 
@@ -111,18 +283,7 @@ Return all individual witnesses found.""",
     for item in content_items:
         if isinstance(item, dict) and item.get("type") == "tool_use":
             tool_input = item.get("input") or {}
-            witnesses = tool_input.get("witnesses") or []
-
-            # Deduplicate witnesses (same first and last name)
-            seen = set()
-            unique_witnesses = []
-            for witness in witnesses:
-                key = (witness["first_name"].lower(), witness["last_name"].lower())
-                if key not in seen:
-                    seen.add(key)
-                    unique_witnesses.append(witness)
-
-            return unique_witnesses
+            return tool_input.get("witnesses") or []
 
     # Fallback if no tool use found
     return []
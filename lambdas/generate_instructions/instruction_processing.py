@@ -1,10 +1,11 @@
+import datetime
 import json
+import logging
 import os
 
 import boto3
-from boto3.dynamodb.conditions import Attr
-
-bedrock = boto3.client("bedrock-runtime")
+from boto3.dynamodb.conditions import Key
+from jury_common import bedrock, models, reference_data
 
 # DynamoDB tables from env
 _CLAIMS_TABLE = os.environ.get("DYNAMODB_CLAIMS_TABLE_NAME", "Claims")
@@ -12,38 +13,114 @@ _SJI_TABLE = os.environ.get("DYNAMODB_STANDARD_JURY_INSTRUCTIONS_TABLE_NAME", "S
 _ddb = boto3.resource("dynamodb")
 _claims_table = _ddb.Table(_CLAIMS_TABLE)
 _sji_table = _ddb.Table(_SJI_TABLE)
+# Jobs table, for persisting streamed instructions as they arrive
+_JOBS_TABLE = os.environ.get("DYNAMODB_TABLE_NAME")
+
+logger = logging.getLogger()
+
+
+# Cache reference data at cold start: the compiled artifact in the shared layer
+# when it matches each table's version, otherwise a table scan. Warm containers
+# keep it until the table's version item changes (see refresh_reference_data).
+claims_cache = reference_data.ReferenceCache("claims", _claims_table)
+claims_reference = claims_cache.value
+database_claims = claims_reference.all()
+
+
+class InstructionRepository:
+    """Standard jury instructions by number and by category, memoized per container.
 
+    Served from the compiled reference data when it matches the table; otherwise
+    each distinct number/category is fetched once with a Query on the table's
+    number-index / category_number-index GSIs.
+    """
 
-def _scan_all(table, filter_expression=None):
-    kwargs = {}
-    if filter_expression:
-        kwargs["FilterExpression"] = filter_expression
-    items = []
-    while True:
-        resp = table.scan(**kwargs)
-        items.extend(resp.get("Items", []))
-        lek = resp.get("LastEvaluatedKey")
-        if not lek:
-            break
-        kwargs["ExclusiveStartKey"] = lek
-    return items
+    def __init__(self, table, compiled: reference_data.ReferenceTable | None):
+        self._table = table
+        self._compiled = compiled
+        self._by_number: dict[str, dict | None] = {}
+        self._by_category: dict[str, list[dict]] = {}
+        self._categories: list[tuple[str, str]] | None = None
+
+    def _query(self, index_name: str, field: str, value: str) -> list[dict]:
+        kwargs = {"IndexName": index_name, "KeyConditionExpression": Key(field).eq(value)}
+        items = []
+        while True:
+            resp = self._table.query(**kwargs)
+            items.extend(resp.get("Items", []))
+            lek = resp.get("LastEvaluatedKey")
+            if not lek:
+                break
+            kwargs["ExclusiveStartKey"] = lek
+        return items
+
+    def by_number(self, number: str) -> dict | None:
+        """The instruction with this number (e.g. '201.1'), or None."""
+        number = str(number)
+        if number not in self._by_number:
+            if self._compiled is not None:
+                items = self._compiled.find("number", number)
+            else:
+                items = self._query("number-index", "number", number)
+            # In case of multiple versions, the first one wins
+            self._by_number[number] = items[0] if items else None
+        return self._by_number[number]
+
+    def by_category(self, category_number: str) -> list[dict]:
+        """Every instruction in a category, sorted by number."""
+        category_number = str(category_number)
+        if category_number not in self._by_category:
+            if self._compiled is not None:
+                items = self._compiled.find("category_number", category_number)
+            else:
+                items = self._query("category_number-index", "category_number", category_number)
+            self._by_category[category_number] = sorted(items, key=lambda x: str(x.get("number", "")))
+        return self._by_category[category_number]
+
+    def categories(self) -> list[tuple[str, str]]:
+        """Unique (category_number, category_title) pairs, sorted."""
+        if self._categories is None:
+            compiled = self._compiled
+            items = compiled.all() if compiled is not None else reference_data.scan_items(self._table)
+            self._categories = sorted(
+                {
+                    (r.get("category_number"), r.get("category_title"))
+                    for r in items
+                    if r.get("category_number") and r.get("category_title")
+                }
+            )
+        return self._categories
 
 
-# Cache database claims at cold start (small reference set)
-database_claims = _scan_all(_claims_table)
+sji_cache = reference_data.ReferenceCache("standard_jury_instructions", _sji_table, loader=reference_data.load_compiled)
+sji_repository = InstructionRepository(_sji_table, sji_cache.value)
+
+
+def refresh_reference_data() -> None:
+    """Reload claims / rebuild the instruction repository if either table's version changed."""
+    global claims_reference, database_claims, sji_repository  # noqa: PLW0603
+    if claims_cache.refresh_if_changed():
+        claims_reference = claims_cache.value
+        database_claims = claims_reference.all()
+    if sji_cache.refresh_if_changed():
+        # A new repository also drops the memoized GSI lookups
+        sji_repository = InstructionRepository(_sji_table, sji_cache.value)
+
+
+def reference_data_stats() -> dict:
+    return {"claims": claims_cache.stats(), "standard_jury_instructions": sji_cache.stats()}
 
 
 def database_get_claim_by_id(claim_id):
+    item = claims_reference.by_id(claim_id)
+    if item:
+        return item
+    # Not in the reference set loaded at cold start; try the table
     try:
         resp = _claims_table.get_item(Key={"id": claim_id})
-        item = resp.get("Item")
-        if item:
-            return item
+        return resp.get("Item")
     except Exception:
-        pass
-    # Fallback to in-memory cache
-    matches = [c for c in database_claims if c.get("id") == claim_id]
-    return matches[0] if matches else None
+        return None
 
 
 def match_claim_to_category(claim_title, case_facts, standard_categories):
@@ -87,17 +164,14 @@ def match_claim_to_category(claim_title, case_facts, standard_categories):
         }
     ]
 
-    prompt = f"""Match this claim to the appropriate standard jury instruction category.
-
-CLAIM: {claim_title}
-
-CASE FACTS:
-{case_facts}
+    # Category list and rules are identical for every claim; case facts are identical
+    # for every claim in a job. Both are cached prefixes, only the claim title varies.
+    system_prompt = f"""Match claims to the appropriate standard jury instruction category.
 
 AVAILABLE INSTRUCTION CATEGORIES:
 {categories_list}
 
-Determine which category this claim belongs to. If the claim clearly matches one of the standard categories, return that category number. If there is no good match (e.g., claims like "Conversion", "Libel", "Slander", "Defamation" that aren't listed), return "CUSTOM".
+Determine which category a claim belongs to. If the claim clearly matches one of the standard categories, return that category number. If there is no good match (e.g., claims like "Conversion", "Libel", "Slander", "Defamation" that aren't listed), return "CUSTOM".
 
 Consider:
 - The claim title itself
@@ -105,25 +179,33 @@ Consider:
 - Whether it's a tort vs. contract claim
 - Whether it fits clearly within a standard category"""  # noqa: E501
 
+    model = models.for_task("match")
     body = json.dumps(
         {
             "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": 500,
+            "max_tokens": model.max_tokens,
             "tools": tools,
             "tool_choice": {"type": "tool", "name": "match_category"},
-            "messages": [{"role": "user", "content": prompt}],
+            "system": [bedrock.cached_block(system_prompt)],
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [
+                        bedrock.cached_block(f"CASE FACTS:\n{case_facts}"),
+                        {"type": "text", "text": f"CLAIM: {claim_title}"},
+                    ],
+                }
+            ],
         }
     )
 
-    response = bedrock.invoke_model(
+    response_body = bedrock.invoke_model(
         body=body,
-        modelId="us.anthropic.claude-3-5-sonnet-20241022-v2:0",
-        accept="application/json",
-        contentType="application/json",
+        model_id=model.model_id,
+        fallback_model_id=model.fallback_model_id,
+        call_site="match_claim_to_category",
     )
 
-    response_body = json.loads(response.get("body").read())
-
     # Extract tool use result
     for item in response_body.get("content", []):
         if item.get("type") == "tool_use":
@@ -136,9 +218,14 @@ Consider:
     return "CUSTOM"
 
 
-def llm_select_instructions(claim_title, claim_elements, defenses, case_facts, available_instructions):
+def llm_select_instructions(  # noqa: PLR0913
+    claim_title, claim_elements, defenses, case_facts, available_instructions, *, on_instruction=None
+):
     """
     LLM selects which instructions to include and returns customized versions
+
+    If on_instruction is given, the response is streamed and on_instruction(index, instruction)
+    is called for each included instruction as soon as the model finishes it.
     """
 
     instructions_list = json.dumps(available_instructions, indent=2)
@@ -214,24 +301,33 @@ Example for 416.5:
 
 Be thorough but conservative - only include instructions that are truly relevant."""  # noqa: E501
 
+    model = models.for_task("custom_generation")
     body = json.dumps(
         {
             "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": 4000,
+            "max_tokens": model.max_tokens,
             "tools": tools,
             "tool_choice": {"type": "tool", "name": "select_instructions"},
             "messages": [{"role": "user", "content": prompt}],
         }
     )
 
-    response = bedrock.invoke_model(
-        body=body,
-        modelId="us.anthropic.claude-3-5-sonnet-20241022-v2:0",
-        accept="application/json",
-        contentType="application/json",
-    )
-
-    response_body = json.loads(response.get("body").read())
+    if on_instruction:
+        response_body = bedrock.stream_tool_array(
+            body=body,
+            model_id=model.model_id,
+            fallback_model_id=model.fallback_model_id,
+            call_site="llm_select_instructions",
+            array_key="selected_instructions",
+            on_item=lambda index, inst: on_instruction(index, inst) if inst.get("include") else None,
+        )
+    else:
+        response_body = bedrock.invoke_model(
+            body=body,
+            model_id=model.model_id,
+            fallback_model_id=model.fallback_model_id,
+            call_site="llm_select_instructions",
+        )
 
     # Extract tool use result
     for item in response_body.get("content", []):
@@ -244,7 +340,9 @@ Be thorough but conservative - only include instructions that are truly relevant
     return []
 
 
-def select_and_customize_instructions(category_number, claim, claim_elements, defenses, case_facts):
+def select_and_customize_instructions(  # noqa: PLR0913
+    category_number, claim, claim_elements, defenses, case_facts, *, on_instruction=None
+):
     """
     Select which sub-instructions from a category apply and customize them
 
@@ -254,16 +352,14 @@ def select_and_customize_instructions(category_number, claim, claim_elements, de
         claim_elements: List of elements for this claim type
         defenses: List of defense dicts with 'name' and 'raw_text'
         case_facts: Case facts summary
+        on_instruction: Optional callback(index, instruction); enables streaming
 
     Returns:
         List of dicts with instruction details and customization args
     """
 
-    # Get all sub-instructions in this category
-    # Scan and filter by category_number, then sort by number
-    # (Consider adding a GSI on category_number if this grows.)
-    sub_instructions = _sji_table.scan(FilterExpression=Attr("category_number").eq(category_number)).get("Items", [])
-    sub_instructions = sorted(sub_instructions, key=lambda x: str(x.get("number", "")))
+    # Get all sub-instructions in this category, sorted by number
+    sub_instructions = sji_repository.by_category(category_number)
 
     # Format for LLM
     instructions_summary = [
@@ -283,12 +379,22 @@ def select_and_customize_instructions(category_number, claim, claim_elements, de
         defenses=defenses,
         case_facts=case_facts,
         available_instructions=instructions_summary,
+        on_instruction=on_instruction,
     )
 
     return selected
 
 
-def generate_custom_instructions(claim_info, claim, case_facts):
+def _label_custom_instruction(inst, claim, index):
+    # Add number field for consistency with standard instructions
+    title = (claim.get("title") or "").upper().replace(" ", "-")
+    inst["number"] = f"CUSTOM-{title}-{index + 1}"
+    inst["claim_description"] = claim.get("description")
+    inst["claim_elements"] = claim.get("elements")
+    return inst
+
+
+def generate_custom_instructions(claim_info, claim, case_facts, on_instruction=None):
     """
     Generate custom jury instructions for claims without standard instructions
 
@@ -296,6 +402,7 @@ def generate_custom_instructions(claim_info, claim, case_facts):
         claim_info: Dict with claim data (raw_texts, damages, defenses)
         claim: Claim object from litigation guide (with elements, description)
         case_facts: Case facts summary
+        on_instruction: Optional callback(index, instruction); enables streaming
 
     Returns:
         List of instruction dicts with customized_text and reasoning
@@ -373,35 +480,40 @@ Example formats:
 
 Each instruction should be a separate item in the array."""  # noqa: E501
 
+    model = models.for_task("custom_generation")
     body = json.dumps(
         {
             "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": 4000,
+            "max_tokens": model.max_tokens,
             "tools": tools,
             "tool_choice": {"type": "tool", "name": "generate_custom_instructions"},
             "messages": [{"role": "user", "content": prompt}],
         }
     )
 
-    response = bedrock.invoke_model(
-        body=body,
-        modelId="us.anthropic.claude-3-5-sonnet-20241022-v2:0",
-        accept="application/json",
-        contentType="application/json",
-    )
-
-    response_body = json.loads(response.get("body").read())
+    if on_instruction:
+        response_body = bedrock.stream_tool_array(
+            body=body,
+            model_id=model.model_id,
+            fallback_model_id=model.fallback_model_id,
+            call_site="generate_custom_instructions",
+            array_key="instructions",
+            on_item=lambda index, inst: on_instruction(index, _label_custom_instruction(inst, claim, index)),
+        )
+    else:
+        response_body = bedrock.invoke_model(
+            body=body,
+            model_id=model.model_id,
+            fallback_model_id=model.fallback_model_id,
+            call_site="generate_custom_instructions",
+        )
 
     # Extract tool use result
     for item in response_body.get("content", []):
         if item.get("type") == "tool_use":
             instructions = item["input"]["instructions"]
-            # Add number field for consistency with standard instructions
-            for i, inst in enumerate(instructions, 1):
-                title = (claim.get("title") or "").upper().replace(" ", "-")
-                inst["number"] = f"CUSTOM-{title}-{i}"
-                inst["claim_description"] = claim.get("description")
-                inst["claim_elements"] = claim.get("elements")
+            for i, inst in enumerate(instructions):
+                _label_custom_instruction(inst, claim, i)
             return instructions
 
     return []
@@ -410,14 +522,21 @@ Each instruction should be a separate item in the array."""  # noqa: E501
 def _get_instruction_by_number(number: str):
     """Fetch a single standard instruction by its number (e.g., '201.1')."""
     try:
-        resp = _sji_table.scan(FilterExpression=Attr("number").eq(number))
-        items = resp.get("Items", [])
-        if items:
-            # In case of multiple versions, pick the one with matching number and first in list
-            return items[0]
+        return sji_repository.by_number(number)
     except Exception:
-        pass
-    return None
+        return None
+
+
+_RENDER_INSTRUCTION_RULES = """You are producing a finalized Florida Standard Jury Instruction by resolving a provided template.
+
+Instructions:
+- Keep the structure and language of the template.
+- Replace parenthetical placeholders like (date), (location), and similar with provided values.
+- Where the template says to insert a brief description of claims/defenses, write a single clear sentence suitable for voir dire using the case_facts and party names.
+- Resolve bracketed alternatives [like this] to the most appropriate single choice; remove unused brackets entirely.
+- If the template includes "[I] [The clerk] will now administer your oath.", choose "I" when inputs.oath_administered_by == "judge" and choose "The clerk" when inputs.oath_administered_by == "clerk".
+- List principal witnesses as full names separated by commas if provided.
+- Do not add extra commentary or headings. Output only the final instruction text."""  # noqa: E501
 
 
 def _llm_render_instruction(
@@ -467,44 +586,40 @@ def _llm_render_instruction(
             "If permitted_ex_parte_communications are provided, reflect them as appropriate in the communications guidance."  # noqa: E501
         )
 
-    prompt = f"""You are producing a finalized Florida Standard Jury Instruction by resolving a provided template.
-
-TEMPLATE:
-{template_text}
-
-INPUTS (JSON):
-{json.dumps(inputs, indent=2)}
-
-Instructions:
-- Keep the structure and language of the template.
-- Replace parenthetical placeholders like (date), (location), and similar with provided values.
-- Where the template says to insert a brief description of claims/defenses, write a single clear sentence suitable for voir dire using the case_facts and party names.
-- Resolve bracketed alternatives [like this] to the most appropriate single choice; remove unused brackets entirely.
-- If the template includes "[I] [The clerk] will now administer your oath.", choose "I" when inputs.oath_administered_by == "judge" and choose "The clerk" when inputs.oath_administered_by == "clerk".
-- List principal witnesses as full names separated by commas if provided.
-- Do not add extra commentary or headings. Output only the final instruction text.
- {hint_text}
- {extra_instructions or ''}
-"""  # noqa: E501
-
+    # Static rules first, then template + inputs (shared by the pre/post-oath renders
+    # of the same instruction), then the per-call hint. The rules alone are far below
+    # the minimum cacheable prefix, so one breakpoint after the template covers both.
+    model = models.for_task("render")
     body = json.dumps(
         {
             "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": 2000,
+            "max_tokens": model.max_tokens,
             "tools": tools,
             "tool_choice": {"type": "tool", "name": "render_instruction"},
-            "messages": [{"role": "user", "content": prompt}],
+            "system": [{"type": "text", "text": _RENDER_INSTRUCTION_RULES}],
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [
+                        bedrock.cached_block(
+                            f"TEMPLATE:\n{template_text}\n\nINPUTS (JSON):\n{json.dumps(inputs, indent=2)}"
+                        ),
+                        {
+                            "type": "text",
+                            "text": f"Render the final instruction. {hint_text} {extra_instructions or ''}".strip(),
+                        },
+                    ],
+                }
+            ],
         }
     )
 
-    response = bedrock.invoke_model(
+    response_body = bedrock.invoke_model(
         body=body,
-        modelId="us.anthropic.claude-3-5-sonnet-20241022-v2:0",
-        accept="application/json",
-        contentType="application/json",
+        model_id=model.model_id,
+        fallback_model_id=model.fallback_model_id,
+        call_site="_llm_render_instruction",
     )
-
-    response_body = json.loads(response.get("body").read())
     for item in response_body.get("content", []):
         if item.get("type") == "tool_use":
             return item["input"].get("customized_text", "")
@@ -793,12 +908,62 @@ def _generate_601_5(config: dict):
     }
 
 
-def generate_instructions(claims, counterclaims, case_facts, witnesses=None, config=None):  # noqa: PLR0912, PLR0915
+def _reset_streamed_instructions(job_id):
+    """Start an empty 'streamed_instructions' map on the job item (a rerun replaces the old one)."""
+    try:
+        _ddb.Table(_JOBS_TABLE).update_item(
+            Key={"jury_instruction_id": job_id},
+            UpdateExpression="SET #si = :empty",
+            ExpressionAttributeNames={"#si": "streamed_instructions"},
+            ExpressionAttributeValues={":empty": {}},
+        )
+        return True
+    except Exception as e:
+        logger.warning(f"Cannot persist streamed instructions for job {job_id}: {e!s}")
+        return False
+
+
+def _instruction_streamer(job_id, prefix):
+    """Callback that writes each streamed instruction to the job item under '<prefix>:<index>'.
+
+    Keys are per index, so a retried stream overwrites rather than duplicates.
+    """
+
+    def persist(index, instruction):
+        try:
+            _ddb.Table(_JOBS_TABLE).update_item(
+                Key={"jury_instruction_id": job_id},
+                UpdateExpression="SET #si.#key = :inst",
+                ExpressionAttributeNames={"#si": "streamed_instructions", "#key": f"{prefix}:{index}"},
+                ExpressionAttributeValues={
+                    ":inst": {
+                        "instruction": instruction,
+                        "emitted_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                    }
+                },
+            )
+        except Exception as e:
+            logger.warning(f"Failed to persist streamed instruction {prefix}:{index} for job {job_id}: {e!s}")
+
+    return persist
+
+
+def generate_instructions(  # noqa: PLR0912, PLR0913, PLR0915
+    claims, counterclaims, case_facts, witnesses=None, config=None, *, job_id=None
+):
     # Config can carry toggles and metadata for 100/200/600 series, etc.
     if not isinstance(config, dict):
         config = {}
     witnesses = witnesses or []
 
+    # config.stream_instructions: stream the long select/custom generations and write each
+    # instruction to the job item as soon as it is complete
+    stream = bool(config.get("stream_instructions")) and bool(job_id and _JOBS_TABLE)
+    stream = stream and _reset_streamed_instructions(job_id)
+
+    def streamer(prefix):
+        return _instruction_streamer(job_id, prefix) if stream else None
+
     all_instructions = []
 
     # 201.1 (pre), 101.1 (if enabled), 201.1 (post)
@@ -842,15 +1007,8 @@ def generate_instructions(claims, counterclaims, case_facts, witnesses=None, con
     custom_claims = []
     custom_counterclaims = []
 
-    # Load unique (category_number, category_title) pairs from DynamoDB
-    _all_sji = _scan_all(_sji_table)
-    standard_instruction_categories = sorted(
-        {
-            (r.get("category_number"), r.get("category_title"))
-            for r in _all_sji
-            if r.get("category_number") and r.get("category_title")
-        }
-    )
+    # Unique (category_number, category_title) pairs from the reference set
+    standard_instruction_categories = sji_repository.categories()
 
     for claim_info in claims:
         claim = database_get_claim_by_id(claim_info["claim_id"])
@@ -869,6 +1027,7 @@ def generate_instructions(claims, counterclaims, case_facts, witnesses=None, con
                 claim_elements=claim.get("elements"),
                 defenses=claim_info.get("defenses", []),
                 case_facts=case_facts,
+                on_instruction=streamer(f"claim-{claim_info['claim_id']}"),
             )
             all_instructions.extend(selected_instructions)
         else:
@@ -891,6 +1050,7 @@ def generate_instructions(claims, counterclaims, case_facts, witnesses=None, con
                 claim_elements=claim.get("elements"),
                 defenses=[],  # Counterclaims don't have defenses from plaintiff
                 case_facts=case_facts,
+                on_instruction=streamer(f"counterclaim-{counterclaim_info['claim_id']}"),
             )
             all_instructions.extend(selected_instructions)
         else:
@@ -901,7 +1061,12 @@ def generate_instructions(claims, counterclaims, case_facts, witnesses=None, con
     for claim_info in all_custom_claims:
         claim = database_get_claim_by_id(claim_info["claim_id"])
 
-        custom_instructions = generate_custom_instructions(claim_info=claim_info, claim=claim, case_facts=case_facts)
+        custom_instructions = generate_custom_instructions(
+            claim_info=claim_info,
+            claim=claim,
+            case_facts=case_facts,
+            on_instruction=streamer(f"custom-{claim_info['claim_id']}"),
+        )
         all_instructions.extend(custom_instructions)
 
     # 600-series concluding instructions
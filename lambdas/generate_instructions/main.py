@@ -2,6 +2,8 @@ import logging
 
 # Import logic from the local 'instruction_processing.py' file
 import instruction_processing
+from jury_common import bedrock, models
+from jury_common.usage_ledger import ledger
 
 # Set up logging
 logger = logging.getLogger()
@@ -40,19 +42,33 @@ def lambda_handler(event, context):
         raise ValueError(f"Invalid input: {e!s}") from e
 
     logger.info(f"Starting instruction generation for {len(claims)} claims and {len(counterclaims)} counterclaims.")
+    ledger.start(stage="generate_instructions", job_id=event.get("jury_instruction_id"))
+    models.configure(config)
+    instruction_processing.refresh_reference_data()
 
     # 2. Call the main generation pipeline
     try:
         instruction_list = instruction_processing.generate_instructions(
-            claims=claims, counterclaims=counterclaims, case_facts=case_facts, witnesses=witnesses, config=config
+            claims=claims,
+            counterclaims=counterclaims,
+            case_facts=case_facts,
+            witnesses=witnesses,
+            config=config,
+            job_id=event.get("jury_instruction_id"),
         )
 
         logger.info(f"Successfully generated {len(instruction_list)} instructions.")
+        logger.info(f"Bedrock cache stats: {bedrock.cache_stats()}")
+        logger.info(f"Bedrock executor stats: {bedrock.executor_stats()}")
+        logger.info(f"Reference data stats: {instruction_processing.reference_data_stats()}")
 
     except Exception as e:
         # This will catch any errors from the Bedrock calls
         logger.error(f"Failed during instruction generation: {e!s}")
         raise RuntimeError(f"Instruction generation failed: {e!s}") from e
+    finally:
+        # Record token/latency/cost usage for this invocation on the job item
+        ledger.flush()
 
     # 3. Return the result
     return instruction_list
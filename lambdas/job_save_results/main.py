@@ -5,6 +5,7 @@ import logging
 import os
 
 import boto3
+from jury_common import usage_ledger
 
 # Set up logging
 logger = logging.getLogger()
@@ -36,6 +37,31 @@ class DecimalEncoder(json.JSONEncoder):
         return super().default(o)
 
 
+def save_usage_summary(job_id, ledger_entries):
+    """
+    Rolls the per-stage Bedrock usage ledger up into 'usage_summary'.
+
+    Best effort: the job is already COMPLETE, so a failure here is only logged.
+    """
+    if not ledger_entries:
+        logger.info(f"No Bedrock usage recorded for job {job_id}.")
+        return
+
+    try:
+        summary = usage_ledger.summarize(ledger_entries)
+        logger.info(f"Bedrock usage for job {job_id}: {json.dumps(summary['totals'])}")
+        table.update_item(
+            Key={"jury_instruction_id": job_id},
+            UpdateExpression="SET #usage_summary = :us",
+            ExpressionAttributeNames={"#usage_summary": "usage_summary"},
+            ExpressionAttributeValues={
+                ":us": json.loads(json.dumps(summary), parse_float=lambda v: Decimal(str(round(float(v), 6))))
+            },
+        )
+    except Exception as e:
+        logger.warning(f"Failed to save usage summary for job {job_id}: {e!s}")
+
+
 def lambda_handler(event, context):
     """
     Saves the final results of the jury instruction job.
@@ -43,6 +69,7 @@ def lambda_handler(event, context):
     1. Receives the final, combined state from the Step Function.
     2. Updates the DynamoDB item with all results.
     3. Sets the job status to "COMPLETE".
+    4. Rolls the Bedrock usage ledger up into a per-job usage summary.
     """
 
     # The 'event' is the final, aggregated state from the Step Function.
@@ -109,15 +136,18 @@ def lambda_handler(event, context):
         # generally fine. Boto3 handles the Python-to-DynamoDB
         # type conversion for us.
 
-        table.update_item(
+        response = table.update_item(
             Key={"jury_instruction_id": job_id},
             UpdateExpression=update_expression,
             ExpressionAttributeNames=expression_attribute_names,
             ExpressionAttributeValues=expression_attribute_values,
+            ReturnValues="ALL_NEW",
         )
 
         logger.info(f"Successfully saved results for job {job_id}.")
 
+        save_usage_summary(job_id, response.get("Attributes", {}).get("usage_ledger", []))
+
         # Return a success message
         return {
             "statusCode": 200,
@@ -0,0 +1,5 @@
+"""Code shared by the Bedrock Lambdas, deployed as the 'shared' Lambda layer.
+
+Everything under lambdas/shared/python is zipped into a layer and mounted at
+/opt/python, so modules here are importable as 'jury_common.<module>'.
+"""
@@ -0,0 +1,377 @@
+"""Single entry point for Bedrock model calls made by the Lambdas.
+
+Call sites build the same JSON request body they always have and call
+invoke_model(), which returns the parsed response body. Identical requests
+are served from the response cache configured in bedrock_cache; everything
+else goes through the shared AIMD limiter, jittered retries and circuit
+breaker from bedrock_executor. Independent calls can be fanned out with
+run_concurrently(). Every call, cached or not, is recorded in the usage
+ledger (usage_ledger) under its call site.
+
+Which model a call uses comes from the task registry in models; when the
+primary model is unavailable or keeps throttling, invoke_model() retries
+once on the task's fallback model.
+
+Opt-in hedging (HedgePolicy) duplicates non-streaming calls that run past
+their call site's p95 latency and takes the first answer.
+
+Long generations can use stream_tool_array() instead, which streams the
+response and hands each element of the tool input's array to a callback as
+soon as it is complete.
+
+Request builders mark large static prompt prefixes with cached_block() so
+Bedrock prompt caching can reuse them; the resulting cache read/write token
+counts are logged per call and rolled into the ledger.
+
+Tuning (environment variables):
+    BEDROCK_MAX_CONCURRENCY         upper bound on in-flight calls (default 8)
+    BEDROCK_INITIAL_CONCURRENCY     starting limit before adaptation (default 4)
+    BEDROCK_LATENCY_TARGET_SECONDS  calls slower than this shrink the limit (default 0 = off)
+    BEDROCK_MAX_ATTEMPTS            attempts per call including the first (default 6)
+    BEDROCK_BREAKER_THRESHOLD       consecutive failures that open the breaker (default 5)
+    BEDROCK_BREAKER_RESET_SECONDS   open time before a trial call (default 30)
+    BEDROCK_PROMPT_CACHING          "0"/"false" drops cache_control breakpoints (default on)
+    BEDROCK_HEDGE_ENABLED           "1"/"true" hedges slow non-streaming calls (default off)
+    BEDROCK_HEDGE_PERCENTILE        per-call-site latency percentile that triggers a hedge (default 95)
+    BEDROCK_HEDGE_BUDGET_PERCENT    max hedges as a percentage of calls (default 5)
+    BEDROCK_HEDGE_MIN_SAMPLES       latencies observed per call site before hedging (default 20)
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import contextlib
+import json
+import logging
+import os
+import time
+
+import boto3
+from botocore.config import Config
+
+from jury_common import bedrock_executor, bedrock_stream
+from jury_common.bedrock_cache import cache_from_env, cache_key
+from jury_common.bedrock_executor import AdaptiveLimiter, CircuitBreaker, HedgePolicy
+from jury_common.usage_ledger import ledger
+
+# Errors after which the same request is worth sending to the fallback model
+FALLBACK_ERROR_CODES = {"AccessDeniedException", "ResourceNotFoundException"}
+
+logger = logging.getLogger()
+
+MAX_CONCURRENCY = int(os.environ.get("BEDROCK_MAX_CONCURRENCY", "8"))
+MAX_ATTEMPTS = int(os.environ.get("BEDROCK_MAX_ATTEMPTS", "6"))
+PROMPT_CACHING = os.environ.get("BEDROCK_PROMPT_CACHING", "true").lower() not in ("0", "false", "no")
+
+# Pool sized to the concurrency ceiling; retries are handled here, not by botocore,
+# so throttling feeds the limiter instead of being hidden inside the SDK.
+client = boto3.client(
+    "bedrock-runtime",
+    config=Config(
+        max_pool_connections=MAX_CONCURRENCY,
+        retries={"total_max_attempts": 1},
+        connect_timeout=10,
+        read_timeout=300,
+    ),
+)
+
+# Built once per container so the memory/disk tiers survive warm invocations
+cache = cache_from_env()
+
+limiter = AdaptiveLimiter(
+    initial=int(os.environ.get("BEDROCK_INITIAL_CONCURRENCY", "4")),
+    maximum=MAX_CONCURRENCY,
+    latency_target_seconds=float(os.environ.get("BEDROCK_LATENCY_TARGET_SECONDS", "0")),
+)
+
+hedging = HedgePolicy(
+    enabled=os.environ.get("BEDROCK_HEDGE_ENABLED", "").lower() in ("1", "true", "yes"),
+    percentile=float(os.environ.get("BEDROCK_HEDGE_PERCENTILE", "95")),
+    budget_fraction=float(os.environ.get("BEDROCK_HEDGE_BUDGET_PERCENT", "5")) / 100.0,
+    min_samples=int(os.environ.get("BEDROCK_HEDGE_MIN_SAMPLES", "20")),
+)
+# Original and hedge requests run here so the caller can wait on whichever finishes first
+_hedge_pool = ThreadPoolExecutor(max_workers=4 * MAX_CONCURRENCY) if hedging.enabled else None
+
+breaker = CircuitBreaker(
+    failure_threshold=int(os.environ.get("BEDROCK_BREAKER_THRESHOLD", "5")),
+    reset_timeout_seconds=float(os.environ.get("BEDROCK_BREAKER_RESET_SECONDS", "30")),
+)
+
+
+def cached_block(text: str) -> dict:
+    """Text content block ending a prompt-cache prefix.
+
+    Bedrock caches everything up to and including this block (tools, then
+    system, then messages), so put the static text first and the per-call
+    text after it. Prefixes shorter than the model's minimum (about 1024
+    tokens for Sonnet) are simply not cached; at most four per request.
+    """
+    block = {"type": "text", "text": text}
+    if PROMPT_CACHING:
+        block["cache_control"] = {"type": "ephemeral"}
+    return block
+
+
+def _log_usage(call_site: str, usage: dict | None, latency: float) -> None:
+    usage = usage or {}
+    logger.info(
+        f"Bedrock {call_site}: {usage.get('input_tokens', 0)} input / {usage.get('output_tokens', 0)} output tokens, "
+        f"prompt cache read {usage.get('cache_read_input_tokens', 0)} / "
+        f"write {usage.get('cache_creation_input_tokens', 0)}, {latency:.1f}s"
+    )
+
+
+def _is_cacheable(response_body: dict) -> bool:
+    """Only cache complete, successful messages; never truncated or error payloads."""
+    return (
+        isinstance(response_body, dict)
+        and response_body.get("type") == "message"
+        and response_body.get("stop_reason") in ("tool_use", "end_turn")
+        and bool(response_body.get("content"))
+    )
+
+
+def _call_with_retries(model_id: str, call):
+    """Run call() under the limiter and breaker, retrying throttles and transient errors with jitter.
+
+    Returns:
+        (call()'s return value, number of attempts made)
+    """
+    attempt = 0
+    while True:
+        attempt += 1
+        trial = breaker.before_call()
+        try:
+            limiter.acquire()
+            started = time.monotonic()
+            try:
+                result = call()
+            except Exception as e:
+                throttled = bedrock_executor.is_throttle(e)
+                retryable = bedrock_executor.is_retryable(e)
+                limiter.release(throttled=throttled)
+                # Throttles say nothing about availability, except on the trial call,
+                # where any error keeps the breaker open
+                if trial or (retryable and not throttled):
+                    breaker.record_failure()
+                if not retryable:
+                    raise
+                if attempt >= MAX_ATTEMPTS:
+                    logger.error(f"Bedrock call to {model_id} failed after {attempt} attempts: {e!s}")
+                    raise
+                delay = bedrock_executor.backoff_delay(attempt)
+                logger.warning(f"Bedrock call to {model_id} failed ({e!s}); retry {attempt} in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+
+            limiter.release(latency=time.monotonic() - started)
+            breaker.record_success()
+            return result, attempt
+        finally:
+            # Never leave the half-open trial slot taken, whatever happened above
+            if trial:
+                breaker.end_trial()
+
+
+def _invoke_with_retries(body: str, model_id: str) -> tuple[bytes, int]:
+    """Call Bedrock and return (raw response body, number of attempts made)."""
+
+    def call() -> bytes:
+        response = client.invoke_model(
+            body=body,
+            modelId=model_id,
+            accept="application/json",
+            contentType="application/json",
+        )
+        body_obj = response.get("body")
+        raw = body_obj.read() if hasattr(body_obj, "read") else body_obj
+        return raw.encode("utf-8") if isinstance(raw, str) else raw
+
+    return _call_with_retries(model_id, call)
+
+
+def _invoke_hedged(body: str, model_id: str, call_site: str) -> tuple[bytes, int, bool | None]:
+    """_invoke_with_retries(), duplicated once if it runs past the call site's p95 latency.
+
+    Returns:
+        (raw response body, attempts, True/False if a hedge was sent and won/lost, else None)
+    """
+    hedging.start_call()
+    delay = hedging.hedge_delay(call_site)
+    started = time.monotonic()
+    if delay is None:
+        raw, attempts = _invoke_with_retries(body, model_id)
+        hedge_won = None
+    else:
+        (raw, attempts), hedge_won, loser = bedrock_executor.hedged_call(
+            lambda: _invoke_with_retries(body, model_id), _hedge_pool, delay, hedging.try_acquire_hedge
+        )
+        if hedge_won is not None:
+            logger.info(f"Bedrock {call_site}: hedged after {delay:.1f}s; {'hedge' if hedge_won else 'original'} won")
+            if hedge_won:
+                hedging.record_win()
+            # The losing request still completes and is billed; keep it visible in the ledger
+            loser.add_done_callback(lambda f: _record_hedge_loser(f, model_id, call_site, started))
+    hedging.observe(call_site, time.monotonic() - started)
+    return raw, attempts, hedge_won
+
+
+def _record_hedge_loser(future, model_id: str, call_site: str, started: float) -> None:
+    if future.exception() is not None:
+        return
+    raw, attempts = future.result()
+    with contextlib.suppress(ValueError):
+        ledger.record(
+            call_site=f"{call_site}:hedge_loser",
+            model_id=model_id,
+            usage=json.loads(raw).get("usage"),
+            latency_seconds=time.monotonic() - started,
+            retries=attempts - 1,
+        )
+
+
+def _should_fall_back(exc: Exception) -> bool:
+    # Retryable errors only reach here once MAX_ATTEMPTS is exhausted
+    return bedrock_executor.is_retryable(exc) or bedrock_executor.error_code(exc) in FALLBACK_ERROR_CODES
+
+
+def invoke_model(body: str, model_id: str, call_site: str, fallback_model_id: str | None = None) -> dict:
+    """Invoke a Bedrock model and return the parsed JSON response body.
+
+    Args:
+        body: JSON request body (Anthropic messages format)
+        model_id: Bedrock model or inference profile ID
+        call_site: Name recorded in the usage ledger (usually the calling function)
+        fallback_model_id: Model to retry once with if model_id is unavailable or exhausts its retries
+
+    Returns:
+        The decoded response body, e.g. {'content': [...], 'usage': {...}, ...}
+    """
+    started = time.monotonic()
+    key = cache_key(model_id, body) if cache else None
+    if key:
+        cached = cache.get(key)
+        if cached is not None:
+            ledger.record(
+                call_site=call_site,
+                model_id=model_id,
+                usage=None,
+                latency_seconds=time.monotonic() - started,
+                cache_hit=True,
+            )
+            return json.loads(cached)
+
+    try:
+        raw, attempts, hedge_won = _invoke_hedged(body, model_id, call_site)
+    except Exception as e:
+        if not fallback_model_id or fallback_model_id == model_id or not _should_fall_back(e):
+            raise
+        logger.warning(f"Bedrock {call_site}: {model_id} failed ({e!s}); falling back to {fallback_model_id}")
+        return invoke_model(body=body, model_id=fallback_model_id, call_site=call_site)
+
+    response_body = json.loads(raw)
+    usage = response_body.get("usage") if isinstance(response_body, dict) else None
+    latency = time.monotonic() - started
+    _log_usage(call_site, usage, latency)
+    ledger.record(
+        call_site=call_site,
+        model_id=model_id,
+        usage=usage,
+        latency_seconds=latency,
+        retries=attempts - 1,
+        hedged=hedge_won is not None,
+        hedge_won=bool(hedge_won),
+    )
+
+    if key and _is_cacheable(response_body):
+        cache.put(key, raw, model_id=model_id)
+
+    return response_body
+
+
+def stream_tool_array(  # noqa: PLR0913
+    *,
+    body: str,
+    model_id: str,
+    call_site: str,
+    array_key: str,
+    on_item,
+    fallback_model_id: str | None = None,
+) -> dict:
+    """Like invoke_model(), but streams the response and reports tool-input array elements early.
+
+    on_item(index, element) is called for each element of the tool input's
+    `array_key` array as soon as the model closes it. A retried call replays
+    from index 0, so on_item should be idempotent per index. Cached responses
+    replay every element before returning.
+
+    Returns:
+        The complete response body, shaped exactly like invoke_model()'s.
+    """
+    started = time.monotonic()
+    key = cache_key(model_id, body) if cache else None
+    if key:
+        cached = cache.get(key)
+        if cached is not None:
+            ledger.record(
+                call_site=call_site,
+                model_id=model_id,
+                usage=None,
+                latency_seconds=time.monotonic() - started,
+                cache_hit=True,
+            )
+            response_body = json.loads(cached)
+            for block in response_body.get("content", []):
+                if block.get("type") == "tool_use":
+                    for index, item in enumerate((block.get("input") or {}).get(array_key) or []):
+                        on_item(index, item)
+            return response_body
+
+    def call() -> dict:
+        response = client.invoke_model_with_response_stream(
+            body=body,
+            modelId=model_id,
+            accept="application/json",
+            contentType="application/json",
+        )
+        return bedrock_stream.read_message_stream(response["body"], array_key=array_key, on_item=on_item)
+
+    try:
+        response_body, attempts = _call_with_retries(model_id, call)
+    except Exception as e:
+        if not fallback_model_id or fallback_model_id == model_id or not _should_fall_back(e):
+            raise
+        logger.warning(f"Bedrock {call_site}: {model_id} failed ({e!s}); falling back to {fallback_model_id}")
+        return stream_tool_array(
+            body=body, model_id=fallback_model_id, call_site=call_site, array_key=array_key, on_item=on_item
+        )
+
+    usage = response_body.get("usage")
+    latency = time.monotonic() - started
+    _log_usage(call_site, usage, latency)
+    ledger.record(
+        call_site=call_site,
+        model_id=model_id,
+        usage=usage,
+        latency_seconds=latency,
+        retries=attempts - 1,
+    )
+
+    if key and _is_cacheable(response_body):
+        cache.put(key, json.dumps(response_body).encode("utf-8"), model_id=model_id)
+
+    return response_body
+
+
+def run_concurrently(fn, items, max_workers: int | None = None) -> list:
+    """Fan fn out over items (results in input order); Bedrock concurrency stays bounded by the limiter."""
+    return bedrock_executor.run_concurrently(fn, items, max_workers=max_workers or MAX_CONCURRENCY)
+
+
+def cache_stats() -> dict:
+    """Hit/miss/write/eviction/error counters per cache tier for this container."""
+    return cache.stats() if cache else {}
+
+
+def executor_stats() -> dict:
+    """Current concurrency limit, throttle counts, breaker state and hedge metrics for this container."""
+    return {"limiter": limiter.stats(), "breaker": breaker.stats(), "hedging": hedging.stats()}
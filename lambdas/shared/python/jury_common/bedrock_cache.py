@@ -0,0 +1,308 @@
+"""Content-addressed cache for Bedrock model responses.
+
+Responses are keyed by a hash of the model ID and the canonicalized request
+body, so replaying a job (or re-running it after a config-only change) serves
+identical prompts from the cache instead of paying for another model call.
+
+Three tiers are available and are consulted in order:
+- MemoryCache: per-container LRU, survives between warm invocations
+- DiskCache: gzip files under /tmp, survives between warm invocations and
+  is larger than the memory tier
+- DynamoDBCache: a table shared by every Lambda and every job
+
+A hit in a lower tier is copied back into the tiers above it.
+"""
+
+from collections import OrderedDict
+import contextlib
+import gzip
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+import threading
+import time
+
+import boto3
+
+logger = logging.getLogger()
+
+# Bump to invalidate every cached response (e.g., after changing response parsing)
+CACHE_NAMESPACE = "v1"
+
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+
+
+def cache_key(model_id: str, body: str | bytes | dict) -> str:
+    """Return the content hash used as the cache key for one model request.
+
+    The body is re-serialized with sorted keys so that semantically identical
+    requests map to the same key regardless of dict ordering.
+    """
+    if isinstance(body, bytes):
+        body = body.decode("utf-8")
+    if isinstance(body, str):
+        with contextlib.suppress(json.JSONDecodeError):
+            body = json.loads(body)
+    canonical = body if isinstance(body, str) else json.dumps(body, sort_keys=True, separators=(",", ":"))
+    digest = hashlib.sha256()
+    digest.update(CACHE_NAMESPACE.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(model_id.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(canonical.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class CacheStats:
+    """Thread-safe hit/miss/write/eviction/error counters for one cache tier."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.errors = 0
+
+    def incr(self, field: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + amount)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "evictions": self.evictions,
+                "errors": self.errors,
+            }
+
+
+class MemoryCache:
+    """In-process LRU of serialized responses with a per-entry expiry."""
+
+    name = "memory"
+
+    def __init__(self, max_items: int = 256, ttl_seconds: int = DEFAULT_TTL_SECONDS):
+        self.max_items = max_items
+        self.ttl_seconds = ttl_seconds
+        self.stats = CacheStats()
+        self._items: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is not None and entry[0] < time.time():
+                del self._items[key]
+                entry = None
+                self.stats.incr("evictions")
+            if entry is None:
+                self.stats.incr("misses")
+                return None
+            self._items.move_to_end(key)
+        self.stats.incr("hits")
+        return entry[1]
+
+    def put(self, key: str, payload: bytes) -> None:
+        with self._lock:
+            self._items[key] = (time.time() + self.ttl_seconds, payload)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+                self.stats.incr("evictions")
+        self.stats.incr("writes")
+
+
+class DiskCache:
+    """Gzip files under a local directory (Lambda's /tmp), bounded by total size.
+
+    Each file stores its own expiry so stale entries are ignored and removed
+    on read; when the directory grows past max_bytes the least recently used
+    files are deleted.
+    """
+
+    name = "disk"
+
+    def __init__(
+        self,
+        directory: str = "/tmp/bedrock-cache",
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl_seconds: int = DEFAULT_TTL_SECONDS,
+    ):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Running estimate of the directory size; only re-measured when over budget
+        self._approx_bytes = sum(p.stat().st_size for p in self.directory.glob("*/*.json.gz"))
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json.gz"
+
+    def get(self, key: str) -> bytes | None:
+        path = self._path(key)
+        try:
+            record = json.loads(gzip.decompress(path.read_bytes()))
+        except FileNotFoundError:
+            self.stats.incr("misses")
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable disk cache entry {path}: {e!s}")
+            path.unlink(missing_ok=True)
+            self.stats.incr("errors")
+            self.stats.incr("misses")
+            return None
+
+        if record.get("expires_at", 0) < time.time():
+            path.unlink(missing_ok=True)
+            self.stats.incr("evictions")
+            self.stats.incr("misses")
+            return None
+
+        # Touch so eviction approximates LRU
+        os.utime(path)
+        self.stats.incr("hits")
+        return record["payload"].encode("utf-8")
+
+    def put(self, key: str, payload: bytes) -> None:
+        path = self._path(key)
+        record = {"expires_at": time.time() + self.ttl_seconds, "payload": payload.decode("utf-8")}
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+            data = gzip.compress(json.dumps(record).encode("utf-8"))
+            tmp_path.write_bytes(data)
+            tmp_path.replace(path)
+        except OSError as e:
+            logger.warning(f"Failed to write disk cache entry {path}: {e!s}")
+            self.stats.incr("errors")
+            return
+        self.stats.incr("writes")
+        with self._lock:
+            self._approx_bytes += len(data)
+            over_budget = self._approx_bytes > self.max_bytes
+        if over_budget:
+            self._evict()
+
+    def _evict(self) -> None:
+        with self._lock:
+            files = [(p, p.stat()) for p in self.directory.glob("*/*.json.gz")]
+            total = sum(st.st_size for _, st in files)
+            for p, st in sorted(files, key=lambda f: f[1].st_mtime):
+                if total <= self.max_bytes:
+                    break
+                p.unlink(missing_ok=True)
+                total -= st.st_size
+                self.stats.incr("evictions")
+            self._approx_bytes = total
+
+
+class DynamoDBCache:
+    """Shared tier backed by a DynamoDB table with TTL enabled on 'expires_at'.
+
+    Table schema: hash key 'cache_key' (S); payloads are stored gzipped in
+    'payload' (B). DynamoDB deletes expired items lazily, so expiry is also
+    checked on read.
+    """
+
+    name = "dynamodb"
+
+    def __init__(self, table_name: str, ttl_seconds: int = DEFAULT_TTL_SECONDS):
+        self.table_name = table_name
+        self.ttl_seconds = ttl_seconds
+        self.stats = CacheStats()
+        self._table = boto3.resource("dynamodb").Table(table_name)
+
+    def get(self, key: str) -> bytes | None:
+        try:
+            item = self._table.get_item(Key={"cache_key": key}).get("Item")
+        except Exception as e:
+            logger.warning(f"Bedrock cache lookup failed in {self.table_name}: {e!s}")
+            self.stats.incr("errors")
+            self.stats.incr("misses")
+            return None
+        if not item or int(item.get("expires_at", 0)) < time.time():
+            self.stats.incr("misses")
+            return None
+        self.stats.incr("hits")
+        return gzip.decompress(bytes(item["payload"]))
+
+    def put(self, key: str, payload: bytes, model_id: str | None = None) -> None:
+        item = {
+            "cache_key": key,
+            "payload": gzip.compress(payload),
+            "expires_at": int(time.time() + self.ttl_seconds),
+        }
+        if model_id:
+            item["model_id"] = model_id
+        try:
+            self._table.put_item(Item=item)
+        except Exception as e:
+            logger.warning(f"Bedrock cache write failed in {self.table_name}: {e!s}")
+            self.stats.incr("errors")
+            return
+        self.stats.incr("writes")
+
+
+class ResponseCache:
+    """Read-through/write-through composition of cache tiers (fastest first)."""
+
+    def __init__(self, tiers: list):
+        self.tiers = tiers
+
+    def get(self, key: str) -> bytes | None:
+        for i, tier in enumerate(self.tiers):
+            payload = tier.get(key)
+            if payload is not None:
+                # Promote into the faster tiers we already missed
+                for upper in self.tiers[:i]:
+                    upper.put(key, payload)
+                return payload
+        return None
+
+    def put(self, key: str, payload: bytes, model_id: str | None = None) -> None:
+        for tier in self.tiers:
+            if isinstance(tier, DynamoDBCache):
+                tier.put(key, payload, model_id=model_id)
+            else:
+                tier.put(key, payload)
+
+    def stats(self) -> dict:
+        return {tier.name: tier.stats.as_dict() for tier in self.tiers}
+
+
+def cache_from_env() -> ResponseCache | None:
+    """Build the cache configured by environment variables.
+
+    BEDROCK_CACHE_DISABLED      "1"/"true" turns caching off entirely
+    BEDROCK_CACHE_TTL_SECONDS   entry lifetime for every tier (default 7 days)
+    BEDROCK_CACHE_MEMORY_ITEMS  LRU size of the memory tier (default 256)
+    BEDROCK_CACHE_DIR           disk tier directory (default /tmp/bedrock-cache; "" disables)
+    BEDROCK_CACHE_DISK_MB       disk tier size bound (default 256)
+    BEDROCK_CACHE_TABLE_NAME    DynamoDB table for the shared tier (unset disables)
+    """
+    if os.environ.get("BEDROCK_CACHE_DISABLED", "").lower() in ("1", "true", "yes"):
+        return None
+
+    ttl = int(os.environ.get("BEDROCK_CACHE_TTL_SECONDS", str(DEFAULT_TTL_SECONDS)))
+    tiers: list = [MemoryCache(max_items=int(os.environ.get("BEDROCK_CACHE_MEMORY_ITEMS", "256")), ttl_seconds=ttl)]
+
+    cache_dir = os.environ.get("BEDROCK_CACHE_DIR", "/tmp/bedrock-cache")
+    if cache_dir:
+        try:
+            max_bytes = int(os.environ.get("BEDROCK_CACHE_DISK_MB", "256")) * 1024 * 1024
+            tiers.append(DiskCache(directory=cache_dir, max_bytes=max_bytes, ttl_seconds=ttl))
+        except OSError as e:
+            logger.warning(f"Disk cache unavailable at {cache_dir}: {e!s}")
+
+    table_name = os.environ.get("BEDROCK_CACHE_TABLE_NAME")
+    if table_name:
+        tiers.append(DynamoDBCache(table_name=table_name, ttl_seconds=ttl))
+
+    return ResponseCache(tiers)
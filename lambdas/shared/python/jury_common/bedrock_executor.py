@@ -0,0 +1,306 @@
+"""Concurrency control for Bedrock calls: AIMD limiter, retries and circuit breaker.
+
+- AdaptiveLimiter bounds the number of in-flight model calls. The limit grows
+  by roughly one slot per round of successful calls (additive increase) and
+  is cut by a constant factor when Bedrock throttles or latency exceeds the
+  target (multiplicative decrease).
+- CircuitBreaker fails calls fast after repeated server/connection errors so
+  a Lambda stops burning its timeout against an unhealthy endpoint.
+- backoff_delay() gives capped exponential backoff with full jitter.
+- HedgePolicy/hedged_call() send a duplicate of a call that has run longer
+  than its call site's observed p95 latency and take whichever answer
+  arrives first, within a budget of hedges per call.
+- run_concurrently() fans independent calls out on a thread pool; the limiter,
+  not the pool size, decides how many of them actually hit Bedrock at once.
+"""
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+import logging
+import random
+import threading
+import time
+
+from botocore.exceptions import BotoCoreError, ClientError
+
+logger = logging.getLogger()
+
+THROTTLE_ERROR_CODES = {"ThrottlingException", "TooManyRequestsException", "ServiceUnavailableException"}
+RETRYABLE_ERROR_CODES = THROTTLE_ERROR_CODES | {
+    "InternalServerException",
+    "ModelNotReadyException",
+    "ModelTimeoutException",
+    "ModelStreamErrorException",
+}
+
+
+class BedrockUnavailableError(RuntimeError):
+    """Raised without calling Bedrock while the circuit breaker is open."""
+
+
+def error_code(exc: Exception) -> str | None:
+    if isinstance(exc, ClientError):
+        code = exc.response.get("Error", {}).get("Code")
+        # Errors raised mid-stream use the event name, e.g. 'throttlingException'
+        return code[:1].upper() + code[1:] if code else code
+    return None
+
+
+def is_throttle(exc: Exception) -> bool:
+    return error_code(exc) in THROTTLE_ERROR_CODES
+
+
+def is_retryable(exc: Exception) -> bool:
+    # BotoCoreError covers connection resets, endpoint and read timeouts
+    return error_code(exc) in RETRYABLE_ERROR_CODES or isinstance(exc, BotoCoreError)
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 30.0) -> float:
+    """Full-jitter exponential backoff for the given 1-based retry attempt."""
+    return random.uniform(0, min(cap, base * (2 ** (attempt - 1))))
+
+
+class AdaptiveLimiter:
+    """Counting semaphore whose size adapts to throttling and latency (AIMD)."""
+
+    def __init__(  # noqa: PLR0913
+        self,
+        *,
+        initial: int = 4,
+        minimum: int = 1,
+        maximum: int = 16,
+        decrease_factor: float = 0.5,
+        latency_target_seconds: float = 0.0,
+        decrease_cooldown_seconds: float = 1.0,
+    ):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease_factor = decrease_factor
+        self.latency_target_seconds = latency_target_seconds
+        self.decrease_cooldown_seconds = decrease_cooldown_seconds
+        self._limit = float(max(minimum, min(initial, maximum)))
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+        self.throttles = 0
+        self.slow_calls = 0
+        self.peak_in_flight = 0
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self._in_flight >= int(self._limit):
+                self._cond.wait()
+            self._in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self._in_flight)
+
+    def release(self, throttled: bool = False, latency: float | None = None) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            slow = bool(self.latency_target_seconds and latency and latency > self.latency_target_seconds)
+            if throttled or slow:
+                if throttled:
+                    self.throttles += 1
+                else:
+                    self.slow_calls += 1
+                self._decrease()
+            elif latency is not None:
+                # +1 slot once per "window" of successful calls at the current limit
+                self._limit = min(float(self.maximum), self._limit + 1.0 / self._limit)
+            self._cond.notify_all()
+
+    def _decrease(self) -> None:
+        # Several in-flight calls usually fail together; treat them as one congestion event
+        now = time.monotonic()
+        if now - self._last_decrease < self.decrease_cooldown_seconds:
+            return
+        self._last_decrease = now
+        self._limit = max(float(self.minimum), self._limit * self.decrease_factor)
+        logger.info(f"Bedrock concurrency limit lowered to {int(self._limit)}")
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "limit": int(self._limit),
+                "in_flight": self._in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "throttles": self.throttles,
+                "slow_calls": self.slow_calls,
+            }
+
+
+class CircuitBreaker:
+    """Opens after N consecutive failures, then lets one trial call through after a cooldown."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout_seconds: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        self.trips = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout_seconds:
+            return "half_open"
+        return "open"
+
+    def before_call(self) -> bool:
+        """Admit a call or raise BedrockUnavailableError.
+
+        Returns:
+            True if this call is the half-open trial; the caller must end it
+            with record_success(), record_failure() or end_trial()
+        """
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return False
+            if state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+        raise BedrockUnavailableError("Bedrock circuit breaker is open; failing fast")
+
+    def end_trial(self) -> None:
+        """Release the half-open trial slot if the trial ended without a recorded outcome."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            failed_trial = self._trial_in_flight
+            if failed_trial or (self._opened_at is None and self._failures >= self.failure_threshold):
+                self.trips += 1
+                self._opened_at = time.monotonic()
+                logger.warning(f"Bedrock circuit breaker opened after {self._failures} consecutive failures")
+            self._trial_in_flight = False
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"state": self._state(), "consecutive_failures": self._failures, "trips": self.trips}
+
+
+class HedgePolicy:
+    """Decides when to hedge a call and keeps the budget and hedge metrics.
+
+    Latencies are tracked per key (call site) over a sliding window; a call is
+    hedged once it exceeds the key's `percentile` latency, but only while
+    hedges stay within `budget_fraction` of all calls.
+    """
+
+    def __init__(
+        self,
+        *,
+        enabled: bool = False,
+        percentile: float = 95.0,
+        budget_fraction: float = 0.05,
+        min_samples: int = 20,
+        window: int = 200,
+    ):
+        self.enabled = enabled
+        self.percentile = percentile
+        self.budget_fraction = budget_fraction
+        self.min_samples = min_samples
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples: dict[str, deque] = {}
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def observe(self, key: str, latency: float) -> None:
+        with self._lock:
+            self._samples.setdefault(key, deque(maxlen=self.window)).append(latency)
+
+    def hedge_delay(self, key: str) -> float | None:
+        """Seconds to wait before hedging a call for this key (None = do not hedge)."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * self.percentile / 100.0))]
+
+    def start_call(self) -> None:
+        with self._lock:
+            self.calls += 1
+
+    def try_acquire_hedge(self) -> bool:
+        with self._lock:
+            if self.hedges + 1 > self.budget_fraction * self.calls:
+                return False
+            self.hedges += 1
+            return True
+
+    def record_win(self) -> None:
+        with self._lock:
+            self.hedge_wins += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "calls": self.calls,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "hedge_rate": round(self.hedges / self.calls, 4) if self.calls else 0.0,
+                "win_rate": round(self.hedge_wins / self.hedges, 4) if self.hedges else 0.0,
+            }
+
+
+def hedged_call(fn, pool: ThreadPoolExecutor, delay: float, allow_hedge) -> tuple[object, bool | None, Future | None]:
+    """Run fn(); if it is still running after `delay` seconds and allow_hedge() agrees, run it again.
+
+    Returns:
+        (first successful result, True if the hedge won / False if the original won /
+        None if no hedge was sent, the losing future if a hedge was sent)
+    """
+    primary = pool.submit(fn)
+    done, _ = wait([primary], timeout=delay)
+    if done or not allow_hedge():
+        return primary.result(), None, None
+
+    hedge = pool.submit(fn)
+    pending = {primary, hedge}
+    first_error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        # If both finished together, prefer the original request
+        for future in sorted(done, key=lambda f: f is hedge):
+            if future.exception() is None:
+                loser = hedge if future is primary else primary
+                return future.result(), future is hedge, loser
+            first_error = first_error or future.exception()
+    raise first_error
+
+
+def run_concurrently(fn, items, max_workers: int = 16) -> list:
+    """Apply fn to every item on a thread pool and return results in input order.
+
+    The first exception raised by fn is re-raised. A fresh pool is used per
+    call so nested fan-outs cannot deadlock waiting on each other's workers.
+    """
+    items = list(items)
+    if len(items) <= 1 or max_workers <= 1:
+        return [fn(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as pool:
+        return list(pool.map(fn, items))
@@ -0,0 +1,130 @@
+"""Incremental parsing of Bedrock response streams for tool-use payloads.
+
+invoke_model_with_response_stream delivers a tool call's input as a series of
+partial JSON fragments. ToolInputArrayParser watches those fragments and hands
+back each element of one top-level array (e.g. "instructions") as soon as its
+closing brace arrives, so callers can act on the first item long before the
+model has finished the last one. read_message_stream() reassembles the stream
+into the same message dict invoke_model() returns.
+"""
+
+import json
+
+
+class ToolInputArrayParser:
+    """Emit completed elements of `{"<array_key>": [{...}, {...}]}` from JSON fragments.
+
+    Only string/escape state and bracket depth are tracked; each element is
+    decoded with json.loads once its closing brace is seen.
+    """
+
+    def __init__(self, array_key: str):
+        self.array_key = array_key
+        self.count = 0
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_key: str | None = None
+        self._array_depth: int | None = None
+        self._item_start: int | None = None
+
+    def feed(self, fragment: str) -> list[tuple[int, dict]]:  # noqa: PLR0912
+        """Consume the next fragment; return (index, element) for every element it completed."""
+        self._text += fragment
+        completed = []
+        text = self._text
+        for i in range(self._pos, len(text)):
+            c = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_key = text[self._string_start + 1 : i]
+                continue
+
+            if c == '"':
+                self._in_string = True
+                self._string_start = i
+            elif c in "{[":
+                if c == "[" and self._depth == 1 and self._last_key == self.array_key:
+                    self._array_depth = self._depth + 1
+                elif c == "{" and self._array_depth is not None and self._depth == self._array_depth:
+                    self._item_start = i
+                self._depth += 1
+            elif c in "}]":
+                self._depth -= 1
+                if self._array_depth is None:
+                    continue
+                if c == "}" and self._depth == self._array_depth and self._item_start is not None:
+                    completed.append((self.count, json.loads(text[self._item_start : i + 1])))
+                    self.count += 1
+                    self._item_start = None
+                elif c == "]" and self._depth == self._array_depth - 1:
+                    self._array_depth = None
+        self._pos = len(text)
+        return completed
+
+
+def read_message_stream(events, array_key: str | None = None, on_item=None) -> dict:  # noqa: PLR0912
+    """Reassemble an Anthropic messages stream into a complete response body.
+
+    Args:
+        events: The EventStream from invoke_model_with_response_stream()['body']
+        array_key: Top-level array in the tool input whose elements are emitted early
+        on_item: Called as on_item(index, element) for each completed array element
+
+    Returns:
+        {'type': 'message', 'content': [...], 'stop_reason': ..., 'usage': {...}}
+    """
+    message: dict = {"type": "message", "content": []}
+    usage: dict = {}
+    blocks: dict[int, dict] = {}
+    fragments: dict[int, list[str]] = {}
+    parsers: dict[int, ToolInputArrayParser] = {}
+
+    for event in events:
+        chunk = event.get("chunk")
+        if not chunk:
+            continue
+        data = json.loads(chunk["bytes"])
+        event_type = data.get("type")
+
+        if event_type == "message_start":
+            message.update({k: v for k, v in (data.get("message") or {}).items() if k not in ("content", "usage")})
+            usage.update((data.get("message") or {}).get("usage") or {})
+        elif event_type == "content_block_start":
+            index = data["index"]
+            blocks[index] = dict(data.get("content_block") or {})
+            if blocks[index].get("type") == "tool_use":
+                fragments[index] = []
+                if array_key and on_item:
+                    parsers[index] = ToolInputArrayParser(array_key)
+        elif event_type == "content_block_delta":
+            index = data["index"]
+            delta = data.get("delta") or {}
+            if delta.get("type") == "input_json_delta":
+                fragment = delta.get("partial_json", "")
+                fragments[index].append(fragment)
+                if index in parsers:
+                    for item_index, item in parsers[index].feed(fragment):
+                        on_item(item_index, item)
+            elif delta.get("type") == "text_delta":
+                blocks[index]["text"] = blocks[index].get("text", "") + delta.get("text", "")
+        elif event_type == "content_block_stop":
+            index = data["index"]
+            if index in fragments:
+                blocks[index]["input"] = json.loads("".join(fragments[index]) or "{}")
+        elif event_type == "message_delta":
+            message.update(data.get("delta") or {})
+            usage.update(data.get("usage") or {})
+
+    message["content"] = [blocks[i] for i in sorted(blocks)]
+    message["usage"] = usage
+    return message
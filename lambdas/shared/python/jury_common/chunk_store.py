@@ -0,0 +1,238 @@
+"""Chunk loading for S3 chunk pointers, cached across warm invocations.
+
+textract_get_results writes each document's chunks once, to
+results/{job_id}.chunks.json.gz, and hands later states a pointer:
+    {"S3Object": {"Bucket": ..., "Key": ...}, "Compression": "gzip", "ETag": ..., ...}
+Every extraction and enrichment Lambda used to download and gunzip that object
+on each invocation. ChunkStore keeps decoded chunks in two tiers:
+- memory: per-container LRU of decoded lists
+- disk: gzip files under /tmp, which outlive a memory eviction
+
+Entries are keyed by bucket/key and remember the object's ETag. A pointer that
+carries its ETag (all pointers written by textract_get_results do) is served
+from a matching entry without any S3 request. For a pointer without one, the
+cached entry is revalidated with a conditional GET (If-None-Match), which
+costs a request but no transfer. Otherwise the object is downloaded.
+
+An inline chunk list is returned as-is.
+"""
+
+from collections import OrderedDict
+import gzip
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+import threading
+
+import boto3
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger()
+
+HTTP_NOT_MODIFIED = 304
+
+
+def parse_pointer(value) -> tuple[str, str, str | None, bool] | None:
+    """(bucket, key, etag, gzipped) of a chunks pointer, or None if `value` is not one."""
+    if not isinstance(value, dict):
+        return None
+    s3obj = value.get("S3Object") if isinstance(value.get("S3Object"), dict) else value
+    if not {"Bucket", "Key"}.issubset(s3obj):
+        return None
+    key = s3obj["Key"]
+    gzipped = value.get("Compression") == "gzip" or key.endswith(".gz")
+    return s3obj["Bucket"], key, value.get("ETag") or s3obj.get("ETag"), gzipped
+
+
+def identity(value) -> str | None:
+    """Stable key for the chunks a value holds, for caching results derived from them.
+
+    A pointer is identified by bucket/key@ETag and an inline list by a hash of
+    its chunks; a pointer without an ETag has no stable identity (None).
+    """
+    if isinstance(value, list):
+        return "sha256:" + hashlib.sha256(json.dumps(value).encode("utf-8")).hexdigest()
+    pointer = parse_pointer(value)
+    if pointer is None or not pointer[2]:
+        return None
+    bucket, key, etag, _ = pointer
+    return f"{bucket}/{key}@{etag}"
+
+
+def _decode(body: bytes, gzipped: bool) -> list:
+    if gzipped:
+        body = gzip.decompress(body)
+    chunks = json.loads(body.decode("utf-8"))
+    if not isinstance(chunks, list):
+        raise ValueError("Loaded chunks is not a list")
+    return chunks
+
+
+class ChunkStore:
+    """Memory LRU + /tmp disk cache of decoded chunk lists, validated by ETag.
+
+    Args:
+        memory_items: Documents kept decoded in memory
+        directory: Disk tier directory; None disables the disk tier
+        max_disk_bytes: Disk tier size bound (least recently used files go first)
+    """
+
+    def __init__(self, memory_items: int = 8, directory: str | None = "/tmp/chunk-cache", max_disk_bytes: int = 0):
+        self.memory_items = memory_items
+        self.directory = Path(directory) if directory else None
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: OrderedDict[str, tuple[str | None, list]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._s3 = None
+        self._counts = {"memory_hits": 0, "disk_hits": 0, "revalidated": 0, "downloads": 0, "errors": 0}
+        if self.directory:
+            try:
+                self.directory.mkdir(parents=True, exist_ok=True)
+            except OSError as e:
+                logger.warning(f"Chunk disk cache unavailable at {self.directory}: {e!s}")
+                self.directory = None
+
+    @property
+    def s3(self):
+        if self._s3 is None:
+            self._s3 = boto3.client("s3")
+        return self._s3
+
+    def _count(self, field: str) -> None:
+        with self._lock:
+            self._counts[field] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._counts, memory_entries=len(self._memory))
+
+    # --- tiers ---
+
+    def _memory_get(self, cache_key: str) -> tuple[str | None, list] | None:
+        with self._lock:
+            entry = self._memory.get(cache_key)
+            if entry is not None:
+                self._memory.move_to_end(cache_key)
+            return entry
+
+    def _memory_put(self, cache_key: str, etag: str | None, chunks: list) -> None:
+        with self._lock:
+            self._memory[cache_key] = (etag, chunks)
+            self._memory.move_to_end(cache_key)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+
+    def _disk_path(self, cache_key: str) -> Path:
+        return self.directory / f"{hashlib.sha256(cache_key.encode('utf-8')).hexdigest()}.json.gz"
+
+    def _disk_get(self, cache_key: str) -> tuple[str | None, list] | None:
+        if not self.directory:
+            return None
+        path = self._disk_path(cache_key)
+        try:
+            record = json.loads(gzip.decompress(path.read_bytes()))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable chunk cache entry {path}: {e!s}")
+            path.unlink(missing_ok=True)
+            self._count("errors")
+            return None
+        # Touch so eviction approximates LRU
+        os.utime(path)
+        return record.get("etag"), record["chunks"]
+
+    def _disk_put(self, cache_key: str, etag: str | None, chunks: list) -> None:
+        if not self.directory:
+            return
+        path = self._disk_path(cache_key)
+        try:
+            tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(gzip.compress(json.dumps({"etag": etag, "chunks": chunks}).encode("utf-8")))
+            tmp_path.replace(path)
+        except OSError as e:
+            logger.warning(f"Failed to write chunk cache entry {path}: {e!s}")
+            self._count("errors")
+            return
+        if self.max_disk_bytes:
+            files = sorted(self.directory.glob("*.json.gz"), key=lambda p: p.stat().st_mtime, reverse=True)
+            total = 0
+            for p in files:
+                total += p.stat().st_size
+                if total > self.max_disk_bytes and p != path:
+                    p.unlink(missing_ok=True)
+
+    # --- loading ---
+
+    def _fetch(self, bucket: str, key: str, gzipped: bool, cached: tuple[str | None, list] | None) -> tuple:
+        """Download the object, or confirm `cached` is current with a conditional GET."""
+        kwargs = {"Bucket": bucket, "Key": key}
+        if cached is not None and cached[0]:
+            kwargs["IfNoneMatch"] = cached[0]
+        try:
+            obj = self.s3.get_object(**kwargs)
+        except ClientError as e:
+            status = e.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+            if cached is not None and (status == HTTP_NOT_MODIFIED or e.response.get("Error", {}).get("Code") == "304"):
+                self._count("revalidated")
+                return cached
+            raise
+        self._count("downloads")
+        return obj.get("ETag"), _decode(obj["Body"].read(), gzipped)
+
+    def load(self, value) -> list:
+        """Chunks for an inline list or an S3 chunks pointer.
+
+        Raises:
+            ValueError: `value` is neither a list nor a chunks pointer, or the object is not a list
+        """
+        if isinstance(value, list):
+            return value
+        pointer = parse_pointer(value)
+        if pointer is None:
+            raise ValueError("Invalid chunks input; expected list or S3 pointer dict")
+        bucket, key, etag, gzipped = pointer
+        cache_key = f"{bucket}/{key}"
+
+        cached, tier = self._memory_get(cache_key), "memory_hits"
+        if cached is None:
+            cached, tier = self._disk_get(cache_key), "disk_hits"
+        if cached is not None and etag:
+            if cached[0] == etag:
+                self._count(tier)
+                if tier == "disk_hits":
+                    self._memory_put(cache_key, *cached)
+                return cached[1]
+            # The pointer names a different version; the cached copy is stale
+            cached = None
+
+        fetched_etag, chunks = self._fetch(bucket, key, gzipped, cached)
+        if cached is None or fetched_etag != cached[0]:
+            logger.info(f"Loaded {len(chunks)} chunks from s3://{bucket}/{key}")
+            self._disk_put(cache_key, fetched_etag, chunks)
+        self._memory_put(cache_key, fetched_etag, chunks)
+        return chunks
+
+
+def store_from_env() -> ChunkStore:
+    """Build the store configured by environment variables.
+
+    CHUNK_CACHE_MEMORY_ITEMS  documents kept decoded in memory (default 8)
+    CHUNK_CACHE_DIR           disk tier directory (default /tmp/chunk-cache; "" disables)
+    CHUNK_CACHE_DISK_MB       disk tier size bound (default 128)
+    """
+    return ChunkStore(
+        memory_items=int(os.environ.get("CHUNK_CACHE_MEMORY_ITEMS", "8")),
+        directory=os.environ.get("CHUNK_CACHE_DIR", "/tmp/chunk-cache") or None,
+        max_disk_bytes=int(os.environ.get("CHUNK_CACHE_DISK_MB", "128")) * 1024 * 1024,
+    )
+
+
+store = store_from_env()
+
+
+def load_chunks(value) -> list:
+    """Chunks for an inline list or an S3 chunks pointer, through the container's shared store."""
+    return store.load(value)
@@ -0,0 +1,140 @@
+"""Learned aliases: normalized claim names -> Claims table IDs, shared across jobs.
+
+The same names ("Breach of Contract", "Account Stated", ...) appear in most
+complaints. Once match_claims_to_database has matched a name with high
+confidence it is stored here, and later jobs resolve it without a model call.
+
+Items in the ClaimAliases table:
+    alias      (hash key) dedup.normalize(name), e.g. "breach of contract"
+    claim_id   Claims table ID
+    name       the name as first seen
+    source     "match" (learned from an LLM match) or "operator" (set by hand)
+    updated_at epoch seconds
+
+Each container keeps an in-memory mirror of the whole table (it is small),
+reloaded every CLAIM_ALIASES_REFRESH_SECONDS so operator edits reach warm
+containers. Learned entries never overwrite operator entries. Operators edit
+the table with scripts/claim_aliases.py.
+
+Disabled (lookups miss, learning is a no-op) when CLAIM_ALIASES_TABLE_NAME is unset.
+"""
+
+import logging
+import os
+import threading
+import time
+
+import boto3
+from botocore.exceptions import ClientError
+
+from jury_common import dedup
+
+logger = logging.getLogger()
+
+SOURCE_MATCH = "match"
+SOURCE_OPERATOR = "operator"
+
+
+class AliasStore:
+    """DynamoDB-backed alias table with an in-memory mirror."""
+
+    def __init__(self, table_name: str | None, refresh_seconds: float = 300.0):
+        self.table_name = table_name
+        self.refresh_seconds = refresh_seconds
+        self._table = boto3.resource("dynamodb").Table(table_name) if table_name else None
+        self._lock = threading.Lock()
+        self._mirror: dict[str, dict] = {}
+        self._loaded_at: float | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._table is not None
+
+    def _refresh_if_stale(self) -> None:
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        if self._loaded_at is not None and now - self._loaded_at < self.refresh_seconds:
+            return
+        try:
+            items = []
+            kwargs: dict = {}
+            while True:
+                resp = self._table.scan(**kwargs)
+                items.extend(resp.get("Items", []))
+                if not resp.get("LastEvaluatedKey"):
+                    break
+                kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+        except ClientError as e:
+            # Keep serving the previous mirror; try again on the next refresh
+            logger.warning(f"Could not load claim aliases from {self.table_name}: {e!s}")
+            self._loaded_at = now
+            return
+        with self._lock:
+            self._mirror = {item["alias"]: item for item in items if item.get("alias")}
+            self._loaded_at = now
+        logger.info(f"Loaded {len(items)} claim aliases from {self.table_name}")
+
+    def lookup(self, name: str) -> str | None:
+        """Claim ID stored for a name, or None."""
+        self._refresh_if_stale()
+        entry = self._mirror.get(dedup.normalize(name))
+        return str(entry["claim_id"]) if entry and entry.get("claim_id") else None
+
+    def put(self, name: str, claim_id: str, *, source: str = SOURCE_MATCH) -> bool:
+        """Store an alias; learned (non-operator) writes never replace an operator entry.
+
+        Returns:
+            True if the alias was written
+        """
+        alias = dedup.normalize(name)
+        if not self.enabled or not alias or not claim_id:
+            return False
+        item = {
+            "alias": alias,
+            "claim_id": str(claim_id),
+            "name": name,
+            "source": source,
+            "updated_at": int(time.time()),
+        }
+        kwargs: dict = {"Item": item}
+        if source != SOURCE_OPERATOR:
+            kwargs["ConditionExpression"] = "attribute_not_exists(#alias) OR #source <> :operator"
+            kwargs["ExpressionAttributeNames"] = {"#alias": "alias", "#source": "source"}
+            kwargs["ExpressionAttributeValues"] = {":operator": SOURCE_OPERATOR}
+        try:
+            self._table.put_item(**kwargs)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") != "ConditionalCheckFailedException":
+                logger.warning(f"Could not store claim alias '{alias}': {e!s}")
+            return False
+        with self._lock:
+            self._mirror[alias] = item
+        return True
+
+    def learn(self, name: str, claim_id: str) -> bool:
+        """Record a confident model match unless the table already maps the name to that ID."""
+        if self.lookup(name) == str(claim_id):
+            return False
+        return self.put(name, claim_id, source=SOURCE_MATCH)
+
+    def delete(self, name: str) -> None:
+        """Remove the alias for a name."""
+        alias = dedup.normalize(name)
+        if not self.enabled:
+            return
+        self._table.delete_item(Key={"alias": alias})
+        with self._lock:
+            self._mirror.pop(alias, None)
+
+    def entries(self) -> list[dict]:
+        """All aliases, freshly loaded from the table."""
+        self._loaded_at = None
+        self._refresh_if_stale()
+        return sorted(self._mirror.values(), key=lambda item: item["alias"])
+
+
+aliases = AliasStore(
+    os.environ.get("CLAIM_ALIASES_TABLE_NAME"),
+    refresh_seconds=float(os.environ.get("CLAIM_ALIASES_REFRESH_SECONDS", "300")),
+)
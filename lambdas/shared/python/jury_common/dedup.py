@@ -0,0 +1,202 @@
+"""Deterministic grouping of extracted claim/defense names ahead of LLM deduplication.
+
+Sliding-window extraction reports the same heading once per overlapping window
+("COUNT I - BREACH OF CONTRACT", "Count 1: Breach of Contract", ...). group()
+merges names that normalize to the same text or are near-identical, and reports
+which of the resulting groups are similar enough that only a model can tell
+whether they are the same cause of action or defense. Callers send just those
+ambiguous groups to Bedrock and skip the call entirely when there are none.
+"""
+
+from collections import Counter
+import difflib
+import re
+
+# At or above: the same name, merged locally
+MERGE_THRESHOLD = 0.92
+# Between this and MERGE_THRESHOLD: possibly the same, the model decides
+AMBIGUOUS_THRESHOLD = 0.75
+
+# Heading words around a name ("COUNT II -", "FIRST AFFIRMATIVE DEFENSE:", "(Counterclaim No. 3)")
+_LABEL_WORDS = {
+    "count",
+    "counts",
+    "counterclaim",
+    "counterclaims",
+    "claim",
+    "cause",
+    "causes",
+    "action",
+    "affirmative",
+    "defense",
+    "defence",
+    "defenses",
+    "no",
+    "number",
+}
+_ORDINALS = {
+    word: n
+    for n, word in enumerate(
+        (
+            "first",
+            "second",
+            "third",
+            "fourth",
+            "fifth",
+            "sixth",
+            "seventh",
+            "eighth",
+            "ninth",
+            "tenth",
+            "eleventh",
+            "twelfth",
+        ),
+        start=1,
+    )
+}
+_STOPWORDS = {"the", "a", "an"}
+_ROMAN = re.compile(r"^(?=[ivxl])l?x{0,3}(ix|iv|v?i{0,3})$")
+_NUMBERED = re.compile(r"^\d+(st|nd|rd|th)?$")
+_ROMAN_VALUES = {"i": 1, "v": 5, "x": 10, "l": 50}
+
+
+def _is_label_token(token: str) -> bool:
+    return (
+        token in _LABEL_WORDS
+        or token in _ORDINALS
+        or bool(_NUMBERED.match(token))
+        or bool(_ROMAN.match(token))
+        or token == "of"  # "cause of action"
+    )
+
+
+def normalize(name: str) -> str:
+    """Lowercase, drop punctuation, COUNT/defense numbering and articles.
+
+    "COUNT III - Breach of the Contract" and "Breach of Contract (Count 3)" both
+    normalize to "breach of contract".
+    """
+    text = re.sub(r"['\u2019]s\b", "", (name or "").lower()).replace("&", " and ")
+    tokens = [t for t in re.split(r"[^a-z0-9]+", text) if t and t not in _STOPWORDS]
+    start, end = 0, len(tokens)
+    while start < end and _is_label_token(tokens[start]):
+        start += 1
+    while end > start and _is_label_token(tokens[end - 1]):
+        # A trailing number belongs to the name ("section 501") unless a label precedes it ("count 3")
+        if tokens[end - 1] not in _LABEL_WORDS and (end - 2 < start or tokens[end - 2] not in _LABEL_WORDS):
+            break
+        end -= 1
+    # A bare heading ("COUNT IV") has nothing left; keep it distinct rather than empty
+    return " ".join(tokens[start:end]) or " ".join(tokens)
+
+
+def _number(token: str) -> int | None:
+    """The value of an ordinal, roman or arabic numeral token ("fifth", "iv", "3rd"), else None."""
+    if token in _ORDINALS:
+        return _ORDINALS[token]
+    if _NUMBERED.match(token):
+        return int(re.sub(r"\D", "", token))
+    if _ROMAN.match(token):
+        values = [_ROMAN_VALUES[c] for c in token]
+        return sum(-v if v < next_v else v for v, next_v in zip(values, [*values[1:], 0], strict=True))
+    return None
+
+
+def _split_numbers(label: str) -> tuple[list[str], list[int]]:
+    words, numbers = [], []
+    for token in label.split():
+        number = _number(token)
+        if number is None:
+            words.append(token)
+        else:
+            numbers.append(number)
+    return words, numbers
+
+
+def similarity(a: str, b: str) -> float:
+    """Similarity of two normalized names in [0, 1]; word order does not matter.
+
+    Names numbered differently ("first affirmative defense" and "fifth
+    affirmative defense", "count i" and "count ii") are different items however
+    alike the text, so they score 0. The same number written differently
+    ("count i", "count 1") does not count as a difference.
+    """
+    if a == b:
+        return 1.0
+    words_a, numbers_a = _split_numbers(a)
+    words_b, numbers_b = _split_numbers(b)
+    if numbers_a and numbers_b and numbers_a != numbers_b:
+        return 0.0
+    if sorted(words_a) == sorted(words_b) and numbers_a == numbers_b:
+        return 1.0
+    return difflib.SequenceMatcher(None, a, b).ratio()
+
+
+class _UnionFind:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i: int, j: int) -> None:
+        root_i, root_j = self.find(i), self.find(j)
+        if root_i != root_j:
+            self.parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    def components(self) -> list[list[int]]:
+        by_root: dict[int, list[int]] = {}
+        for i in range(len(self.parent)):
+            by_root.setdefault(self.find(i), []).append(i)
+        return list(by_root.values())
+
+
+def group(items: list, key) -> tuple[list[list], list[list[int]]]:
+    """Group items whose names are the same after normalization or near-identical.
+
+    Args:
+        items: Extracted items, e.g. [{'name': str, 'raw_text': str}, ...]
+        key: Function returning an item's name
+
+    Returns:
+        (groups, ambiguous): groups is a list of item lists in first-seen order;
+        ambiguous lists clusters of group indices that may be duplicates of each
+        other. Groups that appear in no cluster are settled.
+    """
+    labels: list[str] = []
+    label_of: list[int] = []
+    for item in items:
+        label = normalize(key(item))
+        if label not in labels:
+            labels.append(label)
+        label_of.append(labels.index(label))
+
+    merged = _UnionFind(len(labels))
+    close_pairs = []
+    for i in range(len(labels)):
+        for j in range(i + 1, len(labels)):
+            score = similarity(labels[i], labels[j])
+            if score >= MERGE_THRESHOLD:
+                merged.union(i, j)
+            elif score >= AMBIGUOUS_THRESHOLD:
+                close_pairs.append((i, j))
+
+    label_groups = merged.components()
+    group_of_label = {label: g for g, members in enumerate(label_groups) for label in members}
+    groups: list[list] = [[] for _ in label_groups]
+    for item, label in zip(items, label_of, strict=True):
+        groups[group_of_label[label]].append(item)
+
+    linked = _UnionFind(len(groups))
+    for i, j in close_pairs:
+        linked.union(group_of_label[i], group_of_label[j])
+    ambiguous = [cluster for cluster in linked.components() if len(cluster) > 1]
+    return groups, ambiguous
+
+
+def most_common(values: list[str]) -> str:
+    """The most frequent value (first seen wins ties), e.g. a group's canonical name."""
+    return Counter(values).most_common(1)[0][0] if values else ""
@@ -0,0 +1,97 @@
+"""Model registry: which Bedrock model, output budget and fallback each task uses.
+
+Call sites ask for a task rather than hard-coding a model ID:
+
+    model = models.for_task("dedup")
+    body = json.dumps({..., "max_tokens": model.max_tokens, ...})
+    bedrock.invoke_model(body=body, model_id=model.model_id, fallback_model_id=model.fallback_model_id, ...)
+
+Cheap, high-volume tasks (dedup, witness-list extraction) default to Haiku
+with Sonnet as the fallback; reasoning-heavy tasks stay on Sonnet.
+
+A job can override any task through its config:
+
+    "config": {
+        "models": {
+            "dedup": "us.anthropic.claude-3-5-sonnet-20241022-v2:0",
+            "render": {"model_id": "...", "max_tokens": 3000, "fallback_model_id": null}
+        }
+    }
+
+Handlers call configure(event.get("config")) at the start of each invocation.
+"""
+
+from dataclasses import dataclass, replace
+import logging
+
+logger = logging.getLogger()
+
+SONNET = "us.anthropic.claude-3-5-sonnet-20241022-v2:0"
+HAIKU = "us.anthropic.claude-3-5-haiku-20241022-v1:0"
+
+
+@dataclass(frozen=True)
+class ModelSpec:
+    model_id: str
+    max_tokens: int
+    fallback_model_id: str | None = None
+
+
+DEFAULT_MODELS = {
+    # Per-window claim/defense/damages extraction and rolling case facts
+    "extraction_window": ModelSpec(model_id=SONNET, max_tokens=1500),
+    # Pull the witness list out of the witness document
+    "witness_extraction": ModelSpec(model_id=HAIKU, max_tokens=2000, fallback_model_id=SONNET),
+    # Group duplicate claims/defenses
+    "dedup": ModelSpec(model_id=HAIKU, max_tokens=2000, fallback_model_id=SONNET),
+    # Attribute the answer's pooled defenses to each claim
+    "attribution": ModelSpec(model_id=HAIKU, max_tokens=1000, fallback_model_id=SONNET),
+    # Match claims to the Claims table and to SJI categories
+    "match": ModelSpec(model_id=SONNET, max_tokens=4000),
+    # Fill an SJI template with job inputs
+    "render": ModelSpec(model_id=SONNET, max_tokens=2000),
+    # Select/customize standard instructions and draft custom ones
+    "custom_generation": ModelSpec(model_id=SONNET, max_tokens=4000),
+}
+
+_overrides: dict[str, ModelSpec] = {}
+
+
+def _parse_override(task: str, value) -> ModelSpec | None:
+    base = DEFAULT_MODELS[task]
+    if isinstance(value, str) and value:
+        # A bare model ID keeps the default budget and fallback
+        return replace(base, model_id=value)
+    if isinstance(value, dict):
+        return ModelSpec(
+            model_id=value.get("model_id") or base.model_id,
+            max_tokens=int(value.get("max_tokens") or base.max_tokens),
+            fallback_model_id=value.get("fallback_model_id", base.fallback_model_id),
+        )
+    return None
+
+
+def configure(config: dict | None) -> None:
+    """Apply the job config's 'models' overrides (or clear them) for this invocation."""
+    _overrides.clear()
+    models = (config or {}).get("models") if isinstance(config, dict) else None
+    if not isinstance(models, dict):
+        return
+    for task, value in models.items():
+        if task not in DEFAULT_MODELS:
+            logger.warning(f"Ignoring model override for unknown task '{task}'")
+            continue
+        try:
+            spec = _parse_override(task, value)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Ignoring invalid model override for '{task}': {e!s}")
+            continue
+        if spec:
+            _overrides[task] = spec
+    if _overrides:
+        logger.info(f"Model overrides from job config: { {t: s.model_id for t, s in _overrides.items()} }")
+
+
+def for_task(task: str) -> ModelSpec:
+    """Return the model spec for a task, honoring job-config overrides."""
+    return _overrides.get(task) or DEFAULT_MODELS[task]
@@ -0,0 +1,335 @@
+"""Compiled reference data: Claims and Standard Jury Instructions from a memory-mapped file.
+
+scripts/build_reference_data.py compiles terraform/data/claims.json and
+terraform/data/standard_jury_instructions.json into one binary artifact,
+jury_common/data/reference_data.bin, shipped in the shared layer. Opening it is
+a single mmap; records are decoded on first access.
+
+Layout (little-endian):
+    b"JREF" | u32 header length | header JSON | record bytes
+The header holds, per table, the data version, each record's (offset, length)
+in the record bytes and lookup indexes (field value -> record positions).
+
+The data version is the sha256 of the source JSON file, the same value
+Terraform writes to the table's version item (id "__version__") when it seeds
+the table. load() uses the artifact only when both match, and otherwise falls
+back to scanning the table, so a stale or missing artifact costs a cold-start
+scan but never serves wrong data.
+
+The version item only changes by itself when Terraform re-seeds the table. An
+edit made directly in the table must also call bump_version() (or run
+`scripts/build_reference_data.py --bump <table>`); otherwise warm containers
+keep serving the data they loaded and cold starts may still trust the artifact.
+"""
+
+import contextlib
+from datetime import datetime, timezone
+import hashlib
+import json
+import logging
+import mmap
+import os
+from pathlib import Path
+import struct
+import time
+
+logger = logging.getLogger()
+
+MAGIC = b"JREF"
+FORMAT_VERSION = 1
+VERSION_ITEM_ID = "__version__"
+
+ARTIFACT_PATH = Path(os.environ.get("REFERENCE_DATA_PATH", Path(__file__).parent / "data" / "reference_data.bin"))
+
+# Fields each table can be looked up by
+INDEXED_FIELDS = {
+    "claims": ("id",),
+    "standard_jury_instructions": ("id", "number", "category_number"),
+}
+
+# Attributes terraform/dynamodb.tf writes for each table: (scalar fields, list fields)
+SEEDED_FIELDS = {
+    "claims": (("id", "title", "description"), ("elements", "defenses")),
+    "standard_jury_instructions": (
+        ("id", "number", "title", "category_title", "category_number", "url", "main_paragraph", "notes_on_use"),
+        (),
+    ),
+}
+
+_HEADER_LENGTH = struct.Struct("<I")
+
+
+def data_version(raw: bytes) -> str:
+    """Version stamp of a source data file (matches Terraform's filesha256())."""
+    return hashlib.sha256(raw).hexdigest()
+
+
+def _seed_item(name: str, obj: dict) -> dict | None:
+    """Shape one source object the way terraform/dynamodb.tf seeds it into the table.
+
+    Items without an id are skipped, empty scalars are omitted, scalars become
+    strings and list fields are always present as lists of strings.
+    """
+    if not str(obj.get("id") or "").strip():
+        return None
+    scalar_fields, list_fields = SEEDED_FIELDS[name]
+    item = {key: str(obj[key]) for key in scalar_fields if obj.get(key) is not None and str(obj[key]).strip()}
+    item.update({key: [str(v) for v in obj.get(key) or []] for key in list_fields})
+    return item
+
+
+class ReferenceTable:
+    """Read-only view of one reference table, from the artifact or from a scan.
+
+    Args:
+        name: Table name in INDEXED_FIELDS
+        version: Data version, or None when loaded by scanning
+        count: Number of records
+        decode: Function returning record i as a dict
+        indexes: Field -> {value: [record positions]}
+    """
+
+    def __init__(self, name: str, version: str | None, count: int, decode, indexes: dict[str, dict[str, list[int]]]):
+        self.name = name
+        self.version = version
+        self._count = count
+        self._decode = decode
+        self._indexes = indexes
+        self._records: list[dict | None] = [None] * count
+        self.compiled = False
+
+    @classmethod
+    def from_items(cls, name: str, items: list[dict], version: str | None = None) -> "ReferenceTable":
+        indexes: dict[str, dict[str, list[int]]] = {field: {} for field in INDEXED_FIELDS[name]}
+        for i, item in enumerate(items):
+            for field, index in indexes.items():
+                if item.get(field) not in (None, ""):
+                    index.setdefault(str(item[field]), []).append(i)
+        return cls(name, version, len(items), items.__getitem__, indexes)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _get(self, i: int) -> dict:
+        record = self._records[i]
+        if record is None:
+            record = self._records[i] = self._decode(i)
+        return record
+
+    def all(self) -> list[dict]:
+        """Every record, in source order."""
+        return [self._get(i) for i in range(self._count)]
+
+    def find(self, field: str, value) -> list[dict]:
+        """Records whose indexed `field` equals `value`, in source order."""
+        return [self._get(i) for i in self._indexes[field].get(str(value), [])]
+
+    def by_id(self, item_id) -> dict | None:
+        """The record with this id, or None."""
+        matches = self.find("id", item_id)
+        return matches[0] if matches else None
+
+
+def build(sources: dict[str, Path], out_path: Path) -> dict[str, str]:
+    """Compile source JSON files into the artifact.
+
+    Args:
+        sources: Table name -> path of its JSON array (e.g. terraform/data/claims.json)
+        out_path: Artifact to write
+
+    Returns:
+        Table name -> data version
+    """
+    header: dict = {"format": FORMAT_VERSION, "tables": {}}
+    blob = bytearray()
+    for name, path in sources.items():
+        raw = Path(path).read_bytes()
+        items = [item for obj in json.loads(raw) if (item := _seed_item(name, obj))]
+        offsets = []
+        for item in items:
+            encoded = json.dumps(item, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            offsets.append([len(blob), len(encoded)])
+            blob.extend(encoded)
+        indexes = ReferenceTable.from_items(name, items)._indexes
+        header["tables"][name] = {"version": data_version(raw), "offsets": offsets, "indexes": indexes}
+
+    header_bytes = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = out_path.with_suffix(".tmp")
+    with tmp_path.open("wb") as f:
+        f.write(MAGIC)
+        f.write(_HEADER_LENGTH.pack(len(header_bytes)))
+        f.write(header_bytes)
+        f.write(blob)
+    tmp_path.replace(out_path)
+    return {name: meta["version"] for name, meta in header["tables"].items()}
+
+
+class Artifact:
+    """The memory-mapped artifact file."""
+
+    def __init__(self, path: Path):
+        with Path(path).open("rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:4] != MAGIC:
+            raise ValueError(f"{path} is not a reference data artifact")
+        (header_length,) = _HEADER_LENGTH.unpack_from(self._mm, 4)
+        self._base = 4 + _HEADER_LENGTH.size + header_length
+        self.header = json.loads(self._mm[4 + _HEADER_LENGTH.size : self._base])
+        if self.header.get("format") != FORMAT_VERSION:
+            raise ValueError(f"{path} has format {self.header.get('format')}, expected {FORMAT_VERSION}")
+
+    def table(self, name: str) -> ReferenceTable | None:
+        meta = self.header["tables"].get(name)
+        if meta is None:
+            return None
+        offsets = meta["offsets"]
+
+        def decode(i: int) -> dict:
+            start, length = offsets[i]
+            return json.loads(self._mm[self._base + start : self._base + start + length])
+
+        table = ReferenceTable(name, meta["version"], len(offsets), decode, meta["indexes"])
+        table.compiled = True
+        return table
+
+
+_artifact: Artifact | None = None
+
+
+def _open_artifact() -> Artifact | None:
+    global _artifact  # noqa: PLW0603
+    if _artifact is None and ARTIFACT_PATH.exists():
+        try:
+            _artifact = Artifact(ARTIFACT_PATH)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring reference data artifact: {e!s}")
+    return _artifact
+
+
+def table_version(table) -> str | None:
+    """The data version recorded in a table's version item, or None."""
+    with contextlib.suppress(Exception):
+        item = table.get_item(Key={"id": VERSION_ITEM_ID}).get("Item")
+        return str(item["version"]) if item and item.get("version") else None
+    return None
+
+
+def bump_version(table) -> str:
+    """Give a table's version item a new value after a direct edit; returns it.
+
+    The new version never matches a seed file's sha256, so Lambdas scan the
+    edited table instead of using the artifact, and warm containers reload on
+    their next refresh_if_changed() check.
+    """
+    version = f"edit-{datetime.now(timezone.utc):%Y%m%dT%H%M%S.%fZ}"
+    table.put_item(Item={"id": VERSION_ITEM_ID, "version": version})
+    return version
+
+
+def scan_items(table) -> list[dict]:
+    """Every reference item in a table (the version item excluded)."""
+    kwargs: dict = {}
+    items = []
+    while True:
+        resp = table.scan(**kwargs)
+        items.extend(item for item in resp.get("Items", []) if item.get("id") != VERSION_ITEM_ID)
+        lek = resp.get("LastEvaluatedKey")
+        if not lek:
+            break
+        kwargs["ExclusiveStartKey"] = lek
+    return items
+
+
+def load_compiled(name: str, table) -> ReferenceTable | None:
+    """Reference table `name` from the artifact if its version matches `table`, else None."""
+    artifact = _open_artifact()
+    compiled = artifact.table(name) if artifact else None
+    if compiled is None:
+        logger.info(f"No compiled {name} data at {ARTIFACT_PATH}")
+        return None
+    live_version = table_version(table)
+    if live_version != compiled.version:
+        logger.info(
+            f"Compiled {name} data is stale: artifact version {compiled.version[:12]} "
+            f"!= table version {(live_version or 'missing')[:12]}"
+        )
+        return None
+    logger.info(f"Loaded {len(compiled)} {name} records from {ARTIFACT_PATH} (version {compiled.version[:12]})")
+    return compiled
+
+
+def load(name: str, table) -> ReferenceTable:
+    """Reference table `name`, from the artifact when its version matches `table`, else by scanning `table`."""
+    compiled = load_compiled(name, table)
+    if compiled is not None:
+        return compiled
+    items = scan_items(table)
+    logger.info(f"Scanned {len(items)} {name} records from {table.name}")
+    return ReferenceTable.from_items(name, items, version=table_version(table))
+
+
+class ReferenceCache:
+    """A loaded reference table that warm containers keep until the table's version changes.
+
+    refresh_if_changed() reads the table's version item at most once per
+    `check_seconds` (REFERENCE_CHECK_SECONDS, default 60) and reloads only when
+    the version differs from the one loaded, so keeping the cache across
+    invocations is safe and the steady-state cost is one GetItem per interval.
+
+    Args:
+        name: Table name in INDEXED_FIELDS
+        table: boto3 Table
+        loader: load (default; artifact or scan) or load_compiled (artifact or None)
+        check_seconds: Minimum time between version checks
+    """
+
+    def __init__(self, name: str, table, *, loader=None, check_seconds: float | None = None):
+        self.name = name
+        self._table = table
+        self._loader = loader or load
+        self.check_seconds = (
+            float(os.environ.get("REFERENCE_CHECK_SECONDS", "60")) if check_seconds is None else check_seconds
+        )
+        self._checks = 0
+        self._check_errors = 0
+        self._refreshes = 0
+        self._load()
+
+    def _load(self) -> None:
+        self.value = self._loader(self.name, self._table)
+        self.version = self.value.version if self.value is not None else table_version(self._table)
+        self._loaded_at = time.time()
+        self._checked_at = time.monotonic()
+
+    def refresh_if_changed(self) -> bool:
+        """Reload if the table's version changed since the last load; True if it reloaded."""
+        if time.monotonic() - self._checked_at < self.check_seconds:
+            return False
+        self._checked_at = time.monotonic()
+        self._checks += 1
+        try:
+            item = self._table.get_item(Key={"id": VERSION_ITEM_ID}).get("Item") or {}
+        except Exception as e:
+            # Keep serving what we have; the next check retries
+            self._check_errors += 1
+            logger.warning(f"Could not read the {self.name} version item: {e!s}")
+            return False
+        live_version = str(item["version"]) if item.get("version") else None
+        if live_version == self.version:
+            return False
+        logger.info(f"{self.name} version changed ({(self.version or 'none')[:12]} -> {(live_version or 'none')[:12]})")
+        self._load()
+        self._refreshes += 1
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "version": (self.version or "")[:12] or None,
+            "source": "artifact" if isinstance(self.value, ReferenceTable) and self.value.compiled else "table",
+            "age_seconds": round(time.time() - self._loaded_at, 1),
+            "checks": self._checks,
+            "check_errors": self._check_errors,
+            "refreshes": self._refreshes,
+        }
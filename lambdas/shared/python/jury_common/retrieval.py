@@ -0,0 +1,134 @@
+"""Lexical shortlist of reference items (Claims table rows) for an extracted name.
+
+Matching prompts used to carry the entire reference table. LexicalIndex scores
+every reference item against a query with BM25 over its weighted text fields
+plus character-trigram overlap with its title (so abbreviations such as
+"Breach of K" still land near "Breach of Contract"), and returns the top-k.
+Callers put only those candidates in the prompt, so its size no longer grows
+with the table, and skip the model entirely when clear_winner() finds a title
+that is unambiguously the same name.
+
+The reference tables hold a few hundred rows at most, so the index is plain
+Python (no NumPy in the Lambda packages) and is built once per cold start.
+"""
+
+from collections import Counter
+import math
+import re
+
+from jury_common import dedup
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+# Share of the final score taken by title trigram overlap (the rest is BM25)
+TRIGRAM_WEIGHT = 0.4
+# Shorter title initialisms are too ambiguous to index
+MIN_ACRONYM_LENGTH = 3
+
+_STOPWORDS = {"a", "an", "and", "the", "of", "or", "to", "in", "on", "for", "by", "with", "v", "vs"}
+# "Breach: 01. Breach of Contract" -> "Breach of Contract"
+_TITLE_PREFIX = re.compile(r"^[^:]{1,40}:\s*\d+\.\s*")
+
+
+def _tokens(text: str) -> list[str]:
+    return [t for t in re.findall(r"[a-z0-9]+", text.lower()) if t not in _STOPWORDS]
+
+
+def _trigrams(text: str) -> set[str]:
+    padded = f"  {' '.join(re.findall(r'[a-z0-9]+', text.lower()))} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def clean_title(title: str) -> str:
+    """Drop a catalogue prefix like 'Breach: 01.' from a reference title."""
+    return _TITLE_PREFIX.sub("", title or "").strip()
+
+
+class LexicalIndex:
+    """BM25 + title-trigram index over reference items.
+
+    Args:
+        items: Reference rows, e.g. Claims table items
+        fields: Field name -> weight; list fields (e.g. 'elements') are joined
+        title_field: Field used for trigram overlap and clear_winner()
+    """
+
+    def __init__(self, items: list[dict], fields: dict[str, float], title_field: str = "title"):
+        self.items = items
+        self.title_field = title_field
+        self._term_freqs: list[dict[str, float]] = []
+        self._lengths: list[float] = []
+        self._titles: list[str] = []
+        self._title_trigrams: list[set[str]] = []
+        doc_freq: Counter = Counter()
+
+        for item in items:
+            weighted: Counter = Counter()
+            for field, weight in fields.items():
+                value = item.get(field) or ""
+                if isinstance(value, list):
+                    value = " ".join(str(v) for v in value)
+                for token in _tokens(str(value)):
+                    weighted[token] += weight
+            title = clean_title(str(item.get(title_field) or ""))
+            # Statute titles are often pleaded by acronym ("FDUTPA")
+            acronym = "".join(t[0] for t in _tokens(title))
+            if len(acronym) >= MIN_ACRONYM_LENGTH:
+                weighted[acronym] += fields.get(title_field, 1.0)
+            self._term_freqs.append(dict(weighted))
+            self._lengths.append(sum(weighted.values()))
+            doc_freq.update(weighted.keys())
+            self._titles.append(dedup.normalize(title))
+            self._title_trigrams.append(_trigrams(self._titles[-1]))
+
+        count = len(items)
+        self._avg_length = (sum(self._lengths) / count) if count else 0.0
+        self._idf = {t: math.log(1 + (count - df + 0.5) / (df + 0.5)) for t, df in doc_freq.items()}
+
+    def _bm25(self, query_tokens: list[str]) -> list[float]:
+        scores = [0.0] * len(self.items)
+        for token in set(query_tokens):
+            idf = self._idf.get(token)
+            if idf is None:
+                continue
+            for i, term_freqs in enumerate(self._term_freqs):
+                tf = term_freqs.get(token)
+                if tf:
+                    norm = 1 - B + B * (self._lengths[i] / self._avg_length)
+                    scores[i] += idf * tf * (K1 + 1) / (tf + K1 * norm)
+        return scores
+
+    def search(self, query: str, k: int = 5) -> list[tuple[dict, float]]:
+        """Return the k best (item, score) pairs for a query, best first; scores are in [0, 1]."""
+        if not self.items:
+            return []
+        bm25 = self._bm25(_tokens(query))
+        top_bm25 = max(bm25) or 1.0
+        query_trigrams = _trigrams(dedup.normalize(query))
+        scored = []
+        for i, item in enumerate(self.items):
+            title_trigrams = self._title_trigrams[i]
+            overlap = 2 * len(query_trigrams & title_trigrams) / ((len(query_trigrams) + len(title_trigrams)) or 1)
+            scored.append((item, (1 - TRIGRAM_WEIGHT) * bm25[i] / top_bm25 + TRIGRAM_WEIGHT * overlap))
+        scored.sort(key=lambda pair: pair[1], reverse=True)
+        return scored[:k]
+
+    def clear_winner(self, name: str) -> dict | None:
+        """The single item whose title is the same name as `name`, or None when it is not clear-cut.
+
+        The best title must be near-identical (dedup.MERGE_THRESHOLD) and no other
+        title may come within the ambiguous band (dedup.AMBIGUOUS_THRESHOLD).
+        """
+        label = dedup.normalize(name)
+        if not label:
+            return None
+        ranked = sorted(
+            ((dedup.similarity(label, title), i) for i, title in enumerate(self._titles)),
+            reverse=True,
+        )
+        if not ranked or ranked[0][0] < dedup.MERGE_THRESHOLD:
+            return None
+        if len(ranked) > 1 and ranked[1][0] >= dedup.AMBIGUOUS_THRESHOLD:
+            return None
+        return self.items[ranked[0][1]]
@@ -0,0 +1,131 @@
+"""Chunk ranges from the section index that textract_get_results emits with its chunks.
+
+The chunks pointer ({"S3Object": ..., "ChunkCount": n, "Sections": [...]})
+lists each heading with its type and inclusive chunk range. chunk_ranges()
+turns the sections of the wanted types into merged (start, end) ranges and
+windows() builds the usual overlapping windows inside each range only, so a
+claim's damages are read from its COUNT and WHEREFORE sections and defenses
+from the affirmative defenses instead of from the whole document.
+
+Without an index (inline chunk lists, older pointers) or without a matching
+section, chunk_ranges() returns None and callers read every chunk as before.
+
+content_end() finds where a pleading's closing matter begins (signature
+block, certificate of service, verification, exhibit list) and
+content_chunks() cuts the chunks there, inside the chunk that holds the
+first marker: the closing matter never holds relief or defenses.
+"""
+
+import re
+
+# Sections each reader needs, by section type (see textract_get_results/section_index.py)
+CLAIM_SECTIONS = ("count",)
+COUNTERCLAIM_SECTIONS = ("counterclaim",)
+CLAIM_DAMAGES_SECTIONS = ("count", "prayer")
+COUNTERCLAIM_DAMAGES_SECTIONS = ("counterclaim", "prayer")
+DEFENSE_SECTIONS = ("affirmative_defense",)
+
+# Closing matter that ends a pleading's substance
+_CLOSING = re.compile(
+    r"RESPECTFULLY\s+SUBMITTED|CERTIFICATE\s+OF\s+SERVICE|I\s+HEREBY\s+CERTIFY|^\s*VERIFICATION\b"
+    r"|SWORN\s+TO\s+AND\s+SUBSCRIBED|EXHIBIT\s+LIST|INDEX\s+OF\s+EXHIBITS|^\s*/s/",
+    re.IGNORECASE | re.MULTILINE,
+)
+# Text that still matters wherever it appears (a counterclaim after the answer's signature, a late prayer)
+_SUBSTANTIVE = re.compile(
+    r"\bWHEREFORE\b|AFFIRMATIVE\s+DEFEN|\b\w+\s+DEFEN[SC]ES?\b|\bDEFEN[SC]E\s+(?:NO\.?\s*)?(?:[IVXLC]+|\d+)\b"
+    r"|\bC[O0]UNT\s+(?:[IVXLC]+|\d+)\b|COUNTER[\s-]?CLAIM|PRAYER\s+FOR\s+RELIEF",
+    re.IGNORECASE,
+)
+# Closing matter is only looked for in the back part of a document (by characters)
+MIN_CONTENT_SHARE = 0.5
+
+
+def chunk_ranges(
+    chunks_pointer, types: tuple[str, ...], *, include_first: bool = False
+) -> list[tuple[int, int]] | None:
+    """Merged, inclusive chunk ranges covering the sections of the given types.
+
+    Args:
+        chunks_pointer: Chunks event value; only a pointer dict can carry "Sections"
+        types: Section types to keep
+        include_first: Also keep chunk 0 (captions and "This is an action for ..." openings)
+
+    Returns:
+        Sorted (start, end) ranges, or None when there is no index or no matching section
+    """
+    if not isinstance(chunks_pointer, dict) or not chunks_pointer.get("Sections"):
+        return None
+    spans = sorted(
+        (int(section["start_chunk"]), int(section["end_chunk"]))
+        for section in chunks_pointer["Sections"]
+        if section.get("type") in types
+    )
+    if not spans:
+        return None
+    if include_first:
+        spans.insert(0, (0, 0))
+
+    merged = [spans[0]]
+    for start, end in spans[1:]:
+        if start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def content_end(chunks: list[str]) -> tuple[int, int]:
+    """(chunk index, character offset) where trailing closing matter begins, or (len(chunks), 0) if none.
+
+    Walks back from the end of the text to the last substantive match; the
+    first closing marker after it (and in the back part of the text) starts
+    the tail. The cut is never at the very start of the document.
+    """
+    total = sum(len(chunk) for chunk in chunks)
+    floor = total * MIN_CONTENT_SHARE
+    end = (len(chunks), 0)
+    chunk_start = total
+    for i in range(len(chunks) - 1, -1, -1):
+        text = chunks[i]
+        chunk_start -= len(text)
+        last_substantive = max((m.end() for m in _SUBSTANTIVE.finditer(text)), default=None)
+        offsets = [
+            m.start()
+            for m in _CLOSING.finditer(text, last_substantive or 0)
+            if chunk_start + m.start() >= floor and (i or m.start())
+        ]
+        if offsets:
+            end = (i, min(offsets))
+        if last_substantive is not None or chunk_start < floor:
+            break
+    return end
+
+
+def content_chunks(chunks: list[str]) -> list[str]:
+    """Chunks up to content_end(): later chunks are left out and the chunk holding the cut is truncated.
+
+    Chunk indices before the cut are unchanged, so section ranges still apply.
+    """
+    index, offset = content_end(chunks)
+    if index >= len(chunks):
+        return chunks
+    return chunks[:index] + ([chunks[index][:offset].rstrip()] if offset else [])
+
+
+def windows(chunks: list[str], window_size: int, ranges: list[tuple[int, int]] | None = None) -> list[str]:
+    """Overlapping windows of `window_size` chunks, within each range when ranges are given."""
+    spans = ranges if ranges is not None else [(0, len(chunks) - 1)]
+    result = []
+    for start, end in spans:
+        selected = chunks[start : end + 1]
+        result.extend("\n".join(selected[i : i + window_size]) for i in range(0, len(selected), window_size - 1))
+    return result
+
+
+def coverage(ranges: list[tuple[int, int]] | None, chunk_count: int) -> str:
+    """Log-friendly summary of how many chunks the ranges keep."""
+    if ranges is None:
+        return f"all {chunk_count} chunks (no section index)"
+    kept = sum(end - start + 1 for start, end in ranges)
+    return f"{kept} of {chunk_count} chunks in ranges {ranges}"
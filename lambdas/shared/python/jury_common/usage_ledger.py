@@ -0,0 +1,173 @@
+"""Per-job token, latency and cost ledger for Bedrock calls.
+
+Every call made through jury_common.bedrock is recorded in the container's
+ledger with its call site, token usage, latency and retry count. At the end
+of an invocation the handler calls flush(), which appends one aggregated
+entry for the invocation to the job item's 'usage_ledger' list. The
+job_save_results Lambda rolls those entries up into 'usage_summary', and
+api_status returns both with the rest of the job item.
+"""
+
+import datetime
+from decimal import Decimal
+import json
+import logging
+import os
+import threading
+
+import boto3
+
+logger = logging.getLogger()
+
+# USD per million tokens: (input, output, cache write, cache read)
+MODEL_PRICING = {
+    "claude-3-5-sonnet": (3.00, 15.00, 3.75, 0.30),
+    "claude-3-7-sonnet": (3.00, 15.00, 3.75, 0.30),
+    "claude-sonnet-4": (3.00, 15.00, 3.75, 0.30),
+    "claude-3-5-haiku": (0.80, 4.00, 1.00, 0.08),
+    "claude-3-haiku": (0.25, 1.25, 0.30, 0.03),
+}
+
+TOKEN_FIELDS = ("input_tokens", "output_tokens", "cache_creation_input_tokens", "cache_read_input_tokens")
+
+
+def estimate_cost(model_id: str, usage: dict) -> float:
+    """Estimate the USD cost of one call from its usage block (0.0 for unknown models)."""
+    for fragment, (inp, out, cache_write, cache_read) in MODEL_PRICING.items():
+        if fragment in (model_id or ""):
+            return (
+                int(usage.get("input_tokens", 0)) * inp
+                + int(usage.get("output_tokens", 0)) * out
+                + int(usage.get("cache_creation_input_tokens", 0)) * cache_write
+                + int(usage.get("cache_read_input_tokens", 0)) * cache_read
+            ) / 1_000_000
+    return 0.0
+
+
+def _empty_totals() -> dict:
+    totals = {
+        "calls": 0,
+        "cache_hits": 0,
+        "retries": 0,
+        "hedges": 0,
+        "hedge_wins": 0,
+        "latency_seconds": 0.0,
+        "cost_usd": 0.0,
+    }
+    totals.update(dict.fromkeys(TOKEN_FIELDS, 0))
+    return totals
+
+
+def _add(totals: dict, other: dict) -> None:
+    for key, value in other.items():
+        if key in totals:
+            totals[key] += float(value) if isinstance(totals[key], float) else int(value)
+
+
+class UsageLedger:
+    """Thread-safe accumulator of per-call usage, aggregated by call site."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stage: str | None = None
+        self.job_id: str | None = None
+        self._by_call_site: dict[str, dict] = {}
+
+    def start(self, stage: str, job_id: str | None = None) -> None:
+        """Reset the ledger for a new invocation (containers are reused between jobs)."""
+        with self._lock:
+            self.stage = stage
+            self.job_id = job_id
+            self._by_call_site = {}
+
+    def record(  # noqa: PLR0913
+        self,
+        *,
+        call_site: str,
+        model_id: str,
+        usage: dict | None,
+        latency_seconds: float,
+        retries: int = 0,
+        cache_hit: bool = False,
+        hedged: bool = False,
+        hedge_won: bool = False,
+    ) -> None:
+        entry = {
+            "calls": 1,
+            "retries": retries,
+            "hedges": int(hedged),
+            "hedge_wins": int(hedge_won),
+            "latency_seconds": latency_seconds,
+        }
+        if cache_hit:
+            entry["cache_hits"] = 1
+        else:
+            usage = usage or {}
+            entry.update({field: int(usage.get(field, 0) or 0) for field in TOKEN_FIELDS})
+            entry["cost_usd"] = estimate_cost(model_id, usage)
+        with self._lock:
+            totals = self._by_call_site.setdefault(call_site, _empty_totals())
+            _add(totals, entry)
+
+    def snapshot(self) -> dict:
+        """Return {'stage', 'job_id', 'by_call_site', 'totals'} for the current invocation."""
+        with self._lock:
+            by_call_site = {site: dict(totals) for site, totals in self._by_call_site.items()}
+        totals = _empty_totals()
+        for site_totals in by_call_site.values():
+            _add(totals, site_totals)
+        return {"stage": self.stage, "job_id": self.job_id, "by_call_site": by_call_site, "totals": totals}
+
+    def flush(self) -> dict:
+        """Log this invocation's usage and append it to the job item, if a job is known.
+
+        Persisting is best effort: a ledger write must never fail the pipeline.
+        """
+        entry = self.snapshot()
+        entry["recorded_at"] = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        logger.info(f"Bedrock usage for {entry['stage']}: {json.dumps(entry['totals'])}")
+
+        table_name = os.environ.get("DYNAMODB_TABLE_NAME")
+        if not (self.job_id and table_name and entry["totals"]["calls"]):
+            return entry
+
+        try:
+            # boto3 rejects Python floats; round-trip through JSON to get Decimals
+            item_entry = json.loads(json.dumps(entry), parse_float=lambda v: Decimal(str(round(float(v), 6))))
+            boto3.resource("dynamodb").Table(table_name).update_item(
+                Key={"jury_instruction_id": self.job_id},
+                UpdateExpression="SET #ledger = list_append(if_not_exists(#ledger, :empty), :entry)",
+                ExpressionAttributeNames={"#ledger": "usage_ledger"},
+                ExpressionAttributeValues={":empty": [], ":entry": [item_entry]},
+            )
+        except Exception as e:
+            logger.warning(f"Failed to persist usage ledger for job {self.job_id}: {e!s}")
+        return entry
+
+
+def summarize(entries: list[dict]) -> dict:
+    """Roll per-invocation ledger entries up into job totals by stage and by call site.
+
+    Args:
+        entries: The job item's 'usage_ledger' list (values may be Decimals)
+
+    Returns:
+        {'totals': {...}, 'by_stage': {stage: {...}}, 'by_call_site': {site: {...}}},
+        with call sites sorted by descending cost.
+    """
+    totals = _empty_totals()
+    by_stage: dict[str, dict] = {}
+    by_call_site: dict[str, dict] = {}
+    for entry in entries or []:
+        stage = str(entry.get("stage") or "unknown")
+        stage_totals = by_stage.setdefault(stage, _empty_totals())
+        for site, site_totals in (entry.get("by_call_site") or {}).items():
+            _add(by_call_site.setdefault(site, _empty_totals()), site_totals)
+            _add(stage_totals, site_totals)
+            _add(totals, site_totals)
+    by_call_site = dict(sorted(by_call_site.items(), key=lambda kv: kv[1]["cost_usd"], reverse=True))
+    return {"totals": totals, "by_stage": by_stage, "by_call_site": by_call_site}
+
+
+# One ledger per container; handlers call ledger.start() at the top of each invocation
+ledger = UsageLedger()
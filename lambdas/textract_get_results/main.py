@@ -6,6 +6,7 @@ import os
 
 import boto3
 from nltk.tokenize import sent_tokenize
+from section_index import build_section_index
 
 # Set up logging
 logger = logging.getLogger()
@@ -63,10 +64,10 @@ def extract_text_chunks(text: str, max_chunk_tokens: int = 2000) -> list[str]:
     return chunks
 
 
-def lambda_handler(event, context):  # noqa: PLR0915
+def lambda_handler(event, context):  # noqa: PLR0912, PLR0915
     """
     Gets the full text from a completed Textract job, chunks it,
-    and cleans up the temporary S3 file.
+    indexes its sections and cleans up the temporary S3 file.
     """
 
     # 1. Get JobId and temp file info (NO CHANGE HERE)
@@ -81,6 +82,7 @@ def lambda_handler(event, context):  # noqa: PLR0915
         raise ValueError(f"Invalid input event: {e!s}") from e
 
     all_text_lines = []
+    line_pages = []
 
     # 2. Paginate through all Textract results (NO CHANGE HERE)
     try:
@@ -94,7 +96,10 @@ def lambda_handler(event, context):  # noqa: PLR0915
             response = textract.get_document_text_detection(**kwargs)
 
             blocks = response.get("Blocks", [])
-            all_text_lines.extend(block.get("Text", "") for block in blocks if block.get("BlockType") == "LINE")
+            for block in blocks:
+                if block.get("BlockType") == "LINE":
+                    all_text_lines.append(block.get("Text", ""))
+                    line_pages.append(block.get("Page", 1))
 
             next_token = response.get("NextToken")
             if not next_token:
@@ -129,6 +134,15 @@ def lambda_handler(event, context):  # noqa: PLR0915
         logger.error(f"Failed to chunk text: {e}")
         raise RuntimeError(f"Text chunking failed: {e!s}") from e
 
+    # Headings located by chunk and page range, so later steps can skip unrelated chunks
+    try:
+        sections = build_section_index(all_text_lines, line_pages, chunks)
+        logger.info(f"Indexed {len(sections)} sections: {[s['type'] for s in sections]}")
+    except Exception as e:
+        # The index is an optimization; consumers fall back to all chunks without it
+        logger.error(f"Failed to build section index: {e!s}")
+        sections = []
+
     # 5. Persist chunks to S3 and return a pointer to avoid Step Functions size limits
     try:
         # Prefer the processing bucket already in use
@@ -142,7 +156,7 @@ def lambda_handler(event, context):  # noqa: PLR0915
             gz.write(payload)
         gz_bytes = buf.getvalue()
 
-        s3.put_object(
+        put_response = s3.put_object(
             Bucket=bucket,
             Key=results_key,
             Body=gz_bytes,
@@ -154,7 +168,10 @@ def lambda_handler(event, context):  # noqa: PLR0915
         return {
             "S3Object": {"Bucket": bucket, "Key": results_key},
             "Compression": "gzip",
+            # Lets readers serve a cached copy without asking S3 whether it changed
+            "ETag": put_response.get("ETag"),
             "ChunkCount": len(chunks),
+            "Sections": sections,
             "JobId": job_id,
         }
     except Exception as e:
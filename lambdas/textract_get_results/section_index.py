@@ -0,0 +1,203 @@
+"""Structural section index of a pleading, built from its Textract lines.
+
+Headings are found with local patterns (no model calls): COUNT / cause-of-action
+headings, COUNTERCLAIM headings, affirmative defenses, WHEREFORE / prayer for
+relief, the jury demand, and common structural headings (PARTIES, GENERAL
+ALLEGATIONS, ...) that only serve as boundaries. Each section runs from its
+heading to the line before the next heading and is located by chunk range and
+page range, so downstream Lambdas can send only the relevant chunks to Bedrock.
+
+COUNT headings that follow a COUNTERCLAIM heading are typed "counterclaim":
+in an answer they are the defendant's counts.
+"""
+
+import re
+
+# Longest line still treated as a heading
+MAX_HEADING_CHARS = 120
+# Share of uppercase letters above which a line reads as a heading
+UPPERCASE_RATIO = 0.6
+# A mixed-case heading ("Count I - Breach of Contract") is short, title-cased
+# and set off from the text before it
+MAX_MIXED_HEADING_WORDS = 10
+TITLE_CASE_RATIO = 0.7
+# Words left lowercase in title-cased headings
+_MINOR_WORDS = {"a", "an", "and", "as", "at", "by", "for", "in", "of", "on", "or", "the", "to", "v", "vs", "with"}
+# Previous-line endings that set the next line off as a possible heading
+_SENTENCE_END = (".", ":", ";", "!", "?")
+
+SECTION_TYPES = ("count", "counterclaim", "affirmative_defense", "prayer", "jury_demand", "other")
+
+_ORDINAL = (
+    r"(?:FIRST|SECOND|THIRD|FOURTH|FIFTH|SIXTH|SEVENTH|EIGHTH|NINTH|TENTH|ELEVENTH|TWELFTH"
+    r"|\w+TEENTH|\w+TIETH|\d+(?:ST|ND|RD|TH))"
+)
+_NUMBER = r"(?:[IVXLC]+|\d+|ONE|TWO|THREE|FOUR|FIVE|SIX|SEVEN|EIGHT|NINE|TEN|ELEVEN|TWELVE)"
+
+# Checked in order; the first match decides the type
+_PATTERNS = [
+    ("jury_demand", re.compile(r"^(?:DEMAND\s+FOR\s+(?:A\s+)?JURY|JURY\s+(?:TRIAL\s+)?DEMAND)", re.IGNORECASE)),
+    (
+        "counterclaim",
+        re.compile(r"^(?:(?:DEFENDANT\S*|AMENDED|VERIFIED)\s+)*COUNTER[\s-]?CLAIMS?\b", re.IGNORECASE),
+    ),
+    (
+        "affirmative_defense",
+        re.compile(
+            rf"^(?:{_ORDINAL}\s+)?(?:(?:AFFIRMATIVE|ADDITIONAL|SEPARATE)\s+)+DEFEN[SC]ES?\b"
+            r"|^(?:AND\s+)?DEFEN[SC]ES\s*:?\s*$",
+            re.IGNORECASE,
+        ),
+    ),
+    (
+        "count",
+        re.compile(
+            rf"^C[O0][UV]NT\s+{_NUMBER}\b|^{_ORDINAL}\s+(?:CAUSE\s+OF\s+ACTION|CLAIM\s+FOR\s+RELIEF|CLAIM)\b",
+            re.IGNORECASE,
+        ),
+    ),
+    (
+        "prayer",
+        re.compile(
+            r"^(?:PRAYER\s+FOR\s+RELIEF|DEMAND\s+FOR\s+(?:JUDGMENT|RELIEF)|RELIEF\s+REQUESTED|DAMAGES\s*$)",
+            re.IGNORECASE,
+        ),
+    ),
+    (
+        "other",
+        re.compile(
+            r"^(?:PARTIES|JURISDICTION|VENUE|GENERAL\s+ALLEGATIONS|(?:STATEMENT\s+OF\s+)?FACTS|FACTUAL\s+"
+            r"(?:BACKGROUND|ALLEGATIONS)|INTRODUCTION|PRELIMINARY\s+STATEMENT|NATURE\s+OF\s+THE\s+ACTION"
+            r"|CERTIFICATE\s+OF\s+SERVICE)\b",
+            re.IGNORECASE,
+        ),
+    ),
+]
+# WHEREFORE opens an ordinary paragraph, so it needs no heading formatting
+_WHEREFORE = re.compile(r"^WHEREFORE\b", re.IGNORECASE)
+# "COUNT I" alone on a line; the title usually follows on the next line
+_BARE_LABEL = re.compile(rf"^(?:C[O0][UV]NT|COUNTERCLAIM)\s+{_NUMBER}\s*[-:.\u2013\u2014]?\s*$", re.IGNORECASE)
+
+
+def _is_uppercase(line: str) -> bool:
+    letters = [c for c in line if c.isalpha()]
+    return bool(letters) and sum(c.isupper() for c in letters) / len(letters) >= UPPERCASE_RATIO
+
+
+def _looks_like_heading(line: str, previous: str | None = None) -> bool:
+    """True if a line is formatted as a heading.
+
+    Textract LINEs are visual lines, so wrapped body text often ends without
+    punctuation; a line only counts if it is mostly uppercase, or short,
+    title-cased and set off from the line before it (which ends a sentence
+    or is itself an uppercase heading). `previous` is None at the start of
+    the document.
+    """
+    if not any(c.isalpha() for c in line) or len(line) > MAX_HEADING_CHARS:
+        return False
+    if _is_uppercase(line):
+        return True
+    words = [w for w in line.split() if any(c.isalpha() for c in w)]
+    if len(words) > MAX_MIXED_HEADING_WORDS or line.rstrip().endswith((",", ";")):
+        return False
+    major = [w for w in words if w.lower().strip(".,:;()") not in _MINOR_WORDS]
+    if not major or sum(w.lstrip("(\"'")[:1].isupper() for w in major) / len(major) < TITLE_CASE_RATIO:
+        return False
+    prev = (previous or "").strip()
+    return not prev or prev.endswith(_SENTENCE_END) or _is_uppercase(prev)
+
+
+def classify_line(line: str, previous: str | None = None) -> str | None:
+    """Section type a line starts, or None if it is not a heading.
+
+    Args:
+        line: Textract LINE text
+        previous: The LINE before it (None at the start of the document)
+    """
+    text = line.strip()
+    if _WHEREFORE.match(text):
+        return "prayer"
+    if not _looks_like_heading(text, previous):
+        return None
+    for section_type, pattern in _PATTERNS:
+        if pattern.match(text):
+            return section_type
+    return None
+
+
+def _line_chunks(lines: list[str], chunks: list[str]) -> list[int]:
+    """Chunk index of each line.
+
+    Chunks are sentences of the joined lines, so both hold the same words in
+    the same order; a line belongs to the chunk holding its first word.
+    """
+    chunk_ends = []
+    total = 0
+    for chunk in chunks:
+        total += len(chunk.split())
+        chunk_ends.append(total)
+
+    result = []
+    words_before = 0
+    chunk = 0
+    for line in lines:
+        while chunk < len(chunk_ends) - 1 and words_before >= chunk_ends[chunk]:
+            chunk += 1
+        result.append(chunk)
+        words_before += len(line.split())
+    return result
+
+
+def build_section_index(lines: list[str], pages: list[int], chunks: list[str]) -> list[dict]:
+    """Find headings and locate each section by chunk and page range.
+
+    Args:
+        lines: Textract LINE texts in reading order
+        pages: Page number of each line
+        chunks: Chunks produced from "\\n".join(lines)
+
+    Returns:
+        [{'type', 'heading', 'start_chunk', 'end_chunk', 'start_page', 'end_page'}, ...]
+        in document order; chunk indices and pages are inclusive
+    """
+    if not lines or not chunks:
+        return []
+    line_chunks = _line_chunks(lines, chunks)
+
+    starts = []
+    in_counterclaims = False
+    for i, line in enumerate(lines):
+        section_type = classify_line(line, lines[i - 1] if i else None)
+        if section_type is None:
+            continue
+        if section_type == "counterclaim":
+            in_counterclaims = True
+        elif section_type == "count" and in_counterclaims:
+            section_type = "counterclaim"
+        elif section_type == "affirmative_defense":
+            in_counterclaims = False
+        heading = line.strip()
+        following = lines[i + 1].strip() if i + 1 < len(lines) else ""
+        if (
+            _BARE_LABEL.match(heading)
+            and classify_line(following, heading) is None
+            and _looks_like_heading(following, heading)
+        ):
+            heading = f"{heading} {following}"
+        starts.append((i, section_type, heading[:MAX_HEADING_CHARS]))
+
+    sections = []
+    for n, (start, section_type, heading) in enumerate(starts):
+        end = (starts[n + 1][0] - 1) if n + 1 < len(starts) else len(lines) - 1
+        end = max(end, start)
+        sections.append(
+            {
+                "type": section_type,
+                "heading": heading,
+                "start_chunk": line_chunks[start],
+                "end_chunk": line_chunks[end],
+                "start_page": pages[start],
+                "end_page": pages[end],
+            }
+        )
+    return sections
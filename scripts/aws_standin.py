@@ -0,0 +1,468 @@
+"""Local stand-in for the bedrock-runtime and textract APIs.
+
+Runs an HTTP server that speaks enough of both wire protocols for boto3
+clients to talk to it, so any Lambda (or scripts/run_lambda_local.py) can be
+benchmarked and load-tested without live model or OCR calls:
+
+    python scripts/aws_standin.py --port 4566 --fixtures examples/fixtures \
+        --latency-ms 1500 --latency-sigma 0.4 --max-concurrency 6
+
+    export AWS_ENDPOINT_URL_BEDROCK_RUNTIME=http://127.0.0.1:4566
+    export AWS_ENDPOINT_URL_TEXTRACT=http://127.0.0.1:4566
+    python scripts/run_lambda_local.py --lambda extract_legal_claims --example one
+    # or: python scripts/run_lambda_local.py ... --standin-url http://127.0.0.1:4566
+
+Responses come from, in order:
+- a recorded fixture keyed by the request hash (<fixtures>/<service>/<key>.json)
+- with --record, the real AWS API (the response is saved as a fixture)
+- a synthetic payload: for Bedrock, a tool_use block whose input matches the
+  forced tool's input_schema; for Textract, a few LINE blocks
+
+Latency is drawn from a log-normal distribution around --latency-ms.
+Throttling (429 ThrottlingException) is returned with probability
+--throttle-rate or whenever more than --max-concurrency requests are in
+flight; --error-rate injects 500 InternalServerException/ServiceUnavailable.
+GET /__stats returns request counters; POST /__reset clears them.
+"""
+
+import argparse
+import base64
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import math
+from pathlib import Path
+import random
+import struct
+import sys
+import threading
+import time
+from urllib.parse import unquote
+import zlib
+
+# Reuse the Lambdas' request hashing so fixtures line up with the response cache keys
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "lambdas" / "shared" / "python"))
+from jury_common.bedrock_cache import cache_key
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Serve local stand-ins for bedrock-runtime and textract.")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=4566)
+    p.add_argument(
+        "--fixtures",
+        default=None,
+        help="Directory of recorded responses (read, and written with --record).",
+    )
+    p.add_argument(
+        "--record",
+        action="store_true",
+        help="Forward fixture misses to real AWS and save the responses (requires AWS credentials).",
+    )
+    p.add_argument(
+        "--no-synthetic",
+        action="store_true",
+        help="Return 404 ResourceNotFoundException on fixture misses instead of a synthetic response.",
+    )
+    p.add_argument("--latency-ms", type=float, default=0.0, help="Median simulated latency per call.")
+    p.add_argument(
+        "--latency-sigma",
+        type=float,
+        default=0.0,
+        help="Log-normal sigma for latency (0 = fixed latency; 0.5 gives a long p99 tail).",
+    )
+    p.add_argument("--throttle-rate", type=float, default=0.0, help="Probability of a ThrottlingException.")
+    p.add_argument("--error-rate", type=float, default=0.0, help="Probability of a 5xx service error.")
+    p.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=0,
+        help="Throttle requests beyond this many in flight (0 = unlimited).",
+    )
+    p.add_argument("--seed", type=int, default=None, help="Random seed for reproducible runs.")
+    return p.parse_args()
+
+
+# --- Synthetic payloads ---
+
+
+def synthesize_from_schema(schema: dict, name: str = "value", depth: int = 0):  # noqa: PLR0911
+    """Build a minimal value that validates against a (tool input) JSON schema."""
+    schema = schema or {}
+    if "enum" in schema:
+        return schema["enum"][0]
+    kind = schema.get("type")
+    if isinstance(kind, list):
+        kind = next((k for k in kind if k != "null"), "string")
+    if kind == "object" or "properties" in schema:
+        props = schema.get("properties") or {}
+        return {key: synthesize_from_schema(sub, key, depth + 1) for key, sub in props.items()}
+    if kind == "array":
+        count = 2 if depth < 3 else 1  # noqa: PLR2004
+        return [synthesize_from_schema(schema.get("items") or {}, name, depth + 1) for _ in range(count)]
+    if kind == "integer":
+        return 1
+    if kind == "number":
+        return 1.0
+    if kind == "boolean":
+        return True
+    return f"Synthetic {name.replace('_', ' ')}"
+
+
+def synthetic_bedrock_message(request: dict, model_id: str) -> dict:
+    tools = request.get("tools") or []
+    choice = request.get("tool_choice") or {}
+    tool = next((t for t in tools if t.get("name") == choice.get("name")), tools[0] if tools else None)
+    if tool:
+        block = {
+            "type": "tool_use",
+            "id": f"toolu_standin_{random.getrandbits(32):08x}",
+            "name": tool["name"],
+            "input": synthesize_from_schema(tool.get("input_schema") or {}),
+        }
+        stop_reason = "tool_use"
+    else:
+        block = {"type": "text", "text": "Synthetic response from the local Bedrock stand-in."}
+        stop_reason = "end_turn"
+    output_text = json.dumps(block.get("input", block.get("text")))
+    return {
+        "id": f"msg_standin_{random.getrandbits(32):08x}",
+        "type": "message",
+        "role": "assistant",
+        "model": model_id,
+        "content": [block],
+        "stop_reason": stop_reason,
+        "stop_sequence": None,
+        "usage": {"input_tokens": len(json.dumps(request)) // 4, "output_tokens": max(1, len(output_text) // 4)},
+    }
+
+
+def synthetic_textract_lines(job_id: str) -> dict:
+    lines = [f"Synthetic line {i} of stand-in Textract job {job_id}." for i in range(1, 21)]
+    blocks = [{"BlockType": "PAGE", "Id": "page-1", "Page": 1}]
+    blocks += [
+        {"BlockType": "LINE", "Id": f"line-{i}", "Page": 1, "Text": text, "Confidence": 99.0}
+        for i, text in enumerate(lines, 1)
+    ]
+    return {"JobStatus": "SUCCEEDED", "DocumentMetadata": {"Pages": 1}, "Blocks": blocks}
+
+
+# --- AWS event stream encoding (for invoke-with-response-stream) ---
+
+
+def _event_stream_message(headers: dict[str, str], payload: bytes) -> bytes:
+    encoded_headers = b"".join(
+        bytes([len(name)]) + name.encode() + b"\x07" + struct.pack(">H", len(value)) + value.encode()
+        for name, value in headers.items()
+    )
+    total_length = 12 + len(encoded_headers) + len(payload) + 4
+    prelude = struct.pack(">II", total_length, len(encoded_headers))
+    message = prelude + struct.pack(">I", zlib.crc32(prelude)) + encoded_headers + payload
+    return message + struct.pack(">I", zlib.crc32(message))
+
+
+def chunk_event(event: dict) -> bytes:
+    payload = json.dumps({"bytes": base64.b64encode(json.dumps(event).encode()).decode()}).encode()
+    return _event_stream_message(
+        {":event-type": "chunk", ":content-type": "application/json", ":message-type": "event"}, payload
+    )
+
+
+def message_to_stream_events(message: dict, piece_size: int = 48) -> list[dict]:
+    """Split a complete message into the Anthropic streaming event sequence."""
+    usage = message.get("usage") or {}
+    head = {k: v for k, v in message.items() if k not in ("content", "usage", "stop_reason", "stop_sequence")}
+    events = [
+        {
+            "type": "message_start",
+            "message": {**head, "content": [], "stop_reason": None, "usage": {**usage, "output_tokens": 1}},
+        }
+    ]
+    for index, block in enumerate(message.get("content") or []):
+        if block.get("type") == "tool_use":
+            events.append({"type": "content_block_start", "index": index, "content_block": {**block, "input": {}}})
+            text = json.dumps(block.get("input") or {})
+            delta_type, field = "input_json_delta", "partial_json"
+        else:
+            events.append(
+                {"type": "content_block_start", "index": index, "content_block": {"type": "text", "text": ""}}
+            )
+            text = block.get("text", "")
+            delta_type, field = "text_delta", "text"
+        events.extend(
+            {
+                "type": "content_block_delta",
+                "index": index,
+                "delta": {"type": delta_type, field: text[i : i + piece_size]},
+            }
+            for i in range(0, len(text), piece_size)
+        )
+        events.append({"type": "content_block_stop", "index": index})
+    events.append(
+        {
+            "type": "message_delta",
+            "delta": {"stop_reason": message.get("stop_reason"), "stop_sequence": message.get("stop_sequence")},
+            "usage": {"output_tokens": usage.get("output_tokens", 0)},
+        }
+    )
+    events.append({"type": "message_stop"})
+    return events
+
+
+# --- Server ---
+
+
+class StandIn:
+    """Fixture store, fault injection and counters shared by all request threads."""
+
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.fixtures = Path(args.fixtures) if args.fixtures else None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._textract_jobs: dict[str, str] = {}  # stand-in JobId -> real JobId (record mode)
+        self._clients: dict[str, object] = {}
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.stats = {
+                "requests": 0,
+                "replayed": 0,
+                "recorded": 0,
+                "synthetic": 0,
+                "throttled": 0,
+                "errors": 0,
+                "in_flight": 0,
+                "peak_in_flight": 0,
+            }
+
+    def count(self, field: str) -> None:
+        with self._lock:
+            self.stats[field] += 1
+
+    def enter(self) -> bool:
+        """Register an in-flight request; False if it must be throttled for concurrency."""
+        with self._lock:
+            self.stats["requests"] += 1
+            limit = self.args.max_concurrency
+            if limit and self._in_flight >= limit:
+                return False
+            self._in_flight += 1
+            self.stats["in_flight"] = self._in_flight
+            self.stats["peak_in_flight"] = max(self.stats["peak_in_flight"], self._in_flight)
+            return True
+
+    def leave(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self.stats["in_flight"] = self._in_flight
+
+    def latency(self) -> float:
+        median = self.args.latency_ms / 1000.0
+        if median <= 0:
+            return 0.0
+        if self.args.latency_sigma <= 0:
+            return median
+        return median * math.exp(random.gauss(0.0, self.args.latency_sigma))
+
+    def fault(self) -> str | None:
+        roll = random.random()
+        if roll < self.args.throttle_rate:
+            return "ThrottlingException"
+        if roll < self.args.throttle_rate + self.args.error_rate:
+            return random.choice(["InternalServerException", "ServiceUnavailableException"])
+        return None
+
+    def _fixture_path(self, service: str, key: str) -> Path | None:
+        return self.fixtures / service / f"{key}.json" if self.fixtures else None
+
+    def load_fixture(self, service: str, key: str) -> dict | None:
+        path = self._fixture_path(service, key)
+        if path and path.exists():
+            self.count("replayed")
+            return json.loads(path.read_text(encoding="utf-8"))
+        return None
+
+    def save_fixture(self, service: str, key: str, response: dict) -> None:
+        path = self._fixture_path(service, key)
+        if path:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(response, indent=2, ensure_ascii=False), encoding="utf-8")
+        self.count("recorded")
+
+    def client(self, service: str):
+        # Real clients for --record; the endpoint override must not point back at us
+        if service not in self._clients:
+            import boto3  # noqa: PLC0415
+
+            endpoint = f"https://{service}.{boto3.session.Session().region_name or 'us-east-1'}.amazonaws.com"
+            self._clients[service] = boto3.client(service, endpoint_url=endpoint)
+        return self._clients[service]
+
+    def bedrock_message(self, model_id: str, raw_body: bytes) -> dict | None:
+        key = cache_key(model_id, raw_body)
+        message = self.load_fixture("bedrock", key)
+        if message is not None:
+            return message
+        if self.args.record:
+            response = self.client("bedrock-runtime").invoke_model(
+                body=raw_body, modelId=model_id, accept="application/json", contentType="application/json"
+            )
+            message = json.loads(response["body"].read())
+            self.save_fixture("bedrock", key, message)
+            return message
+        if self.args.no_synthetic:
+            return None
+        self.count("synthetic")
+        return synthetic_bedrock_message(json.loads(raw_body), model_id)
+
+    def textract(self, target: str, request: dict) -> dict | None:
+        if target == "StartDocumentTextDetection":
+            # Deterministic JobId per document so Get fixtures replay across runs
+            job_id = cache_key("textract", request)[:32]
+            if self.args.record and job_id not in self._textract_jobs:
+                real = self.client("textract").start_document_text_detection(**request)
+                self._textract_jobs[job_id] = real["JobId"]
+            return {"JobId": job_id}
+
+        key = cache_key(f"textract:{target}", request)
+        response = self.load_fixture("textract", key)
+        if response is not None:
+            return response
+        job_id = request.get("JobId", "")
+        if self.args.record and job_id in self._textract_jobs:
+            real_request = {**request, "JobId": self._textract_jobs[job_id]}
+            response = self.client("textract").get_document_text_detection(**real_request)
+            response.pop("ResponseMetadata", None)
+            if response.get("JobStatus") == "SUCCEEDED":
+                self.save_fixture("textract", key, response)
+            return response
+        if self.args.no_synthetic:
+            return None
+        self.count("synthetic")
+        return synthetic_textract_lines(job_id)
+
+
+def make_handler(standin: StandIn):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, fmt, *args):
+            sys.stderr.write(f"[standin] {self.command} {self.path} {fmt % args}\n")
+
+        def _send_json(self, status: int, obj: dict, headers: dict | None = None) -> None:
+            body = json.dumps(obj, default=str).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_error(self, code: str, textract: bool) -> None:
+            status = {"ThrottlingException": 429, "ResourceNotFoundException": 404}.get(code, 500)
+            if textract:
+                self._send_json(400 if status == 429 else status, {"__type": code, "message": f"Stand-in {code}"})  # noqa: PLR2004
+            else:
+                self._send_json(status, {"message": f"Stand-in {code}"}, {"x-amzn-ErrorType": code})
+
+        def do_GET(self):
+            if self.path.startswith("/__stats"):
+                self._send_json(200, standin.stats)
+            else:
+                self._send_json(404, {"message": "Not found"})
+
+        def do_POST(self):
+            raw = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            if self.path.startswith("/__reset"):
+                standin.reset()
+                self._send_json(200, {"reset": True})
+                return
+
+            target = self.headers.get("X-Amz-Target", "")
+            is_textract = target.startswith("Textract.")
+            if not is_textract and not self.path.startswith("/model/"):
+                self._send_json(404, {"message": f"Unsupported path {self.path}"})
+                return
+
+            if not standin.enter():
+                standin.count("throttled")
+                self._send_error("ThrottlingException", is_textract)
+                return
+            try:
+                fault = standin.fault()
+                if fault:
+                    standin.count("throttled" if fault == "ThrottlingException" else "errors")
+                    time.sleep(standin.latency() * 0.1)
+                    self._send_error(fault, is_textract)
+                elif is_textract:
+                    self._textract(target.split(".", 1)[1], raw)
+                else:
+                    self._bedrock(raw)
+            except Exception as e:
+                standin.count("errors")
+                sys.stderr.write(f"[standin] error: {e!s}\n")
+                self._send_error("InternalServerException", is_textract)
+            finally:
+                standin.leave()
+
+        def _textract(self, target: str, raw: bytes) -> None:
+            response = standin.textract(target, json.loads(raw or b"{}"))
+            if response is None:
+                self._send_error("ResourceNotFoundException", textract=True)
+                return
+            time.sleep(standin.latency())
+            self._send_json(200, response)
+
+        def _bedrock(self, raw: bytes) -> None:
+            # /model/{modelId}/invoke or /model/{modelId}/invoke-with-response-stream
+            _, _, model_part, action = self.path.split("/", 3)
+            model_id = unquote(model_part)
+            message = standin.bedrock_message(model_id, raw)
+            if message is None:
+                self._send_error("ResourceNotFoundException", textract=False)
+                return
+
+            delay = standin.latency()
+            if not action.startswith("invoke-with-response-stream"):
+                time.sleep(delay)
+                self._send_json(200, message)
+                return
+
+            events = message_to_stream_events(message)
+            # A fifth of the latency before the first token, the rest spread over the chunks
+            self.send_response(200)
+            self.send_header("Content-Type", "application/vnd.amazon.eventstream")
+            self.send_header("X-Amzn-Bedrock-Content-Type", "application/json")
+            self.end_headers()
+            time.sleep(delay * 0.2)
+            per_event = delay * 0.8 / max(1, len(events))
+            for event in events:
+                self.wfile.write(chunk_event(event))
+                self.wfile.flush()
+                time.sleep(per_event)
+            self.close_connection = True
+
+    return Handler
+
+
+def main() -> None:
+    args = parse_args()
+    if args.seed is not None:
+        random.seed(args.seed)
+    standin = StandIn(args)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(standin))
+    server.daemon_threads = True
+    url = f"http://{args.host}:{args.port}"
+    print(f"AWS stand-in listening on {url}")
+    print(f"  export AWS_ENDPOINT_URL_BEDROCK_RUNTIME={url}")
+    print(f"  export AWS_ENDPOINT_URL_TEXTRACT={url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"Stand-in stats: {json.dumps(standin.stats)}")
+
+
+if __name__ == "__main__":
+    main()
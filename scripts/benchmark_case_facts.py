@@ -0,0 +1,116 @@
+"""Compare the serial refine chain and map-reduce for case facts summarization.
+
+Runs extract_case_facts in both modes over the captured inputs in
+examples/<one|two>/inputs/extract_case_facts-*.json and reports, per input:
+
+- wall-clock time, number of Bedrock calls and cost for each mode
+- the length of each summary; pass --show to print both summaries for review
+
+Usage:
+    python scripts/benchmark_case_facts.py --examples one two
+    python scripts/benchmark_case_facts.py --standin-url http://127.0.0.1:4566 --repeat 3 --show
+
+The Bedrock response cache is disabled so both modes pay for every call;
+pass --keep-cache to measure warm runs.
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+import statistics
+import sys
+import time
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Benchmark serial vs map-reduce case facts summarization.")
+    p.add_argument("--examples", nargs="+", default=["one", "two"], choices=["one", "two"])
+    p.add_argument("--repeat", type=int, default=1, help="Runs per mode per input (timings are averaged).")
+    p.add_argument("--region", default=None, help="AWS region (sets AWS_REGION and AWS_DEFAULT_REGION).")
+    p.add_argument("--standin-url", default=None, help="Send Bedrock calls to scripts/aws_standin.py.")
+    p.add_argument("--keep-cache", action="store_true", help="Leave the Bedrock response cache enabled.")
+    p.add_argument("--show", action="store_true", help="Print both summaries for each input.")
+    p.add_argument("--save", default=None, help="Write the full results as JSON to this path.")
+    return p.parse_args()
+
+
+def setup_environment(args: argparse.Namespace) -> None:
+    # Must happen before the Lambda modules create their boto3 clients
+    if args.region:
+        os.environ.setdefault("AWS_REGION", args.region)
+        os.environ.setdefault("AWS_DEFAULT_REGION", args.region)
+    if args.standin_url:
+        os.environ["AWS_ENDPOINT_URL_BEDROCK_RUNTIME"] = args.standin_url
+    if not args.keep_cache:
+        os.environ["BEDROCK_CACHE_DISABLED"] = "1"
+
+    root = Path(__file__).resolve().parent.parent
+    sys.path.insert(0, str(root / "lambdas" / "shared" / "python"))
+    sys.path.insert(0, str(root / "lambdas" / "extract_case_facts"))
+
+
+def run_once(case_facts_processing, ledger, payload: dict, mode: str) -> dict:
+    ledger.start(stage=f"benchmark:{mode}")
+    started = time.monotonic()
+    summary = case_facts_processing.extract_case_facts(
+        complaint_chunks=payload.get("complaint_chunks") or [],
+        answer_chunks=payload.get("answer_chunks") or [],
+        witness_chunks=payload.get("witness_chunks") or [],
+        mode=mode,
+    )
+    elapsed = time.monotonic() - started
+    totals = ledger.snapshot()["totals"]
+    return {"seconds": elapsed, "bedrock_calls": totals["calls"], "cost_usd": totals["cost_usd"], "summary": summary}
+
+
+def main() -> None:
+    args = parse_args()
+    setup_environment(args)
+
+    import case_facts_processing  # noqa: PLC0415
+    from jury_common.usage_ledger import ledger  # noqa: PLC0415
+
+    results = []
+    for example in args.examples:
+        for path in sorted((Path("examples") / example / "inputs").glob("extract_case_facts-*.json")):
+            payload = json.loads(path.read_text(encoding="utf-8"))
+            documents = ("complaint_chunks", "answer_chunks", "witness_chunks")
+            if any(payload.get(key) is not None and not isinstance(payload[key], list) for key in documents):
+                print(f"Skipping {path}: chunks are not inline (S3 pointer)")
+                continue
+
+            row = {"input": str(path), "chunks": sum(len(payload.get(key) or []) for key in documents)}
+            for mode in case_facts_processing.SUMMARY_MODES:
+                runs = [run_once(case_facts_processing, ledger, payload, mode) for _ in range(args.repeat)]
+                row[mode] = {
+                    "seconds": statistics.mean(r["seconds"] for r in runs),
+                    "bedrock_calls": runs[-1]["bedrock_calls"],
+                    "cost_usd": runs[-1]["cost_usd"],
+                    "summary": runs[-1]["summary"],
+                }
+            results.append(row)
+
+    print(
+        f"\n{'input':<50} {'chunks':>6} {'serial s':>9} {'m-r s':>7} {'speedup':>8} "
+        f"{'calls s/m-r':>12} {'cost s/m-r':>16} {'chars s/m-r':>12}"
+    )
+    for row in results:
+        serial, map_reduce = row["serial"], row["map_reduce"]
+        speedup = serial["seconds"] / map_reduce["seconds"] if map_reduce["seconds"] else float("inf")
+        print(
+            f"{row['input'][-50:]:<50} {row['chunks']:>6} {serial['seconds']:>9.1f} {map_reduce['seconds']:>7.1f} "
+            f"{speedup:>7.1f}x {serial['bedrock_calls']:>5}/{map_reduce['bedrock_calls']:<6} "
+            f"{serial['cost_usd']:>7.4f}/{map_reduce['cost_usd']:<8.4f} "
+            f"{len(serial['summary']):>5}/{len(map_reduce['summary']):<6}"
+        )
+        if args.show:
+            print(f"\n  serial:\n{serial['summary']}\n\n  map_reduce:\n{map_reduce['summary']}\n")
+
+    if args.save:
+        Path(args.save).write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"\nSaved results to {args.save}")
+
+
+if __name__ == "__main__":
+    main()
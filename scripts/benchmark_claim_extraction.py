@@ -0,0 +1,124 @@
+"""Compare serial and parallel window extraction for claims/counterclaims.
+
+Runs the full extract_legal_claims pipeline (windows -> deduplicate_claims ->
+match_claims_to_database) in both modes over the captured inputs in
+examples/<one|two>/inputs/extract_legal_claims-*.json and reports, per input:
+
+- wall-clock time and number of Bedrock calls for each mode
+- recall of the parallel mode against the serial mode, measured on the
+  matched claim IDs (the serial result is the reference)
+
+Usage:
+    python scripts/benchmark_claim_extraction.py --examples one two
+    python scripts/benchmark_claim_extraction.py --standin-url http://127.0.0.1:4566 --repeat 3
+
+The Claims table is read from DynamoDB as in the Lambda (DYNAMODB_CLAIMS_TABLE_NAME,
+default Claims-<environment>). The Bedrock response cache is disabled so both
+modes pay for every call; pass --keep-cache to measure warm runs.
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+import statistics
+import sys
+import time
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Benchmark serial vs parallel claim window extraction.")
+    p.add_argument("--examples", nargs="+", default=["one", "two"], choices=["one", "two"])
+    p.add_argument("--repeat", type=int, default=1, help="Runs per mode per input (timings are averaged).")
+    p.add_argument("--region", default=None, help="AWS region (sets AWS_REGION and AWS_DEFAULT_REGION).")
+    p.add_argument("--environment", default="dev", help="Environment suffix for the Claims table.")
+    p.add_argument("--standin-url", default=None, help="Send Bedrock calls to scripts/aws_standin.py.")
+    p.add_argument("--keep-cache", action="store_true", help="Leave the Bedrock response cache enabled.")
+    p.add_argument("--save", default=None, help="Write the full results as JSON to this path.")
+    return p.parse_args()
+
+
+def setup_environment(args: argparse.Namespace) -> None:
+    # Must happen before the Lambda modules create their boto3 clients
+    if args.region:
+        os.environ.setdefault("AWS_REGION", args.region)
+        os.environ.setdefault("AWS_DEFAULT_REGION", args.region)
+    if args.standin_url:
+        os.environ["AWS_ENDPOINT_URL_BEDROCK_RUNTIME"] = args.standin_url
+    if not args.keep_cache:
+        os.environ["BEDROCK_CACHE_DISABLED"] = "1"
+    os.environ.setdefault("DYNAMODB_CLAIMS_TABLE_NAME", f"Claims-{args.environment}")
+
+    root = Path(__file__).resolve().parent.parent
+    sys.path.insert(0, str(root / "lambdas" / "shared" / "python"))
+    sys.path.insert(0, str(root / "lambdas" / "extract_legal_claims"))
+
+
+def run_once(claims_processing, ledger, chunks: list[str], claim_type: str, mode: str) -> dict:
+    ledger.start(stage=f"benchmark:{mode}")
+    started = time.monotonic()
+    if claim_type == "claims":
+        matched = claims_processing.extract_claims(chunks, mode=mode)
+    else:
+        matched = claims_processing.extract_counterclaims(chunks, mode=mode)
+    elapsed = time.monotonic() - started
+    totals = ledger.snapshot()["totals"]
+    return {
+        "seconds": elapsed,
+        "bedrock_calls": totals["calls"],
+        "cost_usd": totals["cost_usd"],
+        "claim_ids": sorted({str(m["claim_id"]) for m in matched if m.get("claim_id") not in (None, "", "null")}),
+    }
+
+
+def main() -> None:
+    args = parse_args()
+    setup_environment(args)
+
+    import claims_processing  # noqa: PLC0415
+    from jury_common.usage_ledger import ledger  # noqa: PLC0415
+
+    results = []
+    for example in args.examples:
+        for path in sorted((Path("examples") / example / "inputs").glob("extract_legal_claims-*.json")):
+            payload = json.loads(path.read_text(encoding="utf-8"))
+            chunks = payload.get("chunks")
+            if not isinstance(chunks, list):
+                print(f"Skipping {path}: chunks are not inline (S3 pointer)")
+                continue
+            claim_type = payload.get("claim_type", "claims")
+
+            row = {"input": str(path), "claim_type": claim_type, "chunks": len(chunks)}
+            for mode in claims_processing.EXTRACTION_MODES:
+                runs = [run_once(claims_processing, ledger, chunks, claim_type, mode) for _ in range(args.repeat)]
+                row[mode] = {
+                    "seconds": statistics.mean(r["seconds"] for r in runs),
+                    "bedrock_calls": runs[-1]["bedrock_calls"],
+                    "cost_usd": runs[-1]["cost_usd"],
+                    "claim_ids": runs[-1]["claim_ids"],
+                }
+
+            serial_ids = set(row["serial"]["claim_ids"])
+            parallel_ids = set(row["parallel"]["claim_ids"])
+            row["recall"] = len(serial_ids & parallel_ids) / len(serial_ids) if serial_ids else 1.0
+            row["extra_in_parallel"] = sorted(parallel_ids - serial_ids)
+            results.append(row)
+
+    print(f"\n{'input':<55} {'type':<13} {'chunks':>6} {'serial s':>9} {'para s':>8} {'speedup':>8} {'recall':>7}")
+    for row in results:
+        serial_s, parallel_s = row["serial"]["seconds"], row["parallel"]["seconds"]
+        speedup = serial_s / parallel_s if parallel_s else float("inf")
+        print(
+            f"{row['input'][-55:]:<55} {row['claim_type']:<13} {row['chunks']:>6} "
+            f"{serial_s:>9.1f} {parallel_s:>8.1f} {speedup:>7.1f}x {row['recall']:>7.0%}"
+        )
+        if row["extra_in_parallel"]:
+            print(f"    claim IDs found only in parallel mode: {', '.join(row['extra_in_parallel'])}")
+
+    if args.save:
+        Path(args.save).write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"\nSaved results to {args.save}")
+
+
+if __name__ == "__main__":
+    main()
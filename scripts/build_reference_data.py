@@ -0,0 +1,87 @@
+"""Compile the Claims and Standard Jury Instructions seed data into the shared layer.
+
+Reads terraform/data/claims.json and terraform/data/standard_jury_instructions.json
+and writes lambdas/shared/python/jury_common/data/reference_data.bin, which the
+Lambdas memory-map at cold start instead of scanning DynamoDB (see
+jury_common/reference_data.py). Run it before `terraform apply` so the layer
+archive picks up the artifact; each table's version stamp is the sha256 of its
+JSON file, which Terraform also writes to the table's "__version__" item.
+
+After editing a Claims or StandardJuryInstructions table directly (console,
+ad-hoc scripts), run with --bump so the Lambdas see the edit: it writes a new
+value to the table's "__version__" item, which warm containers reload on and
+which no longer matches the artifact, so cold starts scan the table.
+
+Usage:
+    python scripts/build_reference_data.py
+    python scripts/build_reference_data.py --check   # exit 1 if the artifact is missing or stale
+    python scripts/build_reference_data.py --bump claims --environment prod
+
+Tables default to Claims-<environment> and StandardJuryInstructions-<environment>;
+override with DYNAMODB_CLAIMS_TABLE_NAME / DYNAMODB_STANDARD_JURY_INSTRUCTIONS_TABLE_NAME.
+"""
+
+import argparse
+import os
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).resolve().parent.parent
+SOURCES = {
+    "claims": ROOT / "terraform" / "data" / "claims.json",
+    "standard_jury_instructions": ROOT / "terraform" / "data" / "standard_jury_instructions.json",
+}
+# Deployed table name per reference table: (environment variable, name before -<environment>)
+TABLES = {
+    "claims": ("DYNAMODB_CLAIMS_TABLE_NAME", "Claims"),
+    "standard_jury_instructions": ("DYNAMODB_STANDARD_JURY_INSTRUCTIONS_TABLE_NAME", "StandardJuryInstructions"),
+}
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Compile reference data into the shared Lambda layer.")
+    p.add_argument("--check", action="store_true", help="Only verify the artifact matches the source data.")
+    p.add_argument(
+        "--bump", choices=sorted(TABLES), default=None, help="Bump a deployed table's version after a direct edit."
+    )
+    p.add_argument("--environment", default="dev", help="Environment suffix for --bump.")
+    p.add_argument("--region", default=None, help="AWS region for --bump (sets AWS_REGION and AWS_DEFAULT_REGION).")
+    args = p.parse_args()
+
+    sys.path.insert(0, str(ROOT / "lambdas" / "shared" / "python"))
+    from jury_common import reference_data  # noqa: PLC0415
+
+    if args.bump:
+        if args.region:
+            os.environ.setdefault("AWS_REGION", args.region)
+            os.environ.setdefault("AWS_DEFAULT_REGION", args.region)
+        import boto3  # noqa: PLC0415
+
+        variable, base_name = TABLES[args.bump]
+        table_name = os.environ.get(variable, f"{base_name}-{args.environment}")
+        version = reference_data.bump_version(boto3.resource("dynamodb").Table(table_name))
+        print(f"{table_name}: version {version}; warm Lambdas reload within REFERENCE_CHECK_SECONDS")
+        return
+
+    if args.check:
+        try:
+            artifact = reference_data.Artifact(reference_data.ARTIFACT_PATH)
+        except (OSError, ValueError) as e:
+            sys.exit(f"Reference data artifact unusable: {e!s}")
+        for name, path in SOURCES.items():
+            compiled = artifact.table(name)
+            expected = reference_data.data_version(path.read_bytes())
+            if compiled is None or compiled.version != expected:
+                sys.exit(f"{reference_data.ARTIFACT_PATH} is stale for {name}; run scripts/build_reference_data.py")
+        print(f"{reference_data.ARTIFACT_PATH} is up to date")
+        return
+
+    versions = reference_data.build(SOURCES, reference_data.ARTIFACT_PATH)
+    size = reference_data.ARTIFACT_PATH.stat().st_size
+    print(f"Wrote {reference_data.ARTIFACT_PATH} ({size / 1024:.0f} KiB)")
+    for name, version in versions.items():
+        print(f"  {name}: version {version[:12]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""List and edit the learned claim alias table (normalized claim name -> Claims ID).
+
+extract_legal_claims resolves names found in this table without a model call and
+adds confident LLM matches to it. Operator entries (set here) are never
+overwritten by learned ones.
+
+Usage:
+    python scripts/claim_aliases.py list
+    python scripts/claim_aliases.py set "Breach of K" 9cf9c06a-36a1-4e81-80ef-a886ad6ff085
+    python scripts/claim_aliases.py delete "Breach of K"
+
+Tables default to ClaimAliases-<environment> and Claims-<environment>; override
+with CLAIM_ALIASES_TABLE_NAME / DYNAMODB_CLAIMS_TABLE_NAME.
+"""
+
+import argparse
+import os
+from pathlib import Path
+import sys
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="List and edit learned claim aliases.")
+    p.add_argument("--environment", default="dev", help="Environment suffix for the tables.")
+    p.add_argument("--region", default=None, help="AWS region (sets AWS_REGION and AWS_DEFAULT_REGION).")
+    sub = p.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="Print every alias.")
+    set_p = sub.add_parser("set", help="Map a claim name to a Claims table ID (operator entry).")
+    set_p.add_argument("name")
+    set_p.add_argument("claim_id")
+    delete_p = sub.add_parser("delete", help="Remove the alias for a claim name.")
+    delete_p.add_argument("name")
+    return p.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if args.region:
+        os.environ.setdefault("AWS_REGION", args.region)
+        os.environ.setdefault("AWS_DEFAULT_REGION", args.region)
+    os.environ.setdefault("CLAIM_ALIASES_TABLE_NAME", f"ClaimAliases-{args.environment}")
+    claims_table_name = os.environ.get("DYNAMODB_CLAIMS_TABLE_NAME", f"Claims-{args.environment}")
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "lambdas" / "shared" / "python"))
+
+    import boto3  # noqa: PLC0415
+    from jury_common import dedup  # noqa: PLC0415
+    from jury_common.claim_aliases import SOURCE_OPERATOR, aliases  # noqa: PLC0415
+
+    if args.command == "list":
+        entries = aliases.entries()
+        for item in entries:
+            print(f"{item['alias']:<50} {item['claim_id']:<38} {item.get('source', ''):<9} {item.get('name', '')}")
+        print(f"{len(entries)} aliases in {aliases.table_name}")
+    elif args.command == "set":
+        claim = boto3.resource("dynamodb").Table(claims_table_name).get_item(Key={"id": args.claim_id}).get("Item")
+        if not claim:
+            sys.exit(f"No claim with id {args.claim_id} in {claims_table_name}")
+        aliases.put(args.name, args.claim_id, source=SOURCE_OPERATOR)
+        print(f"'{dedup.normalize(args.name)}' -> {args.claim_id} ({claim.get('title')})")
+    else:
+        aliases.delete(args.name)
+        print(f"Deleted alias '{dedup.normalize(args.name)}'")
+
+
+if __name__ == "__main__":
+    main()
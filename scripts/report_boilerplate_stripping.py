@@ -0,0 +1,109 @@
+"""Report what strip_boilerplate() cuts before case facts summarization, and check it.
+
+For each captured input in examples/<one|two>/inputs/extract_case_facts-*.json
+prints the stripping statistics; pass --show to list every segment that is cut.
+
+It also runs strip_boilerplate() over STRIP_CHECKS, small documents whose
+expected result is known (text that must survive and text that must go), and
+lists any mismatch. Everything is offline; the exit status is 1 if a check fails.
+
+Usage:
+    python scripts/report_boilerplate_stripping.py --examples one two --show
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+import sys
+
+_CAPTION = "IN THE CIRCUIT COURT OF THE ELEVENTH JUDICIAL CIRCUIT IN AND FOR MIAMI-DADE COUNTY, FLORIDA"
+_FOOTER = "Filing # 123456 E-Filed 03/01/2024 10:15:00 AM"
+
+# (name, source, chunks, text that must be kept, text that must be cut)
+STRIP_CHECKS = [
+    (
+        "answer with repeated short responses",
+        "answer",
+        [
+            f"{_CAPTION}\nANSWER\n1. Admitted.\n2. Denied.\n3. Without knowledge, therefore denied.\n{_FOOTER}",
+            f"{_FOOTER}\n4. Admitted.\n5. Denied.\n6. Deny.\n7. Without knowledge.",
+            f"{_FOOTER}\n8. Admitted.\n9. Denied.\n10. Admitted in part and denied in part.",
+            f"{_FOOTER}\n11. Denied.\n12. Admitted.\nRespectfully submitted,\n/s/ Jane Muir",
+        ],
+        ["Admitted.", "Denied.", "Deny.", "Without knowledge.", "Admitted in part and denied in part."],
+        [_CAPTION, _FOOTER, "Respectfully submitted,"],
+    ),
+    (
+        "page footer inside a sentence",
+        "complaint",
+        [
+            "12. Defendant acquired confidential information from Plaintiff Page 4 of 14 with the "
+            "understanding it would be kept secret.",
+        ],
+        ["Defendant acquired confidential information from Plaintiff", "with the understanding"],
+        ["Page 4 of 14"],
+    ),
+    (
+        "document that is all boilerplate",
+        "witness list",
+        [f"{_CAPTION}\nCASE NO. 24-036019-CC-26\nRespectfully submitted,"],
+        [_CAPTION],
+        [],
+    ),
+]
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Report and check case facts boilerplate stripping.")
+    p.add_argument("--examples", nargs="+", default=["one", "two"], choices=["one", "two"])
+    p.add_argument("--show", action="store_true", help="List every segment that is cut.")
+    return p.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    # The shared layer creates boto3 clients at import; no AWS call is made
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    root = Path(__file__).resolve().parent.parent
+    sys.path.insert(0, str(root / "lambdas" / "shared" / "python"))
+    sys.path.insert(0, str(root / "lambdas" / "extract_case_facts"))
+
+    import case_facts_processing  # noqa: PLC0415
+
+    for example in args.examples:
+        for path in sorted((root / "examples" / example / "inputs").glob("extract_case_facts-*.json")):
+            payload = json.loads(path.read_text(encoding="utf-8"))
+            documents = case_facts_processing._documents(
+                payload.get("complaint_chunks") or [],
+                payload.get("answer_chunks") or [],
+                payload.get("witness_chunks"),
+            )
+            if any(not isinstance(chunks, list) for _, chunks in documents):
+                print(f"Skipping {path}: chunks are not inline (S3 pointer)")
+                continue
+            stripped, stats = case_facts_processing.strip_boilerplate(documents)
+            print(f"{path.relative_to(root)}: {stats}")
+            if args.show:
+                kept = "\n".join(chunk for _, chunks in stripped for chunk in chunks)
+                for _, chunks in documents:
+                    for chunk in chunks:
+                        for segment in case_facts_processing._segments(chunk):
+                            if segment not in kept:
+                                print(f"    cut: {segment[:100]}")
+
+    failures = 0
+    for name, source, chunks, must_keep, must_cut in STRIP_CHECKS:
+        stripped, _ = case_facts_processing.strip_boilerplate([(source, chunks)])
+        text = "\n".join(stripped[0][1])
+        lost = [t for t in must_keep if t not in text]
+        left = [t for t in must_cut if t in text]
+        if lost or left:
+            failures += 1
+            print(f"MISMATCH {name}: lost {lost}, not cut {left}\n    result: {stripped[0][1]}")
+    print(f"\n{len(STRIP_CHECKS) - failures} of {len(STRIP_CHECKS)} stripping checks passed")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Report how many claim windows the heading pre-filter skips, and whether it loses claims.
+
+For each captured input in examples/<one|two>/inputs/extract_legal_claims-*.json
+prints the number of sliding windows, how many the pre-filter keeps (windows with
+COUNT/COUNTERCLAIM/cause-of-action headings plus the margin) and the skip rate.
+This part is offline: no AWS calls are made beyond the Claims table scan that
+claims_processing performs at import.
+
+With --verify, raw extraction is also run with and without the pre-filter and the
+normalized claim names are compared, so a recall loss shows up as names found
+only without the pre-filter.
+
+Usage:
+    python scripts/report_claim_prefilter.py --examples one two
+    python scripts/report_claim_prefilter.py --margin 0 --verify --standin-url http://127.0.0.1:4566
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+import sys
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Report claim window pre-filter skip rates.")
+    p.add_argument("--examples", nargs="+", default=["one", "two"], choices=["one", "two"])
+    p.add_argument("--window-size", type=int, default=3, help="Chunks per window (as in the Lambda).")
+    p.add_argument("--margin", type=int, default=1, help="Neighbour windows kept around each candidate window.")
+    p.add_argument("--verify", action="store_true", help="Run extraction with and without the pre-filter.")
+    p.add_argument("--mode", default="serial", choices=["serial", "parallel"], help="Window mode for --verify.")
+    p.add_argument("--region", default=None, help="AWS region (sets AWS_REGION and AWS_DEFAULT_REGION).")
+    p.add_argument("--environment", default="dev", help="Environment suffix for the Claims table.")
+    p.add_argument("--standin-url", default=None, help="Send Bedrock calls to scripts/aws_standin.py.")
+    return p.parse_args()
+
+
+def setup_environment(args: argparse.Namespace) -> None:
+    # Must happen before the Lambda modules create their boto3 clients
+    if args.region:
+        os.environ.setdefault("AWS_REGION", args.region)
+        os.environ.setdefault("AWS_DEFAULT_REGION", args.region)
+    if args.standin_url:
+        os.environ["AWS_ENDPOINT_URL_BEDROCK_RUNTIME"] = args.standin_url
+    os.environ.setdefault("DYNAMODB_CLAIMS_TABLE_NAME", f"Claims-{args.environment}")
+
+    root = Path(__file__).resolve().parent.parent
+    sys.path.insert(0, str(root / "lambdas" / "shared" / "python"))
+    sys.path.insert(0, str(root / "lambdas" / "extract_legal_claims"))
+
+
+def main() -> None:
+    args = parse_args()
+    setup_environment(args)
+
+    import claims_processing  # noqa: PLC0415
+    from jury_common import dedup  # noqa: PLC0415
+
+    print(f"{'input':<55} {'type':<13} {'windows':>7} {'kept':>5} {'skip':>6}")
+    total_windows = total_kept = 0
+    for example in args.examples:
+        for path in sorted((Path("examples") / example / "inputs").glob("extract_legal_claims-*.json")):
+            payload = json.loads(path.read_text(encoding="utf-8"))
+            chunks = payload.get("chunks")
+            if not isinstance(chunks, list):
+                print(f"Skipping {path}: chunks are not inline (S3 pointer)")
+                continue
+            claim_type = payload.get("claim_type", "claims")
+            step = args.window_size - 1
+            windows = ["\n".join(chunks[i : i + args.window_size]) for i in range(0, len(chunks), step)]
+            kept = claims_processing.select_candidate_windows(windows, margin=args.margin)
+            total_windows += len(windows)
+            total_kept += len(kept)
+            skip = 1 - len(kept) / len(windows) if windows else 0.0
+            print(f"{str(path)[-55:]:<55} {claim_type:<13} {len(windows):>7} {len(kept):>5} {skip:>6.0%}")
+
+            if args.verify:
+                found = {}
+                for prefilter in (False, True):
+                    raw = claims_processing.extract_raw_claims(
+                        chunks,
+                        args.window_size,
+                        claim_type=claim_type,
+                        mode=args.mode,
+                        prefilter=prefilter,
+                        margin=args.margin,
+                    )
+                    found[prefilter] = {dedup.normalize(c["name"]) for c in raw}
+                missed = sorted(found[False] - found[True])
+                print(f"    claims without pre-filter: {len(found[False])}, with: {len(found[True])}")
+                if missed:
+                    print(f"    MISSED with pre-filter: {', '.join(missed)}")
+
+    if total_windows:
+        skip = 1 - total_kept / total_windows
+        print(f"\nOverall: kept {total_kept} of {total_windows} windows (skip rate {skip:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Report what the local witness-list parser resolves, and check it on known entries.
+
+For each captured input in examples/<one|two>/inputs/extract_witnesses-*.json
+prints the witnesses parse_witness_list() reads without a model call, the
+number of excluded generic entries and the entries it leaves for the model.
+
+It also runs parse_name() over NAME_CHECKS, entries whose expected reading is
+known (None means the entry must go to the model), and lists any mismatch.
+Everything is offline; the exit status is 1 if a check fails.
+
+Usage:
+    python scripts/report_witness_parser.py --examples one two
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+import sys
+
+# (entry, expected (first_name, last_name) or None for "leave to the model")
+NAME_CHECKS = [
+    ("Richard Gold 8537 SW 214th Lane Cutler Bay, FL 33189", ("Richard", "Gold")),
+    ("Johana M. Nobregas, 3301 Emerald Pointe Dr", ("Johana", "Nobregas")),
+    ("Mark Barnett, M.D., Expert witness, 7301 W. Palmetto Park Road", ("Mark", "Barnett")),
+    ("Dr. Maria de la Cruz, 123 Main St", ("Maria", "de la Cruz")),
+    ("JOHN SMITH, JR.", ("John", "Smith")),
+    ("Mary O'Neil-Jones 44 Elm", ("Mary", "O'Neil-Jones")),
+    ("John Doe, corporate representative of ABC", ("John", "Doe")),
+    ("Plaintiff, Jennifer Gold", None),
+    ("Corporate Representative of ABC Bank", None),
+    ("J. Robert Smith", None),
+    ("Jane Doe Treating Physician", None),
+    ("Nurse Betty Ford, Jackson Memorial", None),
+    ("Chief Medical Examiner Jane Doe", None),
+    ("Jane Doe Jackson Memorial Hospital", None),
+]
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Report local witness-list parser results.")
+    p.add_argument("--examples", nargs="+", default=["one", "two"], choices=["one", "two"])
+    return p.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    # The shared layer creates boto3 clients at import; no AWS call is made
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    root = Path(__file__).resolve().parent.parent
+    sys.path.insert(0, str(root / "lambdas" / "shared" / "python"))
+    sys.path.insert(0, str(root / "lambdas" / "extract_witnesses"))
+
+    import witness_processing  # noqa: PLC0415
+
+    for example in args.examples:
+        for path in sorted((root / "examples" / example / "inputs").glob("extract_witnesses-*.json")):
+            chunks = json.loads(path.read_text(encoding="utf-8"))
+            if not isinstance(chunks, list):
+                print(f"Skipping {path}: chunks are not inline (S3 pointer)")
+                continue
+            parsed = witness_processing.parse_witness_list("\n".join(chunks))
+            if parsed is None:
+                print(f"{path.relative_to(root)}: not read as a list; the whole document goes to the model")
+                continue
+            witnesses, unresolved, excluded = parsed
+            names = ", ".join(f"{w['first_name']} {w['last_name']}" for w in witnesses)
+            print(
+                f"{path.relative_to(root)}: {len(witnesses)} parsed, {excluded} excluded, {len(unresolved)} unresolved"
+            )
+            print(f"    parsed: {names}")
+            for entry in unresolved:
+                print(f"    to model: {entry[:100]}")
+
+    failures = 0
+    for entry, expected in NAME_CHECKS:
+        name = witness_processing.parse_name(entry)
+        got = (name["first_name"], name["last_name"]) if name else None
+        if got != expected:
+            failures += 1
+            print(f"MISMATCH {entry!r}: expected {expected}, got {got}")
+    print(f"\n{len(NAME_CHECKS) - failures} of {len(NAME_CHECKS)} name checks passed")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
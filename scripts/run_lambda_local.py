@@ -66,6 +66,14 @@ def parse_args() -> argparse.Namespace:
         default="dev",
         help="Environment name used for table suffixes (e.g., dev → Claims-dev).",
     )
+    p.add_argument(
+        "--standin-url",
+        default=None,
+        help=(
+            "Send bedrock-runtime and textract calls to a local stand-in (scripts/aws_standin.py), "
+            "e.g. http://127.0.0.1:4566."
+        ),
+    )
     p.add_argument(
         "--ensure-inputs",
         action="store_true",
@@ -145,6 +153,10 @@ def resolve_handler(lambda_name: str) -> tuple[Callable, Path]:
     lambda_path = str(lambda_dir.resolve())
     if lambda_path not in sys.path:
         sys.path.insert(0, lambda_path)
+    # Shared layer code (mounted at /opt/python in the Lambda runtime)
+    shared_path = str((Path("lambdas") / "shared" / "python").resolve())
+    if shared_path not in sys.path:
+        sys.path.insert(0, shared_path)
 
     # Dev hot-reload: purge previously loaded modules from this lambda folder
     try:
@@ -271,6 +283,11 @@ def main() -> None:  # noqa: PLR0912, PLR0915
         except Exception:
             pass
 
+    # Point model/OCR clients at the stand-in before the Lambda modules create them
+    if args.standin_url:
+        os.environ["AWS_ENDPOINT_URL_BEDROCK_RUNTIME"] = args.standin_url
+        os.environ["AWS_ENDPOINT_URL_TEXTRACT"] = args.standin_url
+
     # Ensure expected DynamoDB env vars when not provided
     env_name = args.environment or "dev"
     def set_if_missing(key: str, val: str) -> None:
@@ -279,6 +296,7 @@ def main() -> None:  # noqa: PLR0912, PLR0915
 
     if args.lambda_name == "extract_legal_claims":
         set_if_missing("DYNAMODB_CLAIMS_TABLE_NAME", f"Claims-{env_name}")
+        set_if_missing("CLAIM_ALIASES_TABLE_NAME", f"ClaimAliases-{env_name}")
     if args.lambda_name == "generate_instructions":
         set_if_missing("DYNAMODB_CLAIMS_TABLE_NAME", f"Claims-{env_name}")
         set_if_missing("DYNAMODB_STANDARD_JURY_INSTRUCTIONS_TABLE_NAME", f"StandardJuryInstructions-{env_name}")
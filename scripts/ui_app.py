@@ -97,6 +97,10 @@ def resolve_handler(lambda_name: str) -> tuple[callable, Path]:
     lambda_path = str(lambda_dir.resolve())
     if lambda_path not in sys.path:
         sys.path.insert(0, lambda_path)
+    # Shared layer code (mounted at /opt/python in the Lambda runtime)
+    shared_path = str((Path("lambdas") / "shared" / "python").resolve())
+    if shared_path not in sys.path:
+        sys.path.insert(0, shared_path)
     # Dev hot-reload: drop any previously loaded modules from this lambda folder
     try:
         lambda_root = lambda_dir.resolve()
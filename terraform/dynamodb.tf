@@ -31,6 +31,60 @@ resource "aws_dynamodb_table" "standard_jury_instructions" {
     name = "id"
     type = "S"
   }
+
+  attribute {
+    name = "number"
+    type = "S"
+  }
+
+  attribute {
+    name = "category_number"
+    type = "S"
+  }
+
+  # Instruction lookups by number / category (InstructionRepository in generate_instructions)
+  global_secondary_index {
+    name            = "number-index"
+    hash_key        = "number"
+    projection_type = "ALL"
+  }
+
+  global_secondary_index {
+    name            = "category_number-index"
+    hash_key        = "category_number"
+    projection_type = "ALL"
+  }
+}
+
+# Content-addressed Bedrock response cache shared by all Bedrock Lambdas
+# (see lambdas/shared/python/jury_common/bedrock_cache.py)
+resource "aws_dynamodb_table" "bedrock_cache" {
+  name         = "BedrockResponseCache${local.env_suffix}"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "cache_key"
+
+  attribute {
+    name = "cache_key"
+    type = "S"
+  }
+
+  ttl {
+    attribute_name = "expires_at"
+    enabled        = true
+  }
+}
+
+# Learned claim-name aliases used by extract_legal_claims before LLM matching
+# (see lambdas/shared/python/jury_common/claim_aliases.py; edit with scripts/claim_aliases.py)
+resource "aws_dynamodb_table" "claim_aliases" {
+  name         = "ClaimAliases${local.env_suffix}"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "alias"
+
+  attribute {
+    name = "alias"
+    type = "S"
+  }
 }
 
 # Option B: Pure Terraform seeding using aws_dynamodb_table_item
@@ -81,3 +135,27 @@ resource "aws_dynamodb_table_item" "sji_items" {
     try(length(trimspace(tostring(each.value.notes_on_use))) > 0, false) ? { notes_on_use = { S = tostring(each.value.notes_on_use) } } : {}
   ))
 }
+
+# Data version stamps: sha256 of each seed file. Lambdas compare these with the
+# compiled reference data in the shared layer (scripts/build_reference_data.py)
+# and fall back to scanning the table when they differ. Direct table edits must
+# bump the item (scripts/build_reference_data.py --bump); the next apply resets it.
+resource "aws_dynamodb_table_item" "claims_version" {
+  table_name = aws_dynamodb_table.claims.name
+  hash_key   = "id"
+
+  item = jsonencode({
+    id      = { S = "__version__" }
+    version = { S = filesha256("${path.module}/data/claims.json") }
+  })
+}
+
+resource "aws_dynamodb_table_item" "sji_version" {
+  table_name = aws_dynamodb_table.standard_jury_instructions.name
+  hash_key   = "id"
+
+  item = jsonencode({
+    id      = { S = "__version__" }
+    version = { S = filesha256("${path.module}/data/standard_jury_instructions.json") }
+  })
+}
@@ -262,13 +262,23 @@ resource "aws_iam_policy" "bedrock_analyzer_policy" {
     Statement = [
       { # Call Bedrock
         Effect   = "Allow",
-        Action   = ["bedrock:InvokeModel"],
+        Action   = ["bedrock:InvokeModel", "bedrock:InvokeModelWithResponseStream"],
         Resource = "*" # You can restrict this to specific models
       },
-      { # Read from the standard claims/instructions tables
+      { # Read from the standard claims/instructions tables (and their indexes)
         Effect   = "Allow",
-        Action   = ["dynamodb:Scan", "dynamodb:GetItem"],
+        Action   = ["dynamodb:Scan", "dynamodb:GetItem", "dynamodb:Query"],
         Resource = ["*"]
+      },
+      { # Read/write the shared Bedrock response cache
+        Effect   = "Allow",
+        Action   = ["dynamodb:GetItem", "dynamodb:PutItem"],
+        Resource = aws_dynamodb_table.bedrock_cache.arn
+      },
+      { # Append per-invocation Bedrock usage to the job item
+        Effect   = "Allow",
+        Action   = ["dynamodb:UpdateItem"],
+        Resource = aws_dynamodb_table.jury_instructions.arn
       }
     ]
   })
@@ -290,6 +300,11 @@ resource "aws_iam_role_policy" "extract_legal_claims_inline" {
         Effect   = "Allow",
         Action   = ["s3:GetObject"],
         Resource = "${aws_s3_bucket.processing.arn}/*"
+      },
+      { # Load and learn claim aliases
+        Effect   = "Allow",
+        Action   = ["dynamodb:Scan", "dynamodb:PutItem"],
+        Resource = aws_dynamodb_table.claim_aliases.arn
       }
     ]
   })
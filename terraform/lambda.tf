@@ -53,6 +53,21 @@ data "archive_file" "generate_instructions" {
   output_path = abspath("${path.module}/.build/generate_instructions.zip")
 }
 
+# --- Shared layer (zip) ---
+# lambdas/shared/python is mounted at /opt/python, making 'jury_common' importable
+data "archive_file" "shared_layer" {
+  type        = "zip"
+  source_dir  = abspath("${path.module}/../lambdas/shared/")
+  output_path = abspath("${path.module}/.build/shared_layer.zip")
+}
+
+resource "aws_lambda_layer_version" "shared" {
+  layer_name          = "JuryApp-Shared-${var.environment}"
+  filename            = data.archive_file.shared_layer.output_path
+  source_code_hash    = data.archive_file.shared_layer.output_base64sha256
+  compatible_runtimes = ["python3.12"]
+}
+
 # --- API Lambdas (zip)
 data "archive_file" "api_signer" {
   type        = "zip"
@@ -138,10 +153,14 @@ resource "aws_lambda_function" "extract_legal_claims" {
   filename         = data.archive_file.extract_legal_claims.output_path
   source_code_hash = data.archive_file.extract_legal_claims.output_base64sha256
   timeout          = 600 # This has many Bedrock calls
+  layers           = [aws_lambda_layer_version.shared.arn]
 
   environment {
     variables = {
       DYNAMODB_CLAIMS_TABLE_NAME = aws_dynamodb_table.claims.name
+      CLAIM_ALIASES_TABLE_NAME   = aws_dynamodb_table.claim_aliases.name
+      BEDROCK_CACHE_TABLE_NAME   = aws_dynamodb_table.bedrock_cache.name
+      DYNAMODB_TABLE_NAME        = aws_dynamodb_table.jury_instructions.name
     }
   }
 }
@@ -154,6 +173,14 @@ resource "aws_lambda_function" "extract_witnesses" {
   filename         = data.archive_file.extract_witnesses.output_path
   source_code_hash = data.archive_file.extract_witnesses.output_base64sha256
   timeout          = 300
+  layers           = [aws_lambda_layer_version.shared.arn]
+
+  environment {
+    variables = {
+      BEDROCK_CACHE_TABLE_NAME = aws_dynamodb_table.bedrock_cache.name
+      DYNAMODB_TABLE_NAME      = aws_dynamodb_table.jury_instructions.name
+    }
+  }
 }
 
 resource "aws_lambda_function" "extract_case_facts" {
@@ -164,6 +191,14 @@ resource "aws_lambda_function" "extract_case_facts" {
   filename         = data.archive_file.extract_case_facts.output_path
   source_code_hash = data.archive_file.extract_case_facts.output_base64sha256
   timeout          = 900 # This is your longest-running Lambda
+  layers           = [aws_lambda_layer_version.shared.arn]
+
+  environment {
+    variables = {
+      BEDROCK_CACHE_TABLE_NAME = aws_dynamodb_table.bedrock_cache.name
+      DYNAMODB_TABLE_NAME      = aws_dynamodb_table.jury_instructions.name
+    }
+  }
 }
 
 resource "aws_lambda_function" "enrich_legal_item" {
@@ -174,6 +209,14 @@ resource "aws_lambda_function" "enrich_legal_item" {
   filename         = data.archive_file.enrich_legal_item.output_path
   source_code_hash = data.archive_file.enrich_legal_item.output_base64sha256
   timeout          = 600
+  layers           = [aws_lambda_layer_version.shared.arn]
+
+  environment {
+    variables = {
+      BEDROCK_CACHE_TABLE_NAME = aws_dynamodb_table.bedrock_cache.name
+      DYNAMODB_TABLE_NAME      = aws_dynamodb_table.jury_instructions.name
+    }
+  }
 }
 
 resource "aws_lambda_function" "generate_instructions" {
@@ -184,11 +227,14 @@ resource "aws_lambda_function" "generate_instructions" {
   filename         = data.archive_file.generate_instructions.output_path
   source_code_hash = data.archive_file.generate_instructions.output_base64sha256
   timeout          = 900 # This is also very long
+  layers           = [aws_lambda_layer_version.shared.arn]
 
   environment {
     variables = {
       DYNAMODB_CLAIMS_TABLE_NAME = aws_dynamodb_table.claims.name
       DYNAMODB_STANDARD_JURY_INSTRUCTIONS_TABLE_NAME = aws_dynamodb_table.standard_jury_instructions.name
+      BEDROCK_CACHE_TABLE_NAME = aws_dynamodb_table.bedrock_cache.name
+      DYNAMODB_TABLE_NAME = aws_dynamodb_table.jury_instructions.name
     }
   }
 }
@@ -202,6 +248,7 @@ resource "aws_lambda_function" "job_save_results" {
   filename         = data.archive_file.job_save_results.output_path
   source_code_hash = data.archive_file.job_save_results.output_base64sha256
   timeout          = 30
+  layers           = [aws_lambda_layer_version.shared.arn]
 
   environment {
     variables = {
@@ -224,7 +224,9 @@ resource "aws_sfn_state_machine" "jury_app_workflow" {
                 "Resource": "${aws_lambda_function.extract_legal_claims.arn}",
                 "Parameters": {
                   "chunks.$": "$.complaint_chunks",
-                  "claim_type": "claims"
+                  "claim_type": "claims",
+                  "jury_instruction_id.$": "$.jury_instruction_id",
+                  "config.$": "$.job_data.config"
                 },
                 "ResultPath": "$.claims",
                 "End": true
@@ -239,7 +241,9 @@ resource "aws_sfn_state_machine" "jury_app_workflow" {
                 "Resource": "${aws_lambda_function.extract_legal_claims.arn}",
                 "Parameters": {
                   "chunks.$": "$.answer_chunks",
-                  "claim_type": "counterclaims"
+                  "claim_type": "counterclaims",
+                  "jury_instruction_id.$": "$.jury_instruction_id",
+                  "config.$": "$.job_data.config"
                 },
                 "ResultPath": "$.counterclaims",
                 "End": true
@@ -252,7 +256,11 @@ resource "aws_sfn_state_machine" "jury_app_workflow" {
               "ExtractWitnesses": {
                 "Type": "Task",
                 "Resource": "${aws_lambda_function.extract_witnesses.arn}",
-                "InputPath": "$.witness_chunks",
+                "Parameters": {
+                  "chunks.$": "$.witness_chunks",
+                  "jury_instruction_id.$": "$.jury_instruction_id",
+                  "config.$": "$.job_data.config"
+                },
                 "ResultPath": "$.witnesses",
                 "End": true
               }
@@ -267,7 +275,9 @@ resource "aws_sfn_state_machine" "jury_app_workflow" {
                 "Parameters": {
                   "complaint_chunks.$": "$.complaint_chunks",
                   "answer_chunks.$": "$.answer_chunks",
-                  "witness_chunks.$": "$.witness_chunks"
+                  "witness_chunks.$": "$.witness_chunks",
+                  "jury_instruction_id.$": "$.jury_instruction_id",
+                  "config.$": "$.job_data.config"
                 },
                 "ResultPath": "$.case_facts",
                 "End": true
@@ -306,31 +316,16 @@ resource "aws_sfn_state_machine" "jury_app_workflow" {
             "StartAt": "EnrichClaims",
             "States": {
               "EnrichClaims": {
-                "Type": "Map",
-                "InputPath": "$",
-                "ItemsPath": "$.claims",
-                "MaxConcurrency": 5,
+                "Type": "Task",
+                "Resource": "${aws_lambda_function.enrich_legal_item.arn}",
                 "Parameters": {
-                  "item.$": "$$.Map.Item.Value",
+                  "items.$": "$.claims",
+                  "type": "claim",
+                  "jury_instruction_id.$": "$.jury_instruction_id",
+                  "config.$": "$.job_data.config",
                   "complaint_chunks.$": "$.complaint_chunks",
                   "answer_chunks.$": "$.answer_chunks"
                 },
-                "Iterator": {
-                  "StartAt": "EnrichClaimItem",
-                  "States": {
-                    "EnrichClaimItem": {
-                      "Type": "Task",
-                      "Resource": "${aws_lambda_function.enrich_legal_item.arn}",
-                      "Parameters": {
-                        "item.$": "$.item",
-                        "type": "claim",
-                        "complaint_chunks.$": "$.complaint_chunks",
-                        "answer_chunks.$": "$.answer_chunks"
-                      },
-                      "End": true
-                    }
-                  }
-                },
                 "ResultPath": "$.claims",
                 "End": true
               }
@@ -340,31 +335,16 @@ resource "aws_sfn_state_machine" "jury_app_workflow" {
             "StartAt": "EnrichCounterclaims",
             "States": {
               "EnrichCounterclaims": {
-                "Type": "Map",
-                "InputPath": "$",
-                "ItemsPath": "$.counterclaims",
-                "MaxConcurrency": 5,
+                "Type": "Task",
+                "Resource": "${aws_lambda_function.enrich_legal_item.arn}",
                 "Parameters": {
-                  "item.$": "$$.Map.Item.Value",
+                  "items.$": "$.counterclaims",
+                  "type": "counterclaim",
+                  "jury_instruction_id.$": "$.jury_instruction_id",
+                  "config.$": "$.job_data.config",
                   "complaint_chunks.$": "$.complaint_chunks",
                   "answer_chunks.$": "$.answer_chunks"
                 },
-                "Iterator": {
-                  "StartAt": "EnrichCounterclaimItem",
-                  "States": {
-                    "EnrichCounterclaimItem": {
-                      "Type": "Task",
-                      "Resource": "${aws_lambda_function.enrich_legal_item.arn}",
-                      "Parameters": {
-                        "item.$": "$.item",
-                        "type": "counterclaim",
-                        "complaint_chunks.$": "$.complaint_chunks",
-                        "answer_chunks.$": "$.answer_chunks"
-                      },
-                      "End": true
-                    }
-                  }
-                },
                 "ResultPath": "$.counterclaims",
                 "End": true
               }
@@ -398,7 +378,8 @@ resource "aws_sfn_state_machine" "jury_app_workflow" {
           "counterclaims.$": "$.counterclaims",
           "case_facts.$": "$.case_facts",
           "witnesses.$": "$.witnesses",
-          "config.$": "$.job_data.config"
+          "config.$": "$.job_data.config",
+          "jury_instruction_id.$": "$.jury_instruction_id"
         },
         "Catch": [
           {